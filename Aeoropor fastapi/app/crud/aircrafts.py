@@ -6,8 +6,6 @@ from app.schemas import AircraftCreate, AircraftUpdate
 import oracledb
 
 
-oracledb.init_oracle_client()
-
 def create_aircraft(db: Session, aircraft: AircraftCreate):
     try:
         # Get raw Oracle connection
@@ -4,10 +4,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
-import oracledb
 
 
-oracledb.init_oracle_client()
 # Load environment variables
 load_dotenv() 
 
@@ -20,27 +18,53 @@ ORACLE_DSN = os.getenv("ORACLE_DSN", "localhost:1521/?service_name=XEPDB1")
 
 DATABASE_URL = f"oracle+oracledb://{ORACLE_USER}:{ORACLE_PASSWORD}@{ORACLE_DSN}" 
 
+# python-oracledb runs in thin mode (no Oracle Client needed) unless
+# ORACLE_THICK_MODE=1 or ORACLE_CLIENT_LIB_DIR is set in .env
+ORACLE_THICK_MODE = os.getenv("ORACLE_THICK_MODE", "0") == "1"
+ORACLE_CLIENT_LIB_DIR = os.getenv("ORACLE_CLIENT_LIB_DIR")
+
 
 # ================================
-#   SQLALCHEMY ENGINE
+#   SESSION (connexion à la DB)
 # ================================
 
-# echo=True → affiche les requêtes SQL (utile pour debug)
-engine = create_engine(
-    DATABASE_URL,
-    echo=False
+# Bound to the engine by init_db()
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False
 )
 
 
 # ================================
-#   SESSION (connexion à la DB)
+#   SQLALCHEMY ENGINE
 # ================================
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+engine = None
+
+
+def init_db():
+    """
+    Initialise le driver Oracle et crée l'engine (au démarrage de l'app,
+    pas à l'import). Thick mode seulement si la config le demande.
+    """
+    global engine
+    if engine is not None:
+        return engine
+
+    thick_mode = None
+    if ORACLE_CLIENT_LIB_DIR:
+        thick_mode = {"lib_dir": ORACLE_CLIENT_LIB_DIR}
+    elif ORACLE_THICK_MODE:
+        thick_mode = True
+
+    # echo=True → affiche les requêtes SQL (utile pour debug)
+    engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        thick_mode=thick_mode
+    )
+    SessionLocal.configure(bind=engine)
+    return engine
 
 
 # ================================
@@ -1,10 +1,11 @@
 import sys
 sys.path.append('.')
 
-from app.database import SessionLocal
+from app.database import SessionLocal, init_db
 from sqlalchemy import text  # Add this import
 
 try:
+    init_db()
     db = SessionLocal()
     # Wrap the SQL string with text()
     result = db.execute(text("SELECT 'Connected!' FROM dual")).fetchone()
@@ -1,16 +1,30 @@
+import importlib
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from app.routes import aircrafts
-from app.routes import flights
-from app.routes import passengers
-from app.routes import maintenance
-from app.routes import reservations
 
-app = FastAPI()
+# Loaded at startup rather than at import, together with their crud
+# modules, SQLAlchemy and the Oracle driver, so importing main stays cheap
+ROUTERS = [
+    "app.routes.aircrafts",
+    "app.routes.flights",
+    "app.routes.passengers",
+    "app.routes.maintenance",
+    "app.routes.reservations_version2_bd",  # app/routes/reservations.py is empty
+]
 
-# Include the router[citation:8]
-app.include_router(aircrafts.router)
-app.include_router(flights.router)
-app.include_router(passengers.router)
-app.include_router(maintenance.router)
-app.include_router(reservations.router)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.database import init_db
+
+    init_db()
+    if not getattr(app.state, "routers_loaded", False):
+        # Include the router[citation:8]
+        for name in ROUTERS:
+            app.include_router(importlib.import_module(name).router)
+        app.state.routers_loaded = True
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark: import time, startup time and first-request latency.
+
+    python startup_benchmark.py                        # 10 fresh interpreters
+    python startup_benchmark.py --runs 20 --out startup.json
+    python startup_benchmark.py --path /aircrafts/     # needs the database
+
+Every run starts a new Python process (nothing cached in sys.modules) and
+times, inside it:
+    import   - import main
+    startup  - the lifespan (Oracle driver init, routers and crud modules)
+    first    - the first request to --path (default /openapi.json, which
+               builds the schema of every route without touching Oracle)
+plus "process", the wall-clock time of the whole run seen from outside.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_RUN = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+before = time.perf_counter()
+client.__enter__()
+ready = time.perf_counter()
+response = client.get(sys.argv[1])
+done = time.perf_counter()
+client.__exit__(None, None, None)
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - before,
+    "first": done - ready,
+    "status": response.status_code,
+}))
+"""
+
+METRICS = ("import", "startup", "first", "process")
+
+
+def run_once(path: str) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _RUN, path], cwd=HERE,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        sys.exit(f"run failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process"] = elapsed
+    return result
+
+
+def summarize(runs) -> dict:
+    summary = {}
+    for metric in METRICS:
+        values = [r[metric] for r in runs]
+        summary[metric] = {
+            "median_ms": round(statistics.median(values) * 1000, 2),
+            "min_ms": round(min(values) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/openapi.json", help="path of the first request")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.path) for _ in range(args.runs)]
+    statuses = sorted({r["status"] for r in runs})
+    summary = summarize(runs)
+
+    print(f"{args.runs} runs, first request GET {args.path} -> {', '.join(map(str, statuses))}")
+    print(f"{'':<10}{'median':>10}{'min':>10}{'max':>10}  (ms)")
+    for metric, s in summary.items():
+        print(f"{metric:<10}{s['median_ms']:>10.1f}{s['min_ms']:>10.1f}{s['max_ms']:>10.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "path": args.path,
+                       "summary": summary, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Marks the transaction's aircraft write as logged by this pipeline, so
+# trg_aircraft_logs skips it, and reads the row it replaces (locked until
+# commit) in the same round trip. ae_audit.mark checks the token against
+# ae_audit_secret, which only the schema owner can read: unlike a session
+# ACTION, a client cannot use it to switch the trigger off.
+MARK_AIRCRAFT_SQL = """
+    BEGIN
+        ae_audit.mark(:token);
+        SELECT Modele, MaxCapacity, State
+        INTO :modele, :capacity, :state
+        FROM Aircrafts
+        WHERE Avion_id = :avion_id
+        FOR UPDATE;
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN NULL;
+    END;
+"""
+
+_AIRCRAFT_FIELDS = (("modele", "Modele"), ("capacity", "Capacity"), ("state", "State"))
+
+INSERT_LOGS = """
+    INSERT INTO LOGS (LogID, TableName, Operation, RecordID, Details, LogDate)
+    VALUES (seq_logs.NEXTVAL, :table_name, :operation, :record_id, :details, :log_date)
+"""
+
+
+def db_user(conn):
+    """DB user behind a SQLAlchemy Connection or an oracledb connection."""
+    driver_conn = getattr(conn, "connection", None)
+    if driver_conn is not None:
+        conn = driver_conn.driver_connection
+    return conn.username
+
+
+def _mark_binds(cursor, avion_id: int):
+    return {
+        "token": config.AUDIT_API_TOKEN,
+        "avion_id": avion_id,
+        "modele": cursor.var(str),
+        "capacity": cursor.var(int),
+        "state": cursor.var(str),
+    }
+
+
+def _previous(binds):
+    values = {name: binds[name].getvalue() for name, _ in _AIRCRAFT_FIELDS}
+    return values if values["modele"] is not None else {}
+
+
+def mark_aircraft_write(driver_conn, avion_id: int):
+    """
+    Marks the aircraft write about to run in this transaction as logged
+    by the API and returns the aircraft's current values ({} if it does
+    not exist yet). Returns None and marks nothing when AUDIT_API_TOKEN is
+    not set: trg_aircraft_logs then logs the write itself.
+    """
+    if not config.AUDIT_API_TOKEN:
+        return None
+    cursor = driver_conn.cursor()
+    try:
+        binds = _mark_binds(cursor, avion_id)
+        cursor.execute(MARK_AIRCRAFT_SQL, binds)
+    finally:
+        cursor.close()
+    return _previous(binds)
+
+
+async def mark_aircraft_write_async(conn, avion_id: int):
+    """mark_aircraft_write for an async connection."""
+    if not config.AUDIT_API_TOKEN:
+        return None
+    with conn.cursor() as cursor:
+        binds = _mark_binds(cursor, avion_id)
+        await cursor.execute(MARK_AIRCRAFT_SQL, binds)
+    return _previous(binds)
+
+
+def aircraft_details(values: dict) -> str:
+    """Details of an inserted or deleted aircraft, as trg_aircraft_logs writes them."""
+    return ", ".join(f"{label}={values.get(name)}" for name, label in _AIRCRAFT_FIELDS)
+
+
+def aircraft_changes(old: dict, new: dict) -> str:
+    """Old -> new of every field an update changes, as trg_aircraft_logs writes them."""
+    changes = [
+        f"{label}:{old.get(name)}→{new[name]}"
+        for name, label in _AIRCRAFT_FIELDS
+        if new.get(name) is not None and new[name] != old.get(name)
+    ]
+    return ", ".join(changes) or "No changes detected"
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on path, held against other processes too."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AuditPipeline:
+    """
+    Write-behind audit log: routers call record() after a successful
+    write, which only puts the event on a bounded in-process queue; a
+    background thread writes queued events to LOGS in batches
+    (array insert, one commit per batch) every flush_interval seconds, or
+    sooner once batch_size events are waiting.
+
+    When the queue is full, record() blocks up to AUDIT_ENQUEUE_TIMEOUT
+    (backpressure) and then appends the event to the local spool file.
+    Batches that Oracle rejects, and whatever is still queued at
+    shutdown, are spooled too; the spool is replayed at the next
+    successful flush, including after a restart. The spool may be shared
+    by several worker processes: appends and replays hold a file lock,
+    and the spool is rewritten after each replayed batch so a committed
+    batch is not written again (at-least-once: only a crash between the
+    commit and the rewrite repeats that batch).
+
+    The queue itself lives in memory: events queued but not yet written
+    when the process is killed outright (no shutdown) are lost, at most
+    AUDIT_QUEUE_SIZE of them. Writes that must never go unlogged are
+    covered by trg_aircraft_logs, which logs every Aircrafts DML not
+    made through this pipeline.
+    """
+
+    def __init__(self, spool_path: str = config.AUDIT_SPOOL_PATH,
+                 maxsize: int = config.AUDIT_QUEUE_SIZE,
+                 batch_size: int = config.AUDIT_BATCH_SIZE,
+                 flush_interval: float = config.AUDIT_FLUSH_INTERVAL):
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._spool_lock = threading.Lock()
+        self.lock_path = spool_path + ".lock"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._engines = None
+        self.recorded = 0
+        self.written = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.last_flush_ms = None
+
+    def record(self, table_name: str, operation: str, record_id, user: str = None, details: str = None):
+        event = {
+            "table_name": table_name,
+            "operation": operation,
+            "record_id": record_id,
+            "details": f"user={user}; {details}" if user else details,
+            "log_date": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.recorded += 1
+        try:
+            self._queue.put(event, timeout=config.AUDIT_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self._spool([event])
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    # -- spool -------------------------------------------------------
+
+    @contextmanager
+    def _spool_locked(self):
+        # threading lock for this process, file lock for the other workers
+        with self._spool_lock, _file_lock(self.lock_path):
+            yield
+
+    @staticmethod
+    def _write(path, events, mode):
+        with open(path, mode, encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _spool(self, events):
+        with self._spool_locked():
+            self._write(self.spool_path, events, "a")
+            self.spooled += len(events)
+
+    def _rewrite_spool(self, events):
+        if not events:
+            os.remove(self.spool_path)
+            return
+        tmp_path = f"{self.spool_path}.{os.getpid()}.tmp"
+        self._write(tmp_path, events, "w")
+        os.replace(tmp_path, self.spool_path)
+
+    def _replay_spool(self, conn):
+        with self._spool_locked():
+            if not os.path.exists(self.spool_path):
+                return
+            with open(self.spool_path, encoding="utf-8") as f:
+                events = [json.loads(line) for line in f if line.strip()]
+            while events:
+                batch, events = events[:self.batch_size], events[self.batch_size:]
+                self._insert(conn, batch)
+                # Drop the committed batch before the next one can fail
+                self._rewrite_spool(events)
+                self.replayed += len(batch)
+
+    # -- flushing ----------------------------------------------------
+
+    @staticmethod
+    def _insert(conn, events):
+        rows = [dict(e, log_date=datetime.fromisoformat(e["log_date"])) for e in events]
+        cursor = conn.connection.cursor()
+        try:
+            cursor.executemany(INSERT_LOGS, rows)
+            conn.connection.commit()
+        except Exception:
+            conn.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _drain(self):
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def flush(self):
+        """Write everything queued so far; returns the number of events written."""
+        started = time.perf_counter()
+        written = 0
+        events = self._drain()
+        if not events and not os.path.exists(self.spool_path):
+            return 0
+        if not config.AUDIT_USER:
+            # Nowhere to write yet: keep the events until credentials are set
+            if events:
+                self._spool(events)
+            return 0
+        try:
+            with self._engines.connect(config.AUDIT_USER, config.AUDIT_PASSWORD) as conn:
+                self._replay_spool(conn)
+                while events:
+                    self._insert(conn, events)
+                    written += len(events)
+                    self.batches += 1
+                    events = self._drain()
+        except Exception:
+            logger.exception("Audit flush failed, spooling %d events", len(events))
+            self.failed_batches += 1
+            if events:
+                self._spool(events)
+        self.written += written
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        return written
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self, engines):
+        if not config.AUDIT_USER:
+            logger.warning("AUDIT_USER is not set, audit events go to %s only", self.spool_path)
+        self._engines = engines
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher; what cannot be written now goes to the spool."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        leftover = self._drain()
+        while leftover:
+            self._spool(leftover)
+            leftover = self._drain()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "recorded": self.recorded,
+            "written": self.written,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "last_flush_ms": self.last_flush_ms,
+            "spool_pending": os.path.exists(self.spool_path),
+        }
+
+
+audit = AuditPipeline()
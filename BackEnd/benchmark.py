@@ -0,0 +1,290 @@
+"""
+Micro-benchmarks of the row mapping and response serialization paths.
+
+    python benchmark.py                               # 1k, 100k and 1M rows
+    python benchmark.py --sizes 1k,100k --out bench.json
+    python benchmark.py --compare bench.json          # exit status 1 on a regression
+    python benchmark.py --filter response.
+
+Every path runs on synthetic rows shaped like what Oracle returns for its
+table (same columns, same Python types) and is reported in rows/sec, taken
+from the best of the rounds run (at least --min-rounds, and more while
+they fit in --min-time).
+With --compare, any path whose rows/sec fell more than --threshold below
+the earlier run fails the whole run, so the suite can gate a change.
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import IteratorResult
+from sqlalchemy.engine.result import SimpleResultMetaData
+
+import config
+import export
+import fast_json
+import standin
+from crud.aircraft import map_aircraft_rows
+from models.aircraft import AircraftOut
+from seats import seat_code
+
+
+# ---------------------------------------------------------------------
+# Synthetic rows: (COLUMNS as the cursor describes them, tuples)
+# ---------------------------------------------------------------------
+
+_START = datetime(2030, 1, 1, 6, 0)
+
+
+def _aircraft(i):
+    modele, capacity = standin.MODELS[i % len(standin.MODELS)]
+    return i, modele, capacity, "Ready"
+
+
+def _flight(i):
+    departure = _START + timedelta(minutes=7 * i)
+    return (i, standin.DESTINATIONS[i % len(standin.DESTINATIONS)], departure,
+            departure + timedelta(hours=2), i % 180, "Scheduled", i % 20 + 1)
+
+
+def _passenger(i):
+    prenom = standin.FIRST_NAMES[i % len(standin.FIRST_NAMES)]
+    nom = standin.LAST_NAMES[i % len(standin.LAST_NAMES)]
+    return (i, prenom, nom, standin.FIRST_PASSPORT + i, f"{prenom.lower()}.{nom.lower()}{i}@example.com",
+            standin.NATIONALITIES[i % len(standin.NATIONALITIES)], 18 + i % 60)
+
+
+def _reservation(i):
+    return i, i, 1000 + i // 180, seat_code(i % 180), "Confirmed", None
+
+
+def _maintenance(i):
+    return i, i % 20 + 1, _START + timedelta(days=i % 365), "Inspection", "Scheduled"
+
+
+ROW_FACTORIES = {
+    "aircrafts": _aircraft,
+    "flights": _flight,
+    "passengers": _passenger,
+    "reservations": _reservation,
+    "maintenance": _maintenance,
+}
+
+
+def synthetic_rows(table: str, n: int):
+    columns = [c.upper() for c, _, _ in standin.SCHEMA[table]["columns"]]
+    make = ROW_FACTORIES[table]
+    return columns, [make(i) for i in range(1, n + 1)]
+
+
+def sqlalchemy_rows(columns, rows):
+    """The Row objects conn.execute(...).fetchall() returns (lower-case keys)."""
+    metadata = SimpleResultMetaData([c.lower() for c in columns])
+    return IteratorResult(metadata, iter(rows)).all()
+
+
+# ---------------------------------------------------------------------
+# Paths: setup(columns, rows) -> the callable that is timed
+# ---------------------------------------------------------------------
+
+BENCHMARKS = {}  # name -> (table, setup)
+
+
+def benchmark(name: str, table: str):
+    def register(setup):
+        BENCHMARKS[name] = (table, setup)
+        return setup
+    return register
+
+
+def _response(adapter: TypeAdapter, content):
+    # What FastAPI does with a response_model: validate, dump to JSON-able
+    # data, then JSONResponse renders it with the stdlib encoder
+    return JSONResponse(adapter.dump_python(adapter.validate_python(content), mode="json")).body
+
+
+def _fast_response(content):
+    # config.FAST_JSON: the content is rendered as is by fast_json
+    return fast_json.FastJSONResponse(content).body
+
+
+@benchmark("aircraft.remap", "aircrafts")
+def _aircraft_remap(columns, rows):
+    # crud.aircraft.get_aircrafts: ref cursor tuples -> AircraftOut dicts
+    return lambda: map_aircraft_rows(columns, rows)
+
+
+for _table in ("flights", "passengers", "reservations"):
+    @benchmark(f"{_table}.row_mapping", _table)
+    def _row_mapping(columns, rows):
+        # crud get_all_*: dict(row._mapping) per SQLAlchemy Row
+        rows = sqlalchemy_rows(columns, rows)
+        return lambda: [dict(row._mapping) for row in rows]
+
+    @benchmark(f"{_table}.zip_mapping", _table)
+    def _zip_mapping(columns, rows):
+        # crud_async get_all_*: dict(zip(columns, row)) per cursor tuple
+        names = [c.lower() for c in columns]
+        return lambda: [dict(zip(names, row)) for row in rows]
+
+    @benchmark(f"{_table}.response", _table)
+    def _dict_response(columns, rows):
+        # routers: response_model=List[dict]
+        adapter = TypeAdapter(List[dict])
+        content = [dict(row._mapping) for row in sqlalchemy_rows(columns, rows)]
+        return lambda: _response(adapter, content)
+
+    @benchmark(f"{_table}.fast_response", _table)
+    def _dict_fast_response(columns, rows):
+        content = [dict(row._mapping) for row in sqlalchemy_rows(columns, rows)]
+        return lambda: _fast_response(content)
+
+
+@benchmark("aircraft.response", "aircrafts")
+def _aircraft_response(columns, rows):
+    # routers/aircraft.py: response_model=List[AircraftOut]
+    adapter = TypeAdapter(List[AircraftOut])
+    content = map_aircraft_rows(columns, rows)
+    return lambda: _response(adapter, content)
+
+
+@benchmark("aircraft.fast_response", "aircrafts")
+def _aircraft_fast_response(columns, rows):
+    content = map_aircraft_rows(columns, rows)
+    return lambda: _fast_response(content)
+
+
+@benchmark("maintenance.response", "maintenance")
+def _maintenance_response(columns, rows):
+    # routers/maintenance.py: dict(zip(columns, row)) then response_model=list
+    adapter = TypeAdapter(list)
+    names = [c.lower() for c in columns]
+    return lambda: _response(adapter, [dict(zip(names, row)) for row in rows])
+
+
+@benchmark("maintenance.fast_response", "maintenance")
+def _maintenance_fast_response(columns, rows):
+    names = [c.lower() for c in columns]
+    return lambda: _fast_response([dict(zip(names, row)) for row in rows])
+
+
+for _fmt in ("ndjson", "csv"):
+    @benchmark(f"flights.export_{_fmt}", "flights")
+    def _export(columns, rows, fmt=_fmt):
+        # export._iter_rows over a cursor fetching EXPORT_ARRAYSIZE rows at a time
+        result = standin.Rows([(c, None) for c in columns], rows)
+        conn = standin.StandinConnection(standin.database, "benchmark")
+
+        def run():
+            cursor = standin.StandinCursor(conn)
+            cursor.arraysize = config.EXPORT_ARRAYSIZE
+            cursor._set_result(result)
+            for _ in export._iter_rows(conn, cursor, fmt):
+                pass
+        return run
+
+
+# ---------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------
+
+def measure(fn, n: int, min_time: float, min_rounds: int, max_rounds: int) -> dict:
+    times = []
+    while True:
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+        if (sum(times) >= min_time and len(times) >= min_rounds) or len(times) >= max_rounds:
+            break
+    best = min(times)
+    return {
+        "rows": n,
+        "rounds": len(times),
+        "best_s": round(best, 6),
+        "median_s": round(statistics.median(times), 6),
+        "rows_per_sec": round(n / best),
+    }
+
+
+def run(sizes, names, min_time: float, min_rounds: int, max_rounds: int) -> dict:
+    results = {}
+    tables = sorted({BENCHMARKS[name][0] for name in names})
+    for n in sizes:
+        for table in tables:
+            columns, rows = synthetic_rows(table, n)
+            for name in names:
+                bench_table, setup = BENCHMARKS[name]
+                if bench_table != table:
+                    continue
+                key = f"{name}[{n}]"
+                results[key] = measure(setup(columns, rows), n, min_time, min_rounds, max_rounds)
+                print(_line(key, results[key]), flush=True)
+            del columns, rows
+    return results
+
+
+def regressions(results: dict, baseline: dict, threshold: float):
+    """Keys whose rows/sec fell more than threshold (a fraction) below baseline."""
+    slower = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before and result["rows_per_sec"] < before["rows_per_sec"] * (1 - threshold):
+            slower.append((key, before["rows_per_sec"], result["rows_per_sec"]))
+    return slower
+
+
+def _line(key: str, result: dict) -> str:
+    return (f"{key:<40}{result['rows_per_sec']:>14,} rows/s"
+            f"{result['best_s'] * 1000:>12.2f} ms{result['rounds']:>6} rounds")
+
+
+def parse_size(text: str) -> int:
+    """"1k" -> 1000, "1M" -> 1000000, "2500" -> 2500"""
+    text = text.strip()
+    factor = {"k": 1000, "K": 1000, "m": 1000000, "M": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k,1M", help="row counts, e.g. 1k,100k,1M")
+    parser.add_argument("--filter", default="", help="only paths whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds of rounds per path and size")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--max-rounds", type=int, default=20)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fail when rows/sec drops by more than this fraction (default 0.2)")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if not names:
+        parser.error(f"no path matches {args.filter!r} (known: {', '.join(BENCHMARKS)})")
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    results = run(sizes, names, args.min_time, args.min_rounds, args.max_rounds)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        slower = regressions(results, baseline, args.threshold)
+        for key, before, after in slower:
+            print(f"REGRESSION {key}: {before:,} -> {after:,} rows/s ({(after - before) / before * 100:+.0f}%)")
+        if slower:
+            sys.exit(1)
+        print(f"no path slower than {args.threshold:.0%} below {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
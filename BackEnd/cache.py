@@ -0,0 +1,177 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import config
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ttl seconds.
+    Keys start with a namespace; invalidate(namespace) bumps that
+    namespace's generation so every older entry is skipped at once and
+    later falls out through LRU/TTL eviction.
+    The cache is per process: with several workers, a write only clears
+    its own worker and the others catch up within ttl.
+    """
+
+    def __init__(self, maxsize: int = config.CACHE_MAXSIZE, ttl: float = config.CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self.invalidations = defaultdict(int)
+
+    def _key(self, namespace, key):
+        return (namespace, self._generations[namespace]) + key
+
+    def get(self, namespace, key):
+        """Return (found, value)."""
+        now = time.monotonic()
+        with self._lock:
+            full_key = self._key(namespace, key)
+            entry = self._data.get(full_key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(full_key)
+                self.hits[namespace] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[full_key]
+            self.misses[namespace] += 1
+            return False, None
+
+    def set(self, namespace, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generations[namespace]:
+                return  # invalidated while the value was being read
+            self._data[self._key(namespace, key)] = (time.monotonic() + self.ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations[namespace]
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] += 1
+                self.invalidations[namespace] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            for namespace in list(self._generations):
+                self._generations[namespace] += 1
+
+    def stats(self):
+        with self._lock:
+            namespaces = set(self.hits) | set(self.misses) | set(self.invalidations)
+            return {
+                "enabled": config.CACHE_ENABLED,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": sum(self.hits.values()),
+                "misses": sum(self.misses.values()),
+                "evictions": self.evictions,
+                "namespaces": {
+                    namespace: {
+                        "hits": self.hits[namespace],
+                        "misses": self.misses[namespace],
+                        "invalidations": self.invalidations[namespace],
+                    }
+                    for namespace in sorted(namespaces)
+                },
+            }
+
+
+cache = TTLCache()
+
+
+def _db_user(conn):
+    # Entries are private to a DB user: privileges differ between users.
+    # The user is read off the driver connection, i.e. the one the engine
+    # registry logged in with (stand-in engines have none in their URL)
+    driver_conn = getattr(conn, "connection", None)
+    if driver_conn is not None:
+        conn = driver_conn.driver_connection
+    return conn.username
+
+
+def cached(namespace: str):
+    """
+    Read-through caching for a crud read function(conn, *args).
+    None results are not cached (several lookups return None on errors).
+    Cached values are shared between callers and must not be mutated.
+    Callers may pass version= (a DB version token, see etag.py): it is not
+    forwarded, only added to the key, so an entry read at an older version
+    of the data is never served for a newer one.
+    """
+    def decorator(func):
+        def key_for(conn, args, kwargs, version):
+            return (_db_user(conn), func.__name__, args, tuple(sorted(kwargs.items())), version)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(conn, *args, version=None, **kwargs):
+                if not config.CACHE_ENABLED:
+                    return await func(conn, *args, **kwargs)
+                key = key_for(conn, args, kwargs, version)
+                found, value = cache.get(namespace, key)
+                if found:
+                    return value
+                generation = cache.generation(namespace)
+                value = await func(conn, *args, **kwargs)
+                if value is not None:
+                    cache.set(namespace, key, value, generation)
+                return value
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(conn, *args, version=None, **kwargs):
+            if not config.CACHE_ENABLED:
+                return func(conn, *args, **kwargs)
+            key = key_for(conn, args, kwargs, version)
+            found, value = cache.get(namespace, key)
+            if found:
+                return value
+            generation = cache.generation(namespace)
+            value = func(conn, *args, **kwargs)
+            if value is not None:
+                cache.set(namespace, key, value, generation)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces: str):
+    """
+    Clear the given namespaces after a write function runs, even if it
+    raised, since the procedure may have committed part of its work.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    cache.invalidate(*namespaces)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache.invalidate(*namespaces)
+        return wrapper
+    return decorator
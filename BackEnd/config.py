@@ -1,3 +1,92 @@
+import os
+
 ORACLE_HOST = "localhost"
 ORACLE_PORT = 1521
 ORACLE_SERVICE = "XEPDB1"
+
+# "oracle", or "standin" to run on the in-process emulation of the AE
+# schema (BackEnd/standin.py), e.g. for load tests without a database
+DB_BACKEND = "oracle"
+STANDIN_SEED = 42             # seed of the generated data set
+STANDIN_AIRCRAFTS = 20
+STANDIN_FLIGHTS = 200
+STANDIN_PASSENGERS = 5000
+STANDIN_RESERVATIONS = 3000
+STANDIN_LATENCY = 0.0          # seconds added to every statement (simulated round trip)
+
+# Connection pool (one pool per DB user)
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 5
+POOL_TIMEOUT = 30          # seconds to wait for a free connection
+POOL_RECYCLE = 1800        # seconds before a pooled connection is replaced
+ENGINE_IDLE_TIMEOUT = 900  # seconds before an unused pool is disposed
+MAX_ENGINES = 50           # max number of distinct credentials kept open
+
+# Serve the API with async routes on python-oracledb async pools
+ASYNC_MODE = False
+
+# List endpoints (keyset pagination)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_SEARCH_SIZE = 20  # GET /passengers/search
+MAX_BATCH_IDS = 1000      # GET /<resource>/batch?ids= (Oracle IN list limit)
+
+# Conditional GETs (ETag / If-None-Match, BackEnd/etag.py)
+ETAG_ENABLED = True
+LIST_CACHE_CONTROL = "private, no-cache"  # keep list pages, but revalidate them every time
+
+# Render trusted DB output with orjson (BackEnd/fast_json.py) instead of
+# validating it against the route's response_model first
+FAST_JSON = False
+
+# Streaming exports: rows fetched per round trip
+EXPORT_ARRAYSIZE = 1000
+
+# Bulk endpoints: rows sent per executemany round trip
+BULK_BATCH_SIZE = 500
+MAX_BULK_ROWS = 10000
+
+# In-process read cache for crud lookups
+CACHE_ENABLED = True
+CACHE_TTL = 30             # seconds an entry stays fresh
+CACHE_MAXSIZE = 10000      # entries kept before least recently used go
+
+# Cabin layout used to number seats 1..MaxCapacity (row + letter, e.g. 12C)
+SEAT_LETTERS = "ABCDEF"
+
+# Seat holds (POST /flights/{vol_num}/holds)
+HOLD_TTL = 600             # seconds a hold keeps its seats
+MAX_HOLD_SEATS = 9
+
+# Background state refresh (flight / aircraft / maintenance transitions).
+# Credentials come from the environment; without them the refresher does not run.
+STATE_REFRESH_ENABLED = True
+STATE_REFRESH_USER = os.getenv("STATE_REFRESH_USER")
+STATE_REFRESH_PASSWORD = os.getenv("STATE_REFRESH_PASSWORD")
+STATE_REFRESH_INTERVAL = 60    # seconds between runs
+STATE_REFRESH_CATCHUP = 86400  # seconds looked back by the first run
+STATE_REFRESH_HISTORY = 100    # runs kept for /state-refresh/stats
+MAINTENANCE_DURATION = 86400   # seconds after OperationDate a maintenance is done
+
+# Write-behind audit log (BackEnd/audit.py -> LOGS). Defaults to the state
+# refresh account; without credentials events stay in the spool.
+AUDIT_USER = os.getenv("AUDIT_USER", STATE_REFRESH_USER)
+AUDIT_PASSWORD = os.getenv("AUDIT_PASSWORD", STATE_REFRESH_PASSWORD)
+# Secret installed in ae_audit_secret (DBHandler/AE.sql) that lets the API
+# mark the aircraft writes it logs; unset, trg_aircraft_logs logs them all
+AUDIT_API_TOKEN = os.getenv("AUDIT_API_TOKEN")
+AUDIT_QUEUE_SIZE = 10000       # events buffered in memory
+AUDIT_BATCH_SIZE = 500         # events per array insert
+AUDIT_FLUSH_INTERVAL = 2       # seconds between flushes
+AUDIT_ENQUEUE_TIMEOUT = 0.5    # seconds a write waits on a full queue before spooling
+AUDIT_SPOOL_PATH = "audit_spool.jsonl"
+
+# Slow-query log (GET /slow-queries)
+SLOW_QUERY_THRESHOLD = 0.5     # seconds; calls at least this slow are kept
+SLOW_QUERY_BUFFER = 500        # entries kept in memory
+SLOW_QUERY_LOG_PATH = None     # e.g. "slow_queries.jsonl" to also append entries to a file
+
+# DB users allowed on the admin monitoring routes (/pool/stats, /slow-queries)
+ADMIN_DB_USERS = ("USER_ADMIN",)
+SLOW_QUERY_BIND_VALUES = False # show string bind values (sensitive names are always masked)
+SLOW_QUERY_MAX_SQL = 4000      # characters of SQL text kept
@@ -1,8 +1,12 @@
+from sqlalchemy import text
 from sqlalchemy.engine import Connection
 from models.aircraft import AircraftCreate, AircraftUpdate
 import oracledb
 from fastapi import HTTPException
+from cache import cached, invalidates
+from multiget import select_by_ids_sql
 
+@invalidates("aircraft")
 def add_aircraft(conn: Connection, aircraft: AircraftCreate):
     cursor = conn.connection.cursor()
     try:
@@ -29,6 +33,7 @@ def add_aircraft(conn: Connection, aircraft: AircraftCreate):
         traceback.print_exc()
         raise  # Re-raise to let FastAPI see it
 
+@invalidates("aircraft")
 def update_aircraft(conn: Connection, avion_id: int, aircraft: AircraftUpdate):
     cursor = conn.connection.cursor()
     cursor.callproc(
@@ -42,11 +47,13 @@ def update_aircraft(conn: Connection, avion_id: int, aircraft: AircraftUpdate):
     )
     cursor.close()
 
+@invalidates("aircraft")
 def delete_aircraft(conn: Connection, avion_id: int):
     cursor = conn.connection.cursor()
     cursor.callproc("delete_aircraft", [avion_id])
     cursor.close()
 
+@cached("aircraft")
 def get_aircraft_by_id(conn: Connection, avion_id: int):
     cursor = conn.connection.cursor()
     out_modele = cursor.var(str)
@@ -73,6 +80,45 @@ def get_aircraft_by_id(conn: Connection, avion_id: int):
     cursor.close()
     return result
 
+AIRCRAFT_FIELDS = "avion_id, modele, MaxCapacity max_capacity, state"
+
+@cached("aircraft")
+def get_aircrafts_by_ids(conn: Connection, avion_ids: tuple):
+    """
+    The aircrafts of avion_ids as AircraftOut dicts, from one query instead
+    of one select_aircraft_by_id call each (in no particular order,
+    missing ones left out).
+    """
+    sql, params = select_by_ids_sql(AIRCRAFT_FIELDS, "Aircrafts", "avion_id", avion_ids)
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
+
+def map_aircraft_rows(columns, rows):
+    """
+    Ref cursor rows of AE.get_all_aircrafts_infos -> AircraftOut dicts.
+    """
+    aircrafts = []
+    for row in rows:
+        # Create a dictionary with proper field names
+        aircraft = {}
+        
+        # Map Oracle uppercase columns to lowercase model fields
+        for i, col_name in enumerate(columns):
+            if col_name == 'AVION_ID':
+                aircraft['avion_id'] = row[i]
+            elif col_name == 'MODELE':
+                aircraft['modele'] = row[i]
+            elif col_name == 'MAXCAPACITY':
+                aircraft['max_capacity'] = row[i]  # Note: underscore
+            elif col_name == 'STATE':
+                aircraft['state'] = row[i]
+            else:
+                # Keep other columns as-is
+                aircraft[col_name.lower()] = row[i]
+        
+        aircrafts.append(aircraft)
+    return aircrafts
+
+@cached("aircraft")
 def get_aircrafts(conn: Connection):
     try:
         raw_conn = conn.connection.connection
@@ -103,26 +149,7 @@ def get_aircrafts(conn: Connection):
         print(f"DEBUG: First row: {rows[0] if rows else 'Empty'}")
         
         # Transform to match your Pydantic model
-        aircrafts = []
-        for row in rows:
-            # Create a dictionary with proper field names
-            aircraft = {}
-            
-            # Map Oracle uppercase columns to lowercase model fields
-            for i, col_name in enumerate(columns):
-                if col_name == 'AVION_ID':
-                    aircraft['avion_id'] = row[i]
-                elif col_name == 'MODELE':
-                    aircraft['modele'] = row[i]
-                elif col_name == 'MAXCAPACITY':
-                    aircraft['max_capacity'] = row[i]  # Note: underscore
-                elif col_name == 'STATE':
-                    aircraft['state'] = row[i]
-                else:
-                    # Keep other columns as-is
-                    aircraft[col_name.lower()] = row[i]
-            
-            aircrafts.append(aircraft)
+        aircrafts = map_aircraft_rows(columns, rows)
         
         # DEBUG: Print transformed data
         print(f"DEBUG: Transformed first aircraft: {aircrafts[0] if aircrafts else 'Empty'}")
@@ -1,9 +1,17 @@
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from sqlalchemy.engine import Connection
-from models.flight import FlightCreate, FlightUpdate
+from models.flight import FlightCreate, FlightUpdate, FlightFilter
 from fastapi import HTTPException
+from collections import defaultdict
+from typing import List
+from cache import cached, invalidates
+from seats import seat_index, encode_bitmap
+from etag import query_version
+from multiget import select_by_ids_sql
+import config
 
 
+@invalidates("flight")
 def add_flight(conn: Connection, flight: FlightCreate):
     """
     Calls the DBA procedure to add a new flight.
@@ -29,6 +37,194 @@ def add_flight(conn: Connection, flight: FlightCreate):
         }
     )
 
+def in_chunks(values, size=1000):
+    # Oracle caps IN lists at 1000 expressions
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _naive(flight: FlightCreate):
+    # Oracle DATE has no time zone: compare everything as naive times
+    return flight.model_copy(update={
+        "departure_time": flight.departure_time.replace(tzinfo=None),
+        "arrival_time": flight.arrival_time.replace(tzinfo=None),
+    })
+
+FLIGHTS_INSERT_SQL = """
+    INSERT INTO Flights
+        (vol_num, destination, departure_time, arrival_time, CurrentCapacity, state, Avion_id)
+    VALUES
+        (:vol_num, :destination, :departure_time, :arrival_time, 0, 'Scheduled', :avion_id)
+"""
+
+BOOKED_ROTATIONS_SQL = """
+    SELECT vol_num, avion_id, departure_time, arrival_time
+    FROM Flights
+    WHERE avion_id IN {ids}
+      AND departure_time < :window_end
+      AND arrival_time > :window_start
+      AND (state IS NULL OR state <> 'Cancelled')
+"""
+
+class FlightSchedule:
+    """
+    Checks of a schedule import that do not need the database, shared by
+    the sync and async add_flights_bulk: the caller looks up vol_nums,
+    avion_ids and the window in Flights / Aircrafts, then calls check().
+    """
+
+    def __init__(self, flights: List[FlightCreate]):
+        self.flights = [_naive(f) for f in flights]
+        self.results = [
+            {"index": i, "id": f.vol_num, "ok": True, "error_code": None, "error": None}
+            for i, f in enumerate(self.flights)
+        ]
+        self.vol_nums = list(dict.fromkeys(f.vol_num for f in self.flights))
+        # Rows per aircraft, ordered by departure in check()
+        self.by_aircraft = defaultdict(list)
+        for i, f in enumerate(self.flights):
+            self.by_aircraft[f.avion_id].append(i)
+        if self.flights:
+            self.window_start = min(f.departure_time for f in self.flights)
+            self.window_end = max(f.arrival_time for f in self.flights)
+
+    def conflict(self, i, message, code=None):
+        results = self.results
+        if results[i]["ok"]:
+            results[i].update(ok=False, error_code=code, error=message)
+        else:
+            results[i]["error"] += f"; {message}"
+
+    def check(self, now, existing_vols, states, booked):
+        """
+        Duplicate vol_num, aircraft missing or not Ready, departure in the
+        past, overlapping rotations of the same aircraft in the file or
+        already in Flights (booked: avion_id -> [(departure, arrival, vol_num)]).
+        Returns the insert order (grouped per aircraft), or None if any
+        row conflicts.
+        """
+        flights, conflict = self.flights, self.conflict
+
+        seen = {}
+        for i, f in enumerate(flights):
+            if f.vol_num in seen:
+                conflict(i, f"vol_num {f.vol_num} duplicated (row {seen[f.vol_num]})")
+            else:
+                seen[f.vol_num] = i
+            if f.arrival_time <= f.departure_time:
+                conflict(i, "arrival_time must be after departure_time")
+            if f.departure_time <= now:
+                conflict(i, "Departure date must be in the future")
+
+        for i, f in enumerate(flights):
+            if f.vol_num in existing_vols:
+                conflict(i, f"vol_num {f.vol_num} already exists")
+
+        for avion_id, indexes in self.by_aircraft.items():
+            if avion_id not in states:
+                for i in indexes:
+                    conflict(i, f"Aircraft {avion_id} not found")
+                continue
+            if states[avion_id] != "Ready":
+                for i in indexes:
+                    conflict(i, f"Aircraft {avion_id} is not available ({states[avion_id]})")
+
+            indexes.sort(key=lambda i: flights[i].departure_time)
+            latest = None  # flight of this file with the latest arrival so far
+            for i in indexes:
+                f = flights[i]
+                if latest is not None and latest.arrival_time > f.departure_time:
+                    conflict(i, f"Aircraft {avion_id} already flying vol_num {latest.vol_num} at that time")
+                if latest is None or f.arrival_time > latest.arrival_time:
+                    latest = f
+                for departure, arrival, vol_num in booked[avion_id]:
+                    if departure < f.arrival_time and arrival > f.departure_time:
+                        conflict(i, f"Aircraft {avion_id} already scheduled on vol_num {vol_num}")
+
+        if not all(r["ok"] for r in self.results):
+            return None
+        return [i for indexes in self.by_aircraft.values() for i in indexes]
+
+    def rows(self, order):
+        """Binds of FLIGHTS_INSERT_SQL, in insert order."""
+        return [
+            {
+                "vol_num": self.flights[i].vol_num,
+                "destination": self.flights[i].destination,
+                "departure_time": self.flights[i].departure_time,
+                "arrival_time": self.flights[i].arrival_time,
+                "avion_id": self.flights[i].avion_id,
+            }
+            for i in order
+        ]
+
+    def reject(self, order, errors):
+        """Rows Oracle rejected (batch errors) -> results."""
+        for error in errors:
+            self.conflict(order[error.offset], error.message, error.code)
+
+@invalidates("flight")
+def add_flights_bulk(conn: Connection, flights: List[FlightCreate]):
+    """
+    Imports a whole schedule in one transaction.
+    Every row is checked first (FlightSchedule.check) and all conflicts
+    are reported together. Only a conflict-free schedule is inserted,
+    grouped per aircraft, with array DML; any row Oracle still rejects
+    rolls the whole import back.
+    Returns one {index, id, ok, error_code, error} entry per input row.
+    """
+    schedule = FlightSchedule(flights)
+    if not schedule.flights:
+        return schedule.results
+
+    now = conn.execute(text("SELECT SYSDATE FROM dual")).scalar()
+
+    existing_vols = set()
+    for ids in in_chunks(schedule.vol_nums):
+        existing_vols.update(conn.execute(
+            text("SELECT vol_num FROM Flights WHERE vol_num IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids}
+        ).scalars())
+
+    states = {}
+    for ids in in_chunks(schedule.by_aircraft):
+        states.update(conn.execute(
+            text("SELECT avion_id, state FROM Aircrafts WHERE avion_id IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids}
+        ).all())
+
+    booked = defaultdict(list)
+    for ids in in_chunks(schedule.by_aircraft):
+        rows = conn.execute(
+            text(BOOKED_ROTATIONS_SQL.format(ids=":ids")).bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids, "window_start": schedule.window_start, "window_end": schedule.window_end}
+        )
+        for vol_num, avion_id, departure, arrival in rows:
+            booked[avion_id].append((departure, arrival, vol_num))
+
+    order = schedule.check(now, existing_vols, states, booked)
+    if order is None:
+        return schedule.results
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.executemany(FLIGHTS_INSERT_SQL, schedule.rows(order), batcherrors=True)
+        errors = cursor.getbatcherrors()
+        schedule.reject(order, errors)
+        if errors:
+            conn.connection.rollback()
+        else:
+            conn.connection.commit()
+    except Exception:
+        conn.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return schedule.results
+
+@invalidates("flight")
 def update_flight(conn: Connection, vol_num: int, flight: FlightUpdate):
     """
     Calls the DBA procedure to update flight info.
@@ -53,6 +249,7 @@ def update_flight(conn: Connection, vol_num: int, flight: FlightUpdate):
         }
     )
 
+@invalidates("flight")
 def delete_flight(conn: Connection, vol_num: int):
     """
     Calls the DBA procedure to delete a flight.
@@ -66,6 +263,7 @@ def delete_flight(conn: Connection, vol_num: int):
         {"vol_num": vol_num}
     )
 
+@invalidates("flight")
 def change_flight_state(conn: Connection, vol_num: int, new_state: str):
     """
     Calls the DBA procedure to change a flight's state.
@@ -79,6 +277,7 @@ def change_flight_state(conn: Connection, vol_num: int, new_state: str):
         {"vol_num": vol_num, "new_state": new_state}
     )
 
+@cached("flight")
 def get_flight_by_id(conn: Connection, vol_num: int):
     """
     Directly selects from Flights table for retrieval.
@@ -95,35 +294,165 @@ def get_flight_by_id(conn: Connection, vol_num: int):
 
     return result
 
-def get_all_flights(conn: Connection, skip: int = 0, limit: int = 100):
+FLIGHT_FIELDS = "vol_num, destination, departure_time, arrival_time, currentcapacity, state, avion_id"
+
+@cached("flight")
+def get_flights_by_ids(conn: Connection, vol_nums: tuple):
+    """
+    The flights of vol_nums in one query, as get_flight_by_id rows (in no
+    particular order, missing ones left out).
+    """
+    sql, params = select_by_ids_sql(FLIGHT_FIELDS, "Flights", "vol_num", vol_nums)
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
+
+FLIGHT_EXISTS_SQL = "SELECT vol_num FROM Flights WHERE vol_num = :vol_num"
+
+def manifest_sql(sort: str = "reservation_id", include_cancelled: bool = False) -> str:
+    """
+    Boarding manifest of :vol_num in one joined query: every reservation
+    with its seat, state, passenger and guardian (instead of one passenger
+    lookup per reservation). sort="seat" orders seats row by row through
+    Seat_Inventory.Seat_no (codes it does not know come last).
+    """
+    cancelled = "" if include_cancelled else "AND (r.State IS NULL OR r.State <> 'Cancelled')"
+    order_by = "s.Seat_no NULLS LAST, r.SeatCode" if sort == "seat" else "r.reservation_id"
+    return f"""
+        SELECT r.reservation_id, r.SeatCode seat, r.State state,
+               r.passenger_id, p.prenom, p.nom, p.NumPasseport num_passeport,
+               p.nationality, p.age,
+               r.guardian_id, g.prenom guardian_prenom, g.nom guardian_nom
+        FROM Reservations r
+        JOIN Passengers p ON p.passenger_id = r.passenger_id
+        LEFT JOIN Passengers g ON g.passenger_id = r.guardian_id
+        LEFT JOIN Seat_Inventory s ON s.vol_num = r.vol_num AND s.SeatCode = r.SeatCode
+        WHERE r.vol_num = :vol_num
+        {cancelled}
+        ORDER BY {order_by}
+    """
+
+SEAT_MAP_SQL = """
+    SELECT a.MaxCapacity, r.SeatCode
+    FROM Flights f
+    JOIN Aircrafts a ON a.Avion_id = f.Avion_id
+    LEFT JOIN Reservations r
+           ON r.vol_num = f.vol_num
+          AND (r.State IS NULL OR r.State <> 'Cancelled')
+    WHERE f.vol_num = :vol_num
+"""
+
+def seat_map(vol_num: int, rows):
+    """SEAT_MAP_SQL rows -> the seat map, or None if the flight does not exist."""
+    if not rows:
+        return None
+
+    capacity = int(rows[0][0])
+    taken = set()
+    unmapped = []
+    for _, code in rows:
+        if code is None:
+            continue
+        index = seat_index(code)
+        if index is None or index >= capacity:
+            unmapped.append(code)
+        else:
+            taken.add(index)
+
+    return {
+        "vol_num": vol_num,
+        "capacity": capacity,
+        "layout": config.SEAT_LETTERS,
+        "taken": len(taken),
+        "free": capacity - len(taken),
+        "bitmap": encode_bitmap(capacity, taken),
+        "unmapped": unmapped,
+    }
+
+def get_seat_map(conn: Connection, vol_num: int):
+    """
+    Taken/free state of every seat of the flight's aircraft, from one
+    joined query (no per-seat check_seat_reserved calls).
+    Returns None if the flight does not exist.
+    """
+    rows = conn.execute(text(SEAT_MAP_SQL), {"vol_num": vol_num}).fetchall()
+    return seat_map(vol_num, rows)
+
+# FlightFilter field -> condition (indexes: plsql/tables/FLIGHT_FILTER_INDEXES.sql)
+_FILTERS = (
+    ("state", "state = :state"),
+    ("destination", "destination = :destination"),
+    ("avion_id", "avion_id = :avion_id"),
+    ("departure_from", "departure_time >= :departure_from"),
+    ("departure_to", "departure_time < :departure_to"),
+)
+
+def flights_page_sql(filters: FlightFilter = None, after=None, limit: int = 100,
+                     sort: str = "vol_num", order: str = "asc", columns: str = "*"):
+    """
+    SQL and binds of one keyset page of flights matching filters, ordered
+    by sort then vol_num. after is the last vol_num of the previous page,
+    or its (sort value, vol_num) pair when sorting on another column.
+    Fetches limit + 1 rows: the extra one tells whether another page exists.
+    sort and order must be checked by the caller (FlightSort, SortOrder).
+    """
+    conditions, params = [], {"n": limit + 1}
+    for field, condition in _FILTERS:
+        value = getattr(filters, field) if filters is not None else None
+        if value is not None:
+            if hasattr(value, "tzinfo"):
+                value = value.replace(tzinfo=None)  # Oracle DATE has no time zone
+            conditions.append(condition)
+            params[field] = value
+
+    desc = " DESC" if order == "desc" else ""
+    op = "<" if desc else ">"
+    if sort == "vol_num":
+        if after is not None:
+            conditions.append(f"vol_num {op} :after")
+            params["after"] = after
+        order_by = f"vol_num{desc}"
+    else:
+        if after is not None:
+            # The leading range lets Oracle start the index scan at the cursor
+            conditions.append(f"{sort} {op}= :after_value"
+                              f" AND ({sort} {op} :after_value OR vol_num {op} :after_key)")
+            params["after_value"], params["after_key"] = after
+        order_by = f"{sort}{desc}, vol_num{desc}"
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT {columns} FROM flights
+        {where}
+        ORDER BY {order_by}
+        FETCH FIRST :n ROWS ONLY
+    """
+    return sql, params
+
+def next_flight_key(flights, sort: str = "vol_num"):
+    """Cursor key after the last flight of a page."""
+    last = flights[-1]
+    return last["vol_num"] if sort == "vol_num" else [last[sort], last["vol_num"]]
+
+def get_flights_version(conn: Connection, filters: FlightFilter = None, after=None, limit: int = 100,
+                        sort: str = "vol_num", order: str = "asc"):
+    """ETag version token of the page get_all_flights returns (etag.py)."""
+    sql, params = flights_page_sql(filters, after, limit, sort, order, "ORA_ROWSCN scn, vol_num")
+    return query_version(conn, sql, params, "vol_num")
+
+@cached("flight")
+def get_all_flights(conn: Connection, after=None, limit: int = 100,
+                    filters: FlightFilter = None, sort: str = "vol_num", order: str = "asc"):
+    """
+    Keyset page of flights matching filters, ordered by sort then vol_num
+    (see flights_page_sql).
+    Returns (rows, next_key); next_key is None on the last page.
+    """
     try:
-        # SQLAlchemy connection - use text() for SQL strings
-        
-        
-        query = text("""
-            SELECT * FROM flights 
-            ORDER BY vol_num 
-            OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
-        """)
-        
-        # Execute with parameters
-        result = conn.execute(query, {"skip": skip, "limit": limit})
-        
-        # Fetch all results
-        rows = result.fetchall()
-        
-        if not rows:
-            return []
-        
-        # Convert to list of dictionaries
-        flights = []
-        for row in rows:
-            # Convert row to dictionary
-            flight_dict = dict(row._mapping)  # Use _mapping for SQLAlchemy rows
-            flights.append(flight_dict)
-        
-        return flights
-        
+        sql, params = flights_page_sql(filters, after, limit, sort, order)
+        rows = conn.execute(text(sql), params).fetchall()
+        flights = [dict(row._mapping) for row in rows[:limit]]
+        next_key = next_flight_key(flights, sort) if len(rows) > limit else None
+        return flights, next_key
+
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
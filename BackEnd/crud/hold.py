@@ -0,0 +1,224 @@
+import uuid
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+import config
+from cache import invalidates
+from crud.reservation import INSERT_RESERVATION_SQL
+from models.hold import HoldPassenger
+from seats import seat_index
+
+# Seats a session may take: free, or held by a hold that has expired
+_AVAILABLE = "(Status = 'Free' OR (Status = 'Held' AND Hold_expires < SYSDATE))"
+
+HOLD_EXPIRES_SQL = "SELECT SYSDATE + :ttl / 86400 FROM dual"
+
+HOLD_SEAT_SQL = """
+    UPDATE Seat_Inventory
+    SET Status = 'Held', Hold_id = :hold_id, Hold_expires = :expires_at
+    WHERE ROWID = :rid
+"""
+
+HELD_SEATS_SQL = """
+    SELECT Seat_no, SeatCode
+    FROM Seat_Inventory
+    WHERE vol_num = :vol_num
+      AND Hold_id = :hold_id
+      AND Status = 'Held'
+      AND Hold_expires >= SYSDATE
+    ORDER BY Seat_no
+    FOR UPDATE
+"""
+
+BOOK_HELD_SEAT_SQL = """
+    UPDATE Seat_Inventory
+    SET Status = 'Booked', reservation_id = :reservation_id,
+        Hold_id = NULL, Hold_expires = NULL
+    WHERE vol_num = :vol_num
+      AND SeatCode = :seatcode
+      AND Hold_id = :hold_id
+"""
+
+RELEASE_HOLD_SQL = """
+    UPDATE Seat_Inventory
+    SET Status = 'Free', Hold_id = NULL, Hold_expires = NULL
+    WHERE vol_num = :vol_num
+      AND Hold_id = :hold_id
+      AND Status = 'Held'
+"""
+
+
+def _seat_numbers(codes: List[str]):
+    numbers = []
+    for code in codes:
+        index = seat_index(code)
+        if index is None:
+            raise HTTPException(status_code=400, detail=f"Invalid seat code: {code}")
+        numbers.append(index)
+    return numbers
+
+
+def available_seats_sql(vol_num: int, seats: List[str] = None, count: int = None):
+    """
+    SQL, binds and number of rows wanted to claim the given seats, or
+    the first `count` available ones.
+    """
+    sql = f"""
+        SELECT ROWID, SeatCode
+        FROM Seat_Inventory
+        WHERE vol_num = :vol_num
+          AND {_AVAILABLE}
+    """
+    params = {"vol_num": vol_num}
+    if seats:
+        numbers = _seat_numbers(seats)
+        binds = [f":s{i}" for i in range(len(numbers))]
+        sql += f" AND Seat_no IN ({', '.join(binds)})"
+        params.update({f"s{i}": n for i, n in enumerate(numbers)})
+        count = len(set(numbers))
+    sql += " ORDER BY Seat_no FOR UPDATE SKIP LOCKED"
+    return sql, params, count
+
+
+def not_available(seats: List[str], rows):
+    """409 raised when fewer seats than asked could be claimed."""
+    if seats:
+        got = {seat_index(code) for _, code in rows}
+        missing = [code for code in seats if seat_index(code) not in got]
+        return HTTPException(status_code=409, detail={
+            "message": "Some seats are not available", "seats": missing
+        })
+    return HTTPException(status_code=409, detail=f"Only {len(rows)} seats available")
+
+
+def hold_result(hold_id: str, vol_num: int, rows, expires_at):
+    return {
+        "hold_id": hold_id,
+        "vol_num": vol_num,
+        "seats": [code for _, code in rows],
+        "expires_at": expires_at,
+    }
+
+
+def reservation_rows(vol_num: int, held: dict, passengers: List[HoldPassenger]):
+    """
+    Reservation rows for a hold ({Seat_no: SeatCode}): passengers without
+    a seatcode get the remaining held seats in order.
+    Raises 410 if the hold expired or does not exist.
+    """
+    if not held:
+        raise HTTPException(status_code=410, detail="Hold not found or expired")
+    if len(passengers) != len(held):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Hold has {len(held)} seats, got {len(passengers)} passengers"
+        )
+
+    free = dict(held)
+    for p in passengers:
+        if p.seatcode is not None:
+            index = seat_index(p.seatcode)
+            if index not in free:
+                raise HTTPException(status_code=400, detail=f"Seat {p.seatcode} is not part of this hold")
+            del free[index]
+    remaining = iter(sorted(free))
+
+    rows = []
+    for p in passengers:
+        index = seat_index(p.seatcode) if p.seatcode is not None else next(remaining)
+        rows.append({
+            "reservation_id": p.reservation_id,
+            "passenger_id": p.passenger_id,
+            "vol_num": vol_num,
+            "seatcode": held[index],
+            "state": "Confirmed",
+            "guardian_id": p.guardian_id,
+        })
+    return rows
+
+
+def booked_seat_rows(vol_num: int, hold_id: str, rows):
+    """Binds of BOOK_HELD_SEAT_SQL for the reservation rows of a hold."""
+    return [
+        {"reservation_id": r["reservation_id"], "vol_num": vol_num,
+         "seatcode": r["seatcode"], "hold_id": hold_id}
+        for r in rows
+    ]
+
+
+def confirmed(rows):
+    return [{"reservation_id": r["reservation_id"], "seatcode": r["seatcode"]} for r in rows]
+
+
+@invalidates("flight")
+def hold_seats(conn: Connection, vol_num: int, seats: List[str] = None, count: int = None):
+    """
+    Holds the given seats, or the first `count` available ones, for
+    HOLD_TTL seconds.
+    Seat rows are claimed with FOR UPDATE SKIP LOCKED: rows another
+    session is claiming right now are skipped instead of waited on, so
+    concurrent bookers on one flight never queue behind each other and
+    the Flights row is not touched at all.
+    Raises 409 (and holds nothing) when not enough seats are available.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        sql, params, count = available_seats_sql(vol_num, seats, count)
+        cursor.arraysize = count
+        cursor.execute(sql, params)
+        rows = cursor.fetchmany(count)
+        if len(rows) < count:
+            conn.connection.rollback()
+            raise not_available(seats, rows)
+
+        cursor.execute(HOLD_EXPIRES_SQL, {"ttl": config.HOLD_TTL})
+        expires_at, = cursor.fetchone()
+        hold_id = uuid.uuid4().hex
+        cursor.executemany(
+            HOLD_SEAT_SQL,
+            [{"hold_id": hold_id, "expires_at": expires_at, "rid": rid} for rid, _ in rows]
+        )
+        conn.connection.commit()
+    except Exception:
+        conn.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return hold_result(hold_id, vol_num, rows, expires_at)
+
+
+@invalidates("flight")
+def confirm_hold(conn: Connection, vol_num: int, hold_id: str, passengers: List[HoldPassenger]):
+    """
+    Turns a live hold into reservations, one per held seat, in a single
+    array insert. The seats are marked Booked for their reservation just
+    before, since the triggers reject a booking on a seat that is still held.
+    Passengers without a seatcode get the remaining held seats in order.
+    Raises 410 if the hold expired or does not exist.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(HELD_SEATS_SQL, {"vol_num": vol_num, "hold_id": hold_id})
+        rows = reservation_rows(vol_num, dict(cursor.fetchall()), passengers)
+        cursor.executemany(BOOK_HELD_SEAT_SQL, booked_seat_rows(vol_num, hold_id, rows))
+        cursor.executemany(INSERT_RESERVATION_SQL, rows)
+        conn.connection.commit()
+    except Exception:
+        conn.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return confirmed(rows)
+
+
+@invalidates("flight")
+def release_hold(conn: Connection, vol_num: int, hold_id: str):
+    """Gives the held seats back. Returns how many seats were released."""
+    result = conn.execute(text(RELEASE_HOLD_SQL), {"vol_num": vol_num, "hold_id": hold_id})
+    conn.commit()
+    return result.rowcount
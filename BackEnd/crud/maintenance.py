@@ -3,7 +3,9 @@ from sqlalchemy.engine import Connection
 from models.maintenance import MaintenanceCreate, MaintenanceUpdate
 import oracledb as cx_Oracle
 from typing import List
+from cache import invalidates
 
+@invalidates("aircraft")
 def add_maintenance(conn: Connection, maintenance: MaintenanceCreate):
     conn.execute(
         text("""
@@ -22,6 +24,7 @@ def add_maintenance(conn: Connection, maintenance: MaintenanceCreate):
         }
     )
 
+@invalidates("aircraft")
 def update_maintenance(conn: Connection, maintenance_id: int, maintenance: MaintenanceUpdate):
     conn.execute(
         text("""
@@ -42,6 +45,7 @@ def update_maintenance(conn: Connection, maintenance_id: int, maintenance: Maint
         }
     )
 
+@invalidates("aircraft")
 def delete_maintenance(conn: Connection, maintenance_id: int):
     conn.execute(
         text("""
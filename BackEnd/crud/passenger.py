@@ -3,7 +3,11 @@ from sqlalchemy.engine import Connection
 from models.passenger import PassengerCreate, PassengerUpdate
 from fastapi import HTTPException
 import oracledb
+from typing import List
+from cache import cached, invalidates
+from multiget import select_by_ids_sql
 
+@invalidates("passenger")
 def add_passenger(conn: Connection, passenger: PassengerCreate):
     conn.execute(
         text("""
@@ -30,6 +34,47 @@ def add_passenger(conn: Connection, passenger: PassengerCreate):
         }
     )
 
+PASSENGERS_INSERT_SQL = """
+    INSERT INTO passengers
+        (Passenger_id, prenom, nom, NumPasseport, Contact, Nationality, Age)
+    VALUES
+        (:passenger_id, :prenom, :nom, :num_passeport, :contact, :nationality, :age)
+"""
+
+def bulk_results(passengers: List[PassengerCreate], errors):
+    """One {index, id, ok, error_code, error} entry per row, from the batch errors."""
+    results = [
+        {"index": i, "id": p.passenger_id, "ok": True, "error_code": None, "error": None}
+        for i, p in enumerate(passengers)
+    ]
+    for error in errors:
+        row = results[error.offset]
+        row["ok"] = False
+        row["error_code"] = error.code
+        row["error"] = error.message
+    return results
+
+@invalidates("passenger")
+def add_passengers_bulk(conn: Connection, passengers: List[PassengerCreate]):
+    """
+    Inserts one chunk of passengers with array DML and commits it.
+    batcherrors lets Oracle reject single rows (duplicate id/passport,
+    trg_passenger_validation) without dropping the rest of the chunk.
+    Returns one {index, id, ok, error_code, error} entry per input row.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.executemany(PASSENGERS_INSERT_SQL, [p.model_dump() for p in passengers], batcherrors=True)
+        results = bulk_results(passengers, cursor.getbatcherrors())
+        conn.connection.commit()
+    except Exception:
+        conn.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return results
+
+@invalidates("passenger")
 def update_passenger(conn: Connection, passenger_id: int, passenger: PassengerUpdate):
     conn.execute(
         text("""
@@ -54,6 +99,7 @@ def update_passenger(conn: Connection, passenger_id: int, passenger: PassengerUp
         }
     )
 
+@invalidates("passenger")
 def delete_passenger(conn: Connection, passenger_id: int):
     conn.execute(
         text("""
@@ -64,6 +110,7 @@ def delete_passenger(conn: Connection, passenger_id: int):
         {"p_id": passenger_id}
     )
 
+@cached("passenger")
 def get_passenger_by_passport(conn: Connection, num_passeport: int):
     """Version simple et efficace"""
     try:
@@ -115,6 +162,7 @@ def get_passenger_by_passport(conn: Connection, num_passeport: int):
         return None
     
 
+@cached("passenger")
 def get_passenger_by_id(conn: Connection, passenger_id: int):
     """Version avec requête SQL directe"""
     try:
@@ -163,34 +211,101 @@ def get_passenger_by_id(conn: Connection, passenger_id: int):
         print(f"❌ Error: {e}")
         return None   
 
-def get_all_passengers(conn: Connection, skip: int = 0, limit: int = 100):
+PASSENGER_FIELDS = "passenger_id, prenom, nom, numpasseport num_passeport, contact, nationality, age"
+
+@cached("passenger")
+def get_passengers_by_ids(conn: Connection, passenger_ids: tuple):
+    """
+    The passengers of passenger_ids in one query, as get_passenger_by_id
+    returns them (in no particular order, missing ones left out).
+    """
+    sql, params = select_by_ids_sql(PASSENGER_FIELDS, "Passengers", "passenger_id", passenger_ids)
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
+
+
+def _name_prefix(text: str) -> str:
+    # LIKE ... ESCAPE '\': the name is matched literally, as a prefix
+    for char in ("\\", "%", "_"):
+        text = text.replace(char, "\\" + char)
+    return text.upper() + "%"
+
+
+def passenger_search_sql(nom: str = None, prenom: str = None, num_passeport: int = None,
+                         nationality: str = None, limit: int = 20):
+    """
+    SQL and binds of the first limit passengers whose nom / prenom start
+    with the given text (case-insensitive) and whose NumPasseport /
+    Nationality are equal, ordered by name (by prenom first when prenom
+    is the only name or nationality given). The ORDER BY is the key of an
+    index of plsql/tables/PASSENGER_SEARCH_INDEXES.sql whose leading
+    column is the prefix or equality searched, so Oracle reads that index
+    range in order and stops once limit rows matched, without a sort.
+    """
+    conditions, params = [], {"n": limit}
+    if nom:
+        conditions.append("UPPER(nom) LIKE :nom ESCAPE '\\'")
+        params["nom"] = _name_prefix(nom)
+    if prenom:
+        conditions.append("UPPER(prenom) LIKE :prenom ESCAPE '\\'")
+        params["prenom"] = _name_prefix(prenom)
+    if num_passeport is not None:
+        conditions.append("NumPasseport = :num_passeport")
+        params["num_passeport"] = num_passeport
+    if nationality:
+        conditions.append("Nationality = :nationality")
+        params["nationality"] = nationality
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    if prenom and not nom and not nationality:
+        order_by = "UPPER(prenom), UPPER(nom), passenger_id"  # ix_passengers_upper_prenom
+    else:
+        order_by = "UPPER(nom), UPPER(prenom), passenger_id"
+    sql = f"""
+        SELECT * FROM passengers
+        {where}
+        ORDER BY {order_by}
+        FETCH FIRST :n ROWS ONLY
+    """
+    return sql, params
+
+
+@cached("passenger")
+def search_passengers(conn: Connection, nom: str = None, prenom: str = None, num_passeport: int = None,
+                      nationality: str = None, limit: int = 20):
+    """Passengers matching the search, see passenger_search_sql."""
+    sql, params = passenger_search_sql(nom, prenom, num_passeport, nationality, limit)
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
+
+
+@cached("passenger")
+def get_all_passengers(conn: Connection, after: int = None, limit: int = 100):
+    """
+    Keyset page of passengers ordered by passenger_id: rows with passenger_id > after.
+    Returns (rows, next_key); next_key is None on the last page.
+    """
     try:
-        from sqlalchemy import text
-        
-        query = text("""
-            SELECT * FROM passengers 
-            ORDER BY passenger_id 
-            OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
-        """)
-        
-        # Execute with parameters
-        result = conn.execute(query, {"skip": skip, "limit": limit})
-        
-        # Fetch all results
-        rows = result.fetchall()
-        
-        if not rows:
-            return []
-        
-        # Convert to list of dictionaries
-        passengers = []
-        for row in rows:
-            # Convert row to dictionary
-            passenger_dict = dict(row._mapping)  # Use _mapping for SQLAlchemy rows
-            passengers.append(passenger_dict)
-        
-        return passengers
-        
+        if after is None:
+            query = text("""
+                SELECT * FROM passengers
+                ORDER BY passenger_id
+                FETCH FIRST :n ROWS ONLY
+            """)
+            params = {"n": limit + 1}
+        else:
+            query = text("""
+                SELECT * FROM passengers
+                WHERE passenger_id > :after
+                ORDER BY passenger_id
+                FETCH FIRST :n ROWS ONLY
+            """)
+            params = {"after": after, "n": limit + 1}
+
+        # One extra row tells us whether another page exists
+        rows = conn.execute(query, params).fetchall()
+        passengers = [dict(row._mapping) for row in rows[:limit]]
+        next_key = passengers[-1]["passenger_id"] if len(rows) > limit else None
+        return passengers, next_key
+
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -3,7 +3,12 @@ from sqlalchemy.engine import Connection
 from models.reservation import ReservationCreate, ReservationUpdate
 import oracledb as cx_Oracle
 from fastapi import HTTPException
+from typing import List
+import config
+from cache import invalidates
+from oracle_errors import unique_constraint_message
 
+@invalidates("flight")
 def add_reservation(conn: Connection, reservation: ReservationCreate):
     conn.execute(
         text("""
@@ -28,6 +33,64 @@ def add_reservation(conn: Connection, reservation: ReservationCreate):
         }
     )
 
+INSERT_RESERVATION_SQL = """
+    INSERT INTO Reservations
+        (reservation_id, Passenger_id, vol_num, SeatCode, State, Guardian_id)
+    VALUES
+        (:reservation_id, :passenger_id, :vol_num, :seatcode, :state, :guardian_id)
+"""
+
+def bulk_results(reservations: List[ReservationCreate]):
+    return [
+        {"index": i, "id": r.reservation_id, "ok": True, "error_code": None, "error": None}
+        for i, r in enumerate(reservations)
+    ]
+
+def reject(results, index, error):
+    row = results[index]
+    row["ok"] = False
+    row["error_code"] = error.code
+    row["error"] = unique_constraint_message(error.message) or error.message
+
+@invalidates("flight")
+def add_reservations_bulk(conn: Connection, reservations: List[ReservationCreate]):
+    """
+    Inserts many reservations with array DML, BULK_BATCH_SIZE rows per
+    round trip. batcherrors keeps going past bad rows, so the reservation
+    triggers (seat taken, flight full, guardian rules) reject rows one by
+    one instead of failing the whole batch.
+    The guardian check of trg_reservation_guardian runs once per statement;
+    when it rejects a chunk, that chunk is replayed row by row to find
+    the offending rows.
+    Returns one {index, id, ok, error_code, error} entry per input row.
+    """
+    sql = INSERT_RESERVATION_SQL
+    cursor = conn.connection.cursor()
+    results = bulk_results(reservations)
+    try:
+        for start in range(0, len(reservations), config.BULK_BATCH_SIZE):
+            rows = [r.model_dump() for r in reservations[start:start + config.BULK_BATCH_SIZE]]
+            try:
+                cursor.executemany(sql, rows, batcherrors=True)
+            except cx_Oracle.DatabaseError:
+                # Statement-level rejection: the whole chunk was rolled back
+                for offset, row in enumerate(rows):
+                    try:
+                        cursor.execute(sql, row)
+                    except cx_Oracle.DatabaseError as e:
+                        reject(results, start + offset, e.args[0])
+                continue
+            for error in cursor.getbatcherrors():
+                reject(results, start + error.offset, error)
+        conn.connection.commit()
+    except Exception:
+        conn.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return results
+
+@invalidates("flight")
 def update_reservation(conn: Connection, reservation_id: int, reservation: ReservationUpdate):
     conn.execute(
         text("""
@@ -48,6 +111,7 @@ def update_reservation(conn: Connection, reservation_id: int, reservation: Reser
         }
     )
 
+@invalidates("flight")
 def delete_reservation(conn: Connection, reservation_id: int):
     conn.execute(
         text("""
@@ -80,34 +144,34 @@ def get_reservation_by_passport(conn: Connection, num_passeport: int):
         "guardian_id": guardian_id.getvalue(),
     }
 
-def get_all_reservations(conn: Connection, skip: int = 0, limit: int = 100):
+def get_all_reservations(conn: Connection, after: int = None, limit: int = 100):
+    """
+    Keyset page of reservations ordered by reservation_id: rows with reservation_id > after.
+    Returns (rows, next_key); next_key is None on the last page.
+    """
     try:
-        from sqlalchemy import text
-        
-        query = text("""
-            SELECT * FROM reservations 
-            ORDER BY reservation_id 
-            OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
-        """)
-        
-        # Exécuter la requête
-        result = conn.execute(query, {"skip": skip, "limit": limit})
-        
-        # Récupérer tous les résultats
-        rows = result.fetchall()
-        
-        if not rows:
-            return []  # Liste vide
-        
-        # Convertir chaque ligne en dictionnaire
-        reservations = []
-        for row in rows:
-            # row._mapping convertit la ligne SQLAlchemy en dictionnaire
-            reservation_dict = dict(row._mapping)
-            reservations.append(reservation_dict)
-        
-        return reservations  # Liste de dictionnaires
-        
+        if after is None:
+            query = text("""
+                SELECT * FROM reservations
+                ORDER BY reservation_id
+                FETCH FIRST :n ROWS ONLY
+            """)
+            params = {"n": limit + 1}
+        else:
+            query = text("""
+                SELECT * FROM reservations
+                WHERE reservation_id > :after
+                ORDER BY reservation_id
+                FETCH FIRST :n ROWS ONLY
+            """)
+            params = {"after": after, "n": limit + 1}
+
+        # One extra row tells us whether another page exists
+        rows = conn.execute(query, params).fetchall()
+        reservations = [dict(row._mapping) for row in rows[:limit]]
+        next_key = reservations[-1]["reservation_id"] if len(rows) > limit else None
+        return reservations, next_key
+
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
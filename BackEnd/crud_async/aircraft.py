@@ -0,0 +1,103 @@
+import oracledb
+from models.aircraft import AircraftCreate, AircraftUpdate
+from cache import cached, invalidates
+from crud.aircraft import AIRCRAFT_FIELDS
+from multiget import select_by_ids_sql
+
+# Oracle column name -> AircraftOut field
+AIRCRAFT_COLUMNS = {
+    "AVION_ID": "avion_id",
+    "MODELE": "modele",
+    "MAXCAPACITY": "max_capacity",
+    "STATE": "state",
+}
+
+
+@invalidates("aircraft")
+async def add_aircraft(conn: oracledb.AsyncConnection, aircraft: AircraftCreate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "add_new_aircraft",
+            [
+                aircraft.avion_id,
+                aircraft.modele,
+                aircraft.max_capacity,
+                aircraft.state
+            ]
+        )
+    await conn.commit()
+
+
+@invalidates("aircraft")
+async def update_aircraft(conn: oracledb.AsyncConnection, avion_id: int, aircraft: AircraftUpdate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "update_aircraft",
+            [
+                avion_id,
+                aircraft.modele,
+                aircraft.max_capacity,
+                aircraft.state
+            ]
+        )
+
+
+@invalidates("aircraft")
+async def delete_aircraft(conn: oracledb.AsyncConnection, avion_id: int):
+    with conn.cursor() as cursor:
+        await cursor.callproc("delete_aircraft", [avion_id])
+
+
+@cached("aircraft")
+async def get_aircraft_by_id(conn: oracledb.AsyncConnection, avion_id: int):
+    with conn.cursor() as cursor:
+        out_modele = cursor.var(str)
+        out_max_capacity = cursor.var(int)
+        out_state = cursor.var(str)
+
+        await cursor.callproc(
+            "select_aircraft_by_id",
+            [
+                avion_id,
+                out_modele,
+                out_max_capacity,
+                out_state
+            ]
+        )
+
+        return {
+            "avion_id": avion_id,
+            "modele": out_modele.getvalue(),
+            "max_capacity": out_max_capacity.getvalue(),
+            "state": out_state.getvalue(),
+        }
+
+
+@cached("aircraft")
+async def get_aircrafts(conn: oracledb.AsyncConnection):
+    with conn.cursor() as cursor:
+        ref_cursor_var = cursor.var(oracledb.DB_TYPE_CURSOR)
+        await cursor.execute("""
+            BEGIN
+                :result := AE.get_all_aircrafts_infos();
+            END;
+        """, result=ref_cursor_var)
+
+        result_cursor = ref_cursor_var.getvalue()
+        rows = await result_cursor.fetchall()
+        fields = [
+            AIRCRAFT_COLUMNS.get(desc[0], desc[0].lower())
+            for desc in result_cursor.description
+        ]
+        result_cursor.close()
+        return [dict(zip(fields, row)) for row in rows]
+
+
+@cached("aircraft")
+async def get_aircrafts_by_ids(conn: oracledb.AsyncConnection, avion_ids: tuple):
+    sql, params = select_by_ids_sql(AIRCRAFT_FIELDS, "Aircrafts", "avion_id", avion_ids)
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,183 @@
+import oracledb
+from collections import defaultdict
+from typing import List
+from models.flight import FlightCreate, FlightUpdate, FlightFilter
+from cache import cached, invalidates
+from crud.flight import (
+    BOOKED_ROTATIONS_SQL, FLIGHT_EXISTS_SQL, FLIGHT_FIELDS, FLIGHTS_INSERT_SQL, SEAT_MAP_SQL, FlightSchedule,
+    in_chunks, flights_page_sql, manifest_sql, next_flight_key, seat_map,
+)
+from etag import query_version_async
+from multiget import select_by_ids_sql
+
+
+@invalidates("flight")
+async def add_flight(conn: oracledb.AsyncConnection, flight: FlightCreate):
+    """
+    Calls the DBA procedure to add a new flight.
+    """
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "add_new_flight",
+            [
+                flight.vol_num,
+                flight.destination,
+                flight.departure_time,
+                flight.arrival_time,
+                flight.avion_id
+            ]
+        )
+
+
+def _in_list(ids):
+    binds = ", ".join(f":id{i}" for i in range(len(ids)))
+    return f"({binds})", {f"id{i}": value for i, value in enumerate(ids)}
+
+
+@invalidates("flight")
+async def add_flights_bulk(conn: oracledb.AsyncConnection, flights: List[FlightCreate]):
+    """
+    Imports a whole schedule in one transaction (see crud.flight.add_flights_bulk).
+    Returns one {index, id, ok, error_code, error} entry per input row.
+    """
+    schedule = FlightSchedule(flights)
+    if not schedule.flights:
+        return schedule.results
+
+    with conn.cursor() as cursor:
+        await cursor.execute("SELECT SYSDATE FROM dual")
+        now, = await cursor.fetchone()
+
+        existing_vols = set()
+        for ids in in_chunks(schedule.vol_nums):
+            in_list, params = _in_list(ids)
+            await cursor.execute(f"SELECT vol_num FROM Flights WHERE vol_num IN {in_list}", params)
+            existing_vols.update(vol_num for vol_num, in await cursor.fetchall())
+
+        states = {}
+        for ids in in_chunks(schedule.by_aircraft):
+            in_list, params = _in_list(ids)
+            await cursor.execute(f"SELECT avion_id, state FROM Aircrafts WHERE avion_id IN {in_list}", params)
+            states.update(await cursor.fetchall())
+
+        booked = defaultdict(list)
+        for ids in in_chunks(schedule.by_aircraft):
+            in_list, params = _in_list(ids)
+            params.update(window_start=schedule.window_start, window_end=schedule.window_end)
+            await cursor.execute(BOOKED_ROTATIONS_SQL.format(ids=in_list), params)
+            for vol_num, avion_id, departure, arrival in await cursor.fetchall():
+                booked[avion_id].append((departure, arrival, vol_num))
+
+        order = schedule.check(now, existing_vols, states, booked)
+        if order is None:
+            return schedule.results
+
+        try:
+            await cursor.executemany(FLIGHTS_INSERT_SQL, schedule.rows(order), batcherrors=True)
+            errors = cursor.getbatcherrors()
+            schedule.reject(order, errors)
+            if errors:
+                await conn.rollback()
+            else:
+                await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+    return schedule.results
+
+
+@invalidates("flight")
+async def update_flight(conn: oracledb.AsyncConnection, vol_num: int, flight: FlightUpdate):
+    """
+    Calls the DBA procedure to update flight info.
+    Only destination, departure_time, and arrival_time are handled by the DBA procedure.
+    """
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "update_flight",
+            [
+                vol_num,
+                flight.destination,
+                flight.departure_time,
+                flight.arrival_time
+            ]
+        )
+
+
+@invalidates("flight")
+async def delete_flight(conn: oracledb.AsyncConnection, vol_num: int):
+    """
+    Calls the DBA procedure to delete a flight.
+    """
+    with conn.cursor() as cursor:
+        await cursor.callproc("delete_flight", [vol_num])
+
+
+@invalidates("flight")
+async def change_flight_state(conn: oracledb.AsyncConnection, vol_num: int, new_state: str):
+    """
+    Calls the DBA procedure to change a flight's state.
+    """
+    with conn.cursor() as cursor:
+        await cursor.callproc("change_flight_state", [vol_num, new_state])
+
+
+@cached("flight")
+async def get_flight_by_id(conn: oracledb.AsyncConnection, vol_num: int):
+    """
+    Directly selects from Flights table for retrieval.
+    """
+    with conn.cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT vol_num, destination, departure_time, arrival_time,
+                   currentcapacity, state, avion_id
+            FROM Flights
+            WHERE vol_num = :vol_num
+            """,
+            {"vol_num": vol_num}
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        columns = [col[0].lower() for col in cursor.description]
+        return dict(zip(columns, row))
+
+
+async def get_flights_version(conn: oracledb.AsyncConnection, filters: FlightFilter = None, after=None,
+                              limit: int = 100, sort: str = "vol_num", order: str = "asc"):
+    sql, params = flights_page_sql(filters, after, limit, sort, order, "ORA_ROWSCN scn, vol_num")
+    return await query_version_async(conn, sql, params, "vol_num")
+
+
+@cached("flight")
+async def get_all_flights(conn: oracledb.AsyncConnection, after=None, limit: int = 100,
+                          filters: FlightFilter = None, sort: str = "vol_num", order: str = "asc"):
+    sql, params = flights_page_sql(filters, after, limit, sort, order)
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        flights = [dict(zip(columns, row)) for row in rows[:limit]]
+        next_key = next_flight_key(flights, sort) if len(rows) > limit else None
+        return flights, next_key
+
+
+@cached("flight")
+async def get_flights_by_ids(conn: oracledb.AsyncConnection, vol_nums: tuple):
+    sql, params = select_by_ids_sql(FLIGHT_FIELDS, "Flights", "vol_num", vol_nums)
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+
+async def get_seat_map(conn: oracledb.AsyncConnection, vol_num: int):
+    """
+    Taken/free state of every seat of the flight's aircraft, from one
+    joined query. Returns None if the flight does not exist.
+    """
+    with conn.cursor() as cursor:
+        await cursor.execute(SEAT_MAP_SQL, {"vol_num": vol_num})
+        return seat_map(vol_num, await cursor.fetchall())
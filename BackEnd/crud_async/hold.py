@@ -0,0 +1,76 @@
+import uuid
+from typing import List
+
+import oracledb
+
+import config
+from cache import invalidates
+from crud.hold import (
+    BOOK_HELD_SEAT_SQL, HELD_SEATS_SQL, HOLD_EXPIRES_SQL, HOLD_SEAT_SQL, RELEASE_HOLD_SQL,
+    available_seats_sql, booked_seat_rows, confirmed, hold_result, not_available, reservation_rows,
+)
+from crud.reservation import INSERT_RESERVATION_SQL
+from models.hold import HoldPassenger
+
+
+@invalidates("flight")
+async def hold_seats(conn: oracledb.AsyncConnection, vol_num: int, seats: List[str] = None, count: int = None):
+    """
+    Holds the given seats, or the first `count` available ones, for
+    HOLD_TTL seconds (see crud.hold.hold_seats).
+    Raises 409 (and holds nothing) when not enough seats are available.
+    """
+    try:
+        with conn.cursor() as cursor:
+            sql, params, count = available_seats_sql(vol_num, seats, count)
+            cursor.arraysize = count
+            await cursor.execute(sql, params)
+            rows = await cursor.fetchmany(count)
+            if len(rows) < count:
+                raise not_available(seats, rows)
+
+            await cursor.execute(HOLD_EXPIRES_SQL, {"ttl": config.HOLD_TTL})
+            expires_at, = await cursor.fetchone()
+            hold_id = uuid.uuid4().hex
+            await cursor.executemany(
+                HOLD_SEAT_SQL,
+                [{"hold_id": hold_id, "expires_at": expires_at, "rid": rid} for rid, _ in rows]
+            )
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+
+    return hold_result(hold_id, vol_num, rows, expires_at)
+
+
+@invalidates("flight")
+async def confirm_hold(conn: oracledb.AsyncConnection, vol_num: int, hold_id: str,
+                       passengers: List[HoldPassenger]):
+    """
+    Turns a live hold into reservations, one per held seat
+    (see crud.hold.confirm_hold).
+    Raises 410 if the hold expired or does not exist.
+    """
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(HELD_SEATS_SQL, {"vol_num": vol_num, "hold_id": hold_id})
+            rows = reservation_rows(vol_num, dict(await cursor.fetchall()), passengers)
+            await cursor.executemany(BOOK_HELD_SEAT_SQL, booked_seat_rows(vol_num, hold_id, rows))
+            await cursor.executemany(INSERT_RESERVATION_SQL, rows)
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+
+    return confirmed(rows)
+
+
+@invalidates("flight")
+async def release_hold(conn: oracledb.AsyncConnection, vol_num: int, hold_id: str):
+    """Gives the held seats back. Returns how many seats were released."""
+    with conn.cursor() as cursor:
+        await cursor.execute(RELEASE_HOLD_SQL, {"vol_num": vol_num, "hold_id": hold_id})
+        released = cursor.rowcount
+    await conn.commit()
+    return released
@@ -0,0 +1,65 @@
+import oracledb
+from models.maintenance import MaintenanceCreate, MaintenanceUpdate
+from cache import invalidates
+
+
+@invalidates("aircraft")
+async def add_maintenance(conn: oracledb.AsyncConnection, maintenance: MaintenanceCreate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "add_new_maintenance",
+            [
+                maintenance.avion_id,
+                maintenance.operation_date,
+                maintenance.typee
+            ]
+        )
+
+
+@invalidates("aircraft")
+async def update_maintenance(conn: oracledb.AsyncConnection, maintenance_id: int, maintenance: MaintenanceUpdate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "update_maintenance",
+            [
+                maintenance_id,
+                maintenance.operation_date,
+                maintenance.typee,
+                maintenance.state
+            ]
+        )
+
+
+@invalidates("aircraft")
+async def delete_maintenance(conn: oracledb.AsyncConnection, maintenance_id: int):
+    with conn.cursor() as cursor:
+        await cursor.callproc("delete_maintenance", [maintenance_id])
+
+
+async def list_maintenance(conn: oracledb.AsyncConnection):
+    with conn.cursor() as cursor:
+        out_cursor = cursor.var(oracledb.DB_TYPE_CURSOR)
+        await cursor.callproc("list_maintenance", [out_cursor])
+
+        ref_cursor = out_cursor.getvalue()
+        rows = await ref_cursor.fetchall()
+        columns = [col[0].lower() for col in ref_cursor.description]
+        ref_cursor.close()
+        return rows, columns
+
+
+async def get_maintenance_by_id(conn: oracledb.AsyncConnection, maintenance_id: int):
+    with conn.cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT maintenance_id, avion_id, operationdate, typee, state
+            FROM Maintenance
+            WHERE maintenance_id = :id
+            """,
+            {"id": maintenance_id}
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return [], []
+        columns = [col[0].lower() for col in cursor.description]
+        return [row], columns
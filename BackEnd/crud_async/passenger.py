@@ -0,0 +1,175 @@
+import oracledb
+from typing import List
+from models.passenger import PassengerCreate, PassengerUpdate
+from cache import cached, invalidates
+from crud.passenger import PASSENGER_FIELDS, PASSENGERS_INSERT_SQL, bulk_results, passenger_search_sql
+from multiget import select_by_ids_sql
+
+
+@invalidates("passenger")
+async def add_passenger(conn: oracledb.AsyncConnection, passenger: PassengerCreate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "add_new_passenger",
+            [
+                passenger.passenger_id,
+                passenger.prenom,
+                passenger.nom,
+                passenger.num_passeport,
+                passenger.contact,
+                passenger.nationality,
+                passenger.age
+            ]
+        )
+
+
+@invalidates("passenger")
+async def add_passengers_bulk(conn: oracledb.AsyncConnection, passengers: List[PassengerCreate]):
+    """
+    Inserts one chunk of passengers with array DML and commits it
+    (see crud.passenger.add_passengers_bulk).
+    """
+    try:
+        with conn.cursor() as cursor:
+            await cursor.executemany(PASSENGERS_INSERT_SQL, [p.model_dump() for p in passengers],
+                                     batcherrors=True)
+            results = bulk_results(passengers, cursor.getbatcherrors())
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+    return results
+
+
+@invalidates("passenger")
+async def update_passenger(conn: oracledb.AsyncConnection, passenger_id: int, passenger: PassengerUpdate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "update_passenger",
+            [
+                passenger_id,
+                passenger.prenom,
+                passenger.nom,
+                passenger.contact,
+                passenger.nationality,
+                passenger.age
+            ]
+        )
+
+
+@invalidates("passenger")
+async def delete_passenger(conn: oracledb.AsyncConnection, passenger_id: int):
+    with conn.cursor() as cursor:
+        await cursor.callproc("delete_passenger", [passenger_id])
+
+
+@cached("passenger")
+async def get_passenger_by_passport(conn: oracledb.AsyncConnection, num_passeport: int):
+    with conn.cursor() as cursor:
+        out_id = cursor.var(int)
+        out_prenom = cursor.var(str)
+        out_nom = cursor.var(str)
+        out_contact = cursor.var(str)
+        out_nationality = cursor.var(str)
+        out_age = cursor.var(int)
+
+        try:
+            await cursor.callproc("get_passenger_by_passport", [
+                num_passeport,
+                out_id,
+                out_prenom,
+                out_nom,
+                out_contact,
+                out_nationality,
+                out_age
+            ])
+        except oracledb.DatabaseError as db_err:
+            error_obj, = db_err.args
+            if error_obj.code == 20001:  # Passager non trouvé
+                return None
+            raise
+
+        return {
+            "passenger_id": out_id.getvalue(),
+            "prenom": out_prenom.getvalue(),
+            "nom": out_nom.getvalue(),
+            "contact": out_contact.getvalue(),
+            "nationality": out_nationality.getvalue(),
+            "age": out_age.getvalue()
+        }
+
+
+@cached("passenger")
+async def get_passenger_by_id(conn: oracledb.AsyncConnection, passenger_id: int):
+    with conn.cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT passenger_id, prenom, nom, numpasseport,
+                   contact, nationality, age
+            FROM passengers
+            WHERE passenger_id = :passenger_id
+            """,
+            {"passenger_id": passenger_id}
+        )
+        result = await cursor.fetchone()
+        if result is None:
+            return None
+        return {
+            "passenger_id": result[0],
+            "prenom": result[1],
+            "nom": result[2],
+            "num_passeport": result[3],
+            "contact": result[4],
+            "nationality": result[5],
+            "age": result[6]
+        }
+
+
+@cached("passenger")
+async def search_passengers(conn: oracledb.AsyncConnection, nom: str = None, prenom: str = None,
+                            num_passeport: int = None, nationality: str = None, limit: int = 20):
+    sql, params = passenger_search_sql(nom, prenom, num_passeport, nationality, limit)
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+
+@cached("passenger")
+async def get_all_passengers(conn: oracledb.AsyncConnection, after: int = None, limit: int = 100):
+    with conn.cursor() as cursor:
+        if after is None:
+            await cursor.execute(
+                """
+                SELECT * FROM passengers
+                ORDER BY passenger_id
+                FETCH FIRST :n ROWS ONLY
+                """,
+                {"n": limit + 1}
+            )
+        else:
+            await cursor.execute(
+                """
+                SELECT * FROM passengers
+                WHERE passenger_id > :after
+                ORDER BY passenger_id
+                FETCH FIRST :n ROWS ONLY
+                """,
+                {"after": after, "n": limit + 1}
+            )
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        passengers = [dict(zip(columns, row)) for row in rows[:limit]]
+        next_key = passengers[-1]["passenger_id"] if len(rows) > limit else None
+        return passengers, next_key
+
+
+@cached("passenger")
+async def get_passengers_by_ids(conn: oracledb.AsyncConnection, passenger_ids: tuple):
+    sql, params = select_by_ids_sql(PASSENGER_FIELDS, "Passengers", "passenger_id", passenger_ids)
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
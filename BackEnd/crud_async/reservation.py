@@ -0,0 +1,124 @@
+import oracledb
+from typing import List
+from models.reservation import ReservationCreate, ReservationUpdate
+from cache import invalidates
+from crud.reservation import INSERT_RESERVATION_SQL, bulk_results, reject
+import config
+
+
+@invalidates("flight")
+async def add_reservation(conn: oracledb.AsyncConnection, reservation: ReservationCreate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "add_new_reservation",
+            [
+                reservation.reservation_id,
+                reservation.passenger_id,
+                reservation.vol_num,
+                reservation.seatcode,
+                reservation.state,
+                reservation.guardian_id
+            ]
+        )
+
+
+@invalidates("flight")
+async def add_reservations_bulk(conn: oracledb.AsyncConnection, reservations: List[ReservationCreate]):
+    """
+    Inserts many reservations with array DML, BULK_BATCH_SIZE rows per
+    round trip (see crud.reservation.add_reservations_bulk).
+    Returns one {index, id, ok, error_code, error} entry per input row.
+    """
+    sql = INSERT_RESERVATION_SQL
+    results = bulk_results(reservations)
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(reservations), config.BULK_BATCH_SIZE):
+                rows = [r.model_dump() for r in reservations[start:start + config.BULK_BATCH_SIZE]]
+                try:
+                    await cursor.executemany(sql, rows, batcherrors=True)
+                except oracledb.DatabaseError:
+                    # Statement-level rejection: the whole chunk was rolled back
+                    for offset, row in enumerate(rows):
+                        try:
+                            await cursor.execute(sql, row)
+                        except oracledb.DatabaseError as e:
+                            reject(results, start + offset, e.args[0])
+                    continue
+                for error in cursor.getbatcherrors():
+                    reject(results, start + error.offset, error)
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+    return results
+
+
+@invalidates("flight")
+async def update_reservation(conn: oracledb.AsyncConnection, reservation_id: int, reservation: ReservationUpdate):
+    with conn.cursor() as cursor:
+        await cursor.callproc(
+            "update_reservation",
+            [
+                reservation_id,
+                reservation.vol_num,
+                reservation.seatcode,
+                reservation.state
+            ]
+        )
+
+
+@invalidates("flight")
+async def delete_reservation(conn: oracledb.AsyncConnection, reservation_id: int):
+    with conn.cursor() as cursor:
+        await cursor.callproc("delete_reservation", [reservation_id])
+
+
+async def get_reservation_by_passport(conn: oracledb.AsyncConnection, num_passeport: int):
+    with conn.cursor() as cursor:
+        reservation_id = cursor.var(oracledb.NUMBER)
+        vol_num = cursor.var(oracledb.NUMBER)
+        seatcode = cursor.var(oracledb.STRING)
+        state = cursor.var(oracledb.STRING)
+        guardian_id = cursor.var(oracledb.NUMBER)
+
+        await cursor.callproc(
+            "get_reservation_by_passport",
+            [num_passeport, reservation_id, vol_num, seatcode, state, guardian_id]
+        )
+
+        return {
+            "reservation_id": reservation_id.getvalue(),
+            "vol_num": vol_num.getvalue(),
+            "seatcode": seatcode.getvalue(),
+            "state": state.getvalue(),
+            "guardian_id": guardian_id.getvalue(),
+        }
+
+
+async def get_all_reservations(conn: oracledb.AsyncConnection, after: int = None, limit: int = 100):
+    with conn.cursor() as cursor:
+        if after is None:
+            await cursor.execute(
+                """
+                SELECT * FROM reservations
+                ORDER BY reservation_id
+                FETCH FIRST :n ROWS ONLY
+                """,
+                {"n": limit + 1}
+            )
+        else:
+            await cursor.execute(
+                """
+                SELECT * FROM reservations
+                WHERE reservation_id > :after
+                ORDER BY reservation_id
+                FETCH FIRST :n ROWS ONLY
+                """,
+                {"after": after, "n": limit + 1}
+            )
+        rows = await cursor.fetchall()
+        columns = [col[0].lower() for col in cursor.description]
+        reservations = [dict(zip(columns, row)) for row in rows[:limit]]
+        next_key = reservations[-1]["reservation_id"] if len(rows) > limit else None
+        return reservations, next_key
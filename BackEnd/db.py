@@ -1,12 +1,222 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import oracledb
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+import config
+import standin
+from metrics import InstrumentedConnection, InstrumentedAsyncConnection, add_pool_wait
+
+
 def get_engine(username: str, password: str):
-    dsn = f"(DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST=localhost)(PORT=1521))" \
-          f"(CONNECT_DATA=(SERVICE_NAME=XEPDB1)))"
+    pool_args = dict(
+        echo=False,
+        pool_size=config.POOL_SIZE,
+        max_overflow=config.POOL_MAX_OVERFLOW,
+        pool_timeout=config.POOL_TIMEOUT,
+        pool_recycle=config.POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    if config.DB_BACKEND == "standin":
+        return create_engine(
+            "oracle+oracledb://",
+            creator=functools.partial(standin.connect, username, password),
+            **pool_args,
+        )
+    dsn = f"(DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST={config.ORACLE_HOST})(PORT={config.ORACLE_PORT}))" \
+          f"(CONNECT_DATA=(SERVICE_NAME={config.ORACLE_SERVICE})))"
     url = f"oracle+oracledb://{username}:{password}@{dsn}"
-    return create_engine(url, echo=False)
+    return create_engine(
+        url,
+        connect_args={"conn_class": InstrumentedConnection},
+        **pool_args,
+    )
+
 
 def get_session(engine):
     Session = sessionmaker(bind=engine)
     return Session()
+
+
+class EngineRegistry:
+    """
+    Keeps one pooled engine per DB credential so requests reuse Oracle
+    sessions instead of logging on every time.
+    Pools unused for ENGINE_IDLE_TIMEOUT seconds are disposed, and at most
+    MAX_ENGINES pools are kept (least recently used goes first).
+    """
+
+    def __init__(self, idle_timeout: int = config.ENGINE_IDLE_TIMEOUT,
+                 max_engines: int = config.MAX_ENGINES):
+        self.idle_timeout = idle_timeout
+        self.max_engines = max_engines
+        self._engines = OrderedDict()  # key -> [engine, username, last_used]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.created = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _key(username: str, password: str) -> str:
+        return hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()
+
+    def get(self, username: str, password: str):
+        key = self._key(username, password)
+        now = time.monotonic()
+        to_dispose = []
+        with self._lock:
+            entry = self._engines.get(key)
+            if entry is None:
+                entry = [get_engine(username, password), username, now]
+                self._engines[key] = entry
+                self.created += 1
+            entry[2] = now
+            self._engines.move_to_end(key)
+
+            if now - self._last_sweep >= min(self.idle_timeout, 60):
+                self._last_sweep = now
+                for k, (_, _, last_used) in list(self._engines.items()):
+                    if k != key and now - last_used > self.idle_timeout:
+                        to_dispose.append(self._engines.pop(k)[0])
+            while len(self._engines) > self.max_engines:
+                _, (engine, _, _) = self._engines.popitem(last=False)
+                to_dispose.append(engine)
+            self.evicted += len(to_dispose)
+            engine = entry[0]
+
+        for old in to_dispose:
+            old.dispose()
+        return engine
+
+    def connect(self, username: str, password: str):
+        engine = self.get(username, password)
+        started = time.perf_counter()
+        conn = engine.connect()
+        add_pool_wait(time.perf_counter() - started)
+        return conn
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            pools = [
+                {
+                    "user": username,
+                    "size": engine.pool.size(),
+                    "checked_out": engine.pool.checkedout(),
+                    "checked_in": engine.pool.checkedin(),
+                    "overflow": engine.pool.overflow(),
+                    "idle_seconds": round(now - last_used, 1),
+                }
+                for engine, username, last_used in self._engines.values()
+            ]
+        return {
+            "engines": len(pools),
+            "created": self.created,
+            "evicted": self.evicted,
+            "pools": pools,
+        }
+
+    def dispose_all(self):
+        with self._lock:
+            engines = [entry[0] for entry in self._engines.values()]
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+
+class AsyncPoolRegistry:
+    """
+    Async counterpart of EngineRegistry: one python-oracledb async pool per
+    DB credential, used when config.ASYNC_MODE is on.
+    Pools unused for ENGINE_IDLE_TIMEOUT seconds are closed.
+    """
+
+    def __init__(self, idle_timeout: int = config.ENGINE_IDLE_TIMEOUT,
+                 max_engines: int = config.MAX_ENGINES):
+        self.idle_timeout = idle_timeout
+        self.max_engines = max_engines
+        self._pools = OrderedDict()  # key -> [pool, username, last_used]
+        self._last_sweep = time.monotonic()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, username: str, password: str):
+        # No lock needed: everything runs on the event loop thread
+        key = EngineRegistry._key(username, password)
+        now = time.monotonic()
+        to_close = []
+        entry = self._pools.get(key)
+        if entry is None:
+            create_pool = standin.create_pool_async if config.DB_BACKEND == "standin" \
+                else oracledb.create_pool_async
+            pool = create_pool(
+                user=username,
+                password=password,
+                host=config.ORACLE_HOST,
+                port=config.ORACLE_PORT,
+                service_name=config.ORACLE_SERVICE,
+                min=0,
+                max=config.POOL_SIZE + config.POOL_MAX_OVERFLOW,
+                increment=1,
+                max_lifetime_session=config.POOL_RECYCLE,
+                wait_timeout=config.POOL_TIMEOUT * 1000,
+                ping_interval=60,
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                connectiontype=InstrumentedAsyncConnection,
+            )
+            entry = [pool, username, now]
+            self._pools[key] = entry
+            self.created += 1
+        entry[2] = now
+        self._pools.move_to_end(key)
+
+        if now - self._last_sweep >= min(self.idle_timeout, 60):
+            self._last_sweep = now
+            for k, (_, _, last_used) in list(self._pools.items()):
+                if k != key and now - last_used > self.idle_timeout:
+                    to_close.append(self._pools.pop(k)[0])
+        while len(self._pools) > self.max_engines:
+            _, (pool, _, _) = self._pools.popitem(last=False)
+            to_close.append(pool)
+        self.evicted += len(to_close)
+        return entry[0], to_close
+
+    async def acquire(self, username: str, password: str):
+        pool, to_close = self.get(username, password)
+        for old in to_close:
+            await old.close(force=True)
+        started = time.perf_counter()
+        conn = await pool.acquire()
+        add_pool_wait(time.perf_counter() - started)
+        return conn
+
+    def stats(self):
+        now = time.monotonic()
+        pools = [
+            {
+                "user": username,
+                "size": pool.max,
+                "checked_out": pool.busy,
+                "opened": pool.opened,
+                "idle_seconds": round(now - last_used, 1),
+            }
+            for pool, username, last_used in self._pools.values()
+        ]
+        return {
+            "engines": len(pools),
+            "created": self.created,
+            "evicted": self.evicted,
+            "pools": pools,
+        }
+
+    async def close_all(self):
+        pools = [entry[0] for entry in self._pools.values()]
+        self._pools.clear()
+        for pool in pools:
+            await pool.close(force=True)
@@ -1,19 +1,64 @@
-from fastapi import Header, HTTPException, Depends
+import asyncio
+from fastapi import Header, HTTPException, Depends, Request
 from sqlalchemy.exc import SQLAlchemyError
-from db import get_engine
+import oracledb
+import config
 
 def get_db(
+    request: Request,
     x_db_user: str = Header(...),
     x_db_password: str = Header(...)
 ):
+    conn = None
     try:
-        engine = get_engine(x_db_user, x_db_password)
-        conn = engine.connect()
+        conn = request.app.state.engines.connect(x_db_user, x_db_password)
         yield conn
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        try:
+        if conn is not None:
+            try:
+                conn.close()
+            except:
+                pass
+
+
+async def get_async_db(
+    request: Request,
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    conn = None
+    try:
+        conn = await request.app.state.pools.acquire(x_db_user, x_db_password)
+        yield conn
+    except oracledb.Error as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn is not None:
+            try:
+                await conn.close()
+            except:
+                pass
+
+
+async def require_admin(
+    request: Request,
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Guards the admin monitoring routes: the user must be one of
+    ADMIN_DB_USERS and the password must open a connection.
+    """
+    if x_db_user.upper() not in {u.upper() for u in config.ADMIN_DB_USERS}:
+        raise HTTPException(status_code=403, detail="Admin DB user required")
+    try:
+        if config.ASYNC_MODE:
+            conn = await request.app.state.pools.acquire(x_db_user, x_db_password)
+            await conn.close()
+        else:
+            conn = await asyncio.to_thread(request.app.state.engines.connect, x_db_user, x_db_password)
             conn.close()
-        except:
-            pass
+    except (SQLAlchemyError, oracledb.Error):
+        raise HTTPException(status_code=401, detail="Invalid database credentials")
@@ -0,0 +1,146 @@
+"""
+Conditional GETs: ETag / If-None-Match from ORA_ROWSCN version tokens.
+
+A version token is one cheap query over the rows a response is built
+from (one row, one keyset page or a whole table): its highest ORA_ROWSCN,
+and for sets the row count and key sum, so deletes change it too. Unlike
+a counter kept on write it also sees writes made by other workers, the
+state refresher, triggers or SQL*Plus. Without ROWDEPENDENCIES on the
+table, ORA_ROWSCN is tracked per block: a write can change the token of
+its neighbours, which only costs them a full response.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+
+import config
+
+
+def _table_sql(table: str, key: str) -> str:
+    return f"SELECT MAX(ORA_ROWSCN), COUNT(*), SUM({key}) FROM {table}"
+
+
+def _version_sql(page_sql: str, key: str) -> str:
+    return f"SELECT MAX(scn), COUNT(*), SUM({key}) FROM ({page_sql})"
+
+
+def _page_sql(table: str, key: str, after) -> str:
+    where = f"WHERE {key} > :after" if after is not None else ""
+    return f"""
+        SELECT ORA_ROWSCN scn, {key} FROM {table}
+        {where}
+        ORDER BY {key}
+        FETCH FIRST :n ROWS ONLY
+    """
+
+
+def _page_params(after, limit: int) -> dict:
+    # limit + 1 like the page queries, so the next cursor is covered too
+    params = {"n": limit + 1}
+    if after is not None:
+        params["after"] = after
+    return params
+
+
+def _row_sql(table: str, key: str) -> str:
+    return f"SELECT ORA_ROWSCN FROM {table} WHERE {key} = :id"
+
+
+# -- sync (SQLAlchemy Connection) -------------------------------------------
+
+def _fetch(conn, sql: str, params: dict):
+    row = conn.execute(text(sql), params).fetchone()
+    return tuple(row) if row is not None else None
+
+
+def table_version(conn, table: str, key: str):
+    if not config.ETAG_ENABLED:
+        return None
+    return _fetch(conn, _table_sql(table, key), {})
+
+
+def query_version(conn, page_sql: str, params: dict, key: str):
+    """Version token of the rows page_sql selects (as ORA_ROWSCN scn, key)."""
+    if not config.ETAG_ENABLED:
+        return None
+    return _fetch(conn, _version_sql(page_sql, key), params)
+
+
+def page_version(conn, table: str, key: str, after, limit: int):
+    return query_version(conn, _page_sql(table, key, after), _page_params(after, limit), key)
+
+
+def row_version(conn, table: str, key: str, value):
+    """None when the row does not exist (the route answers 404 as usual)."""
+    if not config.ETAG_ENABLED:
+        return None
+    return _fetch(conn, _row_sql(table, key), {"id": value})
+
+
+# -- async (python-oracledb AsyncConnection) ---------------------------------
+
+async def _fetch_async(conn, sql: str, params: dict):
+    with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        row = await cursor.fetchone()
+    return tuple(row) if row is not None else None
+
+
+async def table_version_async(conn, table: str, key: str):
+    if not config.ETAG_ENABLED:
+        return None
+    return await _fetch_async(conn, _table_sql(table, key), {})
+
+
+async def query_version_async(conn, page_sql: str, params: dict, key: str):
+    if not config.ETAG_ENABLED:
+        return None
+    return await _fetch_async(conn, _version_sql(page_sql, key), params)
+
+
+async def page_version_async(conn, table: str, key: str, after, limit: int):
+    return await query_version_async(conn, _page_sql(table, key, after), _page_params(after, limit), key)
+
+
+async def row_version_async(conn, table: str, key: str, value):
+    if not config.ETAG_ENABLED:
+        return None
+    return await _fetch_async(conn, _row_sql(table, key), {"id": value})
+
+
+# -- headers ----------------------------------------------------------------
+
+def make_etag(db_user: str, version) -> str:
+    # Per DB user: what a user may see depends on its privileges
+    raw = "|".join([db_user or ""] + [str(v) for v in version])
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = tag[2:]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional(request: Request, response: Response, version, cache_control: Optional[str] = None):
+    """
+    Put the ETag of version (and cache_control) on response, or return
+    the 304 Not Modified to send instead when If-None-Match already has
+    it. Nothing happens when version is None.
+    """
+    if version is None:
+        return None
+    headers = {"ETag": make_etag(request.headers.get("x-db-user"), version), "Vary": "x-db-user"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
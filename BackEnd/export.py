@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal
+
+import oracledb
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+
+import config
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _encoder(fmt: str, columns):
+    """
+    encode(rows) -> the rows as NDJSON or CSV text. The CSV header comes
+    with the first call, so encode([]) on an empty result still returns it.
+    """
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = writer.writerows
+    else:
+        def write(rows):
+            for row in rows:
+                buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                buffer.write("\n")
+
+    def encode(rows):
+        write(rows)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+    return encode
+
+
+def _iter_rows(conn, cursor, fmt: str):
+    """
+    Fetch arraysize rows per round trip and yield them already encoded,
+    so only one batch is ever held in memory.
+    """
+    try:
+        encode = _encoder(fmt, [col[0].lower() for col in cursor.description])
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield encode(rows)
+        tail = encode([])
+        if tail:
+            yield tail
+    finally:
+        cursor.close()
+        conn.close()
+
+
+async def _aiter_rows(conn, cursor, fmt: str):
+    try:
+        encode = _encoder(fmt, [col[0].lower() for col in cursor.description])
+        while True:
+            rows = await cursor.fetchmany()
+            if not rows:
+                break
+            yield encode(rows)
+        tail = encode([])
+        if tail:
+            yield tail
+    finally:
+        cursor.close()
+        await conn.close()
+
+
+def _oracle_error(e: oracledb.DatabaseError):
+    error_obj, = e.args
+    return HTTPException(
+        status_code=400,
+        detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+    )
+
+
+def _streaming_response(rows, fmt: str, name: str):
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+def export_query(request: Request, db_user: str, db_password: str,
+                 sql: str, fmt: str, name: str, params: dict = None,
+                 require: str = None, not_found: str = "Not found"):
+    """
+    Stream the result of sql as NDJSON or CSV.
+    The query is executed before the response starts so Oracle errors
+    still map to an HTTP error; the connection is then owned by the
+    response body and released after the last row (or a client abort).
+    When given, require (a query with the same binds) must return a row
+    first, otherwise the answer is 404 not_found.
+    """
+    conn = None
+    try:
+        conn = request.app.state.engines.connect(db_user, db_password)
+        cursor = conn.connection.cursor()
+        cursor.arraysize = config.EXPORT_ARRAYSIZE
+        cursor.prefetchrows = config.EXPORT_ARRAYSIZE + 1
+        if require is not None:
+            cursor.execute(require, params or {})
+            if cursor.fetchone() is None:
+                cursor.close()
+                conn.close()
+                raise HTTPException(status_code=404, detail=not_found)
+        cursor.execute(sql, params or {})
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except oracledb.DatabaseError as e:
+        conn.close()
+        raise _oracle_error(e)
+
+    return _streaming_response(_iter_rows(conn, cursor, fmt), fmt, name)
+
+
+async def export_query_async(request: Request, db_user: str, db_password: str,
+                             sql: str, fmt: str, name: str, params: dict = None,
+                             require: str = None, not_found: str = "Not found"):
+    """export_query on a connection of the async pools (config.ASYNC_MODE)."""
+    try:
+        conn = await request.app.state.pools.acquire(db_user, db_password)
+    except oracledb.Error as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    try:
+        cursor = conn.cursor()
+        cursor.arraysize = config.EXPORT_ARRAYSIZE
+        cursor.prefetchrows = config.EXPORT_ARRAYSIZE + 1
+        if require is not None:
+            await cursor.execute(require, params or {})
+            if await cursor.fetchone() is None:
+                cursor.close()
+                await conn.close()
+                raise HTTPException(status_code=404, detail=not_found)
+        await cursor.execute(sql, params or {})
+    except oracledb.DatabaseError as e:
+        await conn.close()
+        raise _oracle_error(e)
+
+    return _streaming_response(_aiter_rows(conn, cursor, fmt), fmt, name)
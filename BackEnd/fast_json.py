@@ -0,0 +1,113 @@
+"""
+Fast JSON rendering of trusted DB output (config.FAST_JSON).
+
+With the flag on, whatever an endpoint returns is rendered straight to
+JSON by orjson (or the stdlib encoder when orjson is not installed),
+instead of being validated against the route's response_model first:
+the rows come from our own queries, so revalidating them only costs CPU.
+response_model is still declared on the routes and drives the OpenAPI
+schema, it is just not enforced at run time.
+
+datetime / date are encoded natively by orjson (isoformat by the
+fallback), Decimal as a JSON number, and pydantic models through a
+cached TypeAdapter of their class.
+"""
+import asyncio
+import functools
+import inspect
+import json
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+import config
+from export import _json_default
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return type_adapter(type(value)).dump_python(value, mode="json")
+    return _json_default(value)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, ensure_ascii=False,
+                          allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ---------------------------------------------------------------------
+# Route class
+# ---------------------------------------------------------------------
+
+_RESPONSE_PARAM = "_fast_json_response"
+
+
+def _render(content, response: Response, status_code: Optional[int]):
+    if not config.FAST_JSON or isinstance(content, Response):
+        return content
+    # Returning a Response makes FastAPI skip the injected one, so carry
+    # over what the endpoint set on it (status, X-Next-Cursor, ...)
+    fast = FastJSONResponse(content, status_code=response.status_code or status_code or 200)
+    fast.raw_headers.extend(h for h in response.raw_headers if h[0] != b"content-length")
+    return fast
+
+
+def fast_endpoint(endpoint, status_code: Optional[int] = None):
+    """
+    Wrap endpoint so that, while config.FAST_JSON is on, its result comes
+    back as a FastJSONResponse. The wrapper asks FastAPI for the injected
+    Response (reusing the endpoint's own parameter when it has one).
+    """
+    signature = inspect.signature(endpoint)
+    params = list(signature.parameters.values())
+    name = next((p.name for p in params if p.annotation is Response), None)
+    hidden = name is None
+    if hidden:
+        name = _RESPONSE_PARAM
+        params.append(inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            response = kwargs.pop(name) if hidden else kwargs[name]
+            return _render(await endpoint(*args, **kwargs), response, status_code)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            response = kwargs.pop(name) if hidden else kwargs[name]
+            return _render(endpoint(*args, **kwargs), response, status_code)
+
+    wrapper.__signature__ = signature.replace(parameters=params)
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """Route class rendering endpoint results with FastJSONResponse when config.FAST_JSON is on."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, fast_endpoint(endpoint, kwargs.get("status_code")), **kwargs)
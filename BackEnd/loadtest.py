@@ -0,0 +1,468 @@
+"""
+Load test replaying the admin frontend's traffic (aeoroport-frontend/src/Admin pages).
+
+    python loadtest.py --rps 50 --duration 60 --out run.json
+    python loadtest.py --in-process --mix flights_list=4,flight_edit=1
+    python loadtest.py --in-process --out new.json --compare run.json
+
+Each virtual user loops: pick a page (weighted by --mix) and make the
+calls that page makes, in the same order and with the same URLs and
+bodies. Edits PUT back the values they just read and created
+reservations are deleted again, so a run leaves the data as it found it.
+Every call first takes a slot from a shared pacer, so the run aims at
+--rps requests per second overall; when the API cannot keep up the
+achieved throughput in the report is lower than the target.
+
+--in-process serves main.app inside this process on the Oracle stand-in
+(config.DB_BACKEND = "standin"), so neither a server nor a database is
+needed. Latencies then include the app's own time only, but the load
+generator shares the event loop with it.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import httpx
+
+import config
+from seats import seat_code
+
+
+class PageFailed(Exception):
+    """A call of the page failed; the user gives up on the page."""
+
+
+class Pacer:
+    """Hands out request slots 1/rps apart, without bursting to catch up."""
+
+    def __init__(self, rps: float):
+        self.interval = 1 / rps
+        self.next_slot = None
+
+    async def wait(self):
+        now = time.perf_counter()
+        if self.next_slot is None or self.next_slot < now:
+            self.next_slot = now
+        slot = self.next_slot
+        self.next_slot += self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint -> seconds
+        self.statuses = defaultdict(Counter)  # endpoint -> status code (0: no response)
+        self.scenarios = defaultdict(Counter)  # page -> {"runs", "failed"}
+        self.recording = False
+
+    def add(self, endpoint: str, status: int, elapsed: float):
+        if self.recording:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][status] += 1
+
+    def add_scenario(self, name: str, failed: bool):
+        if self.recording:
+            self.scenarios[name]["runs"] += 1
+            self.scenarios[name]["failed"] += failed
+
+
+class Client:
+    """What one virtual user's browser does: paced, timed API calls."""
+
+    def __init__(self, http: httpx.AsyncClient, pacer: Pacer, recorder: Recorder, rng: random.Random):
+        self.http = http
+        self.pacer = pacer
+        self.recorder = recorder
+        self.rng = rng
+
+    async def call(self, method: str, template: str, json=None, params=None, **path):
+        """
+        Calls template.format(**path) and returns the decoded body.
+        Results are recorded under "METHOD template", so every id of an
+        endpoint lands in the same bucket.
+        """
+        endpoint = f"{method} {template}"
+        await self.pacer.wait()
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, template.format(**path), json=json, params=params)
+        except httpx.HTTPError as e:
+            self.recorder.add(endpoint, 0, time.perf_counter() - started)
+            raise PageFailed(f"{endpoint}: {e}")
+        self.recorder.add(endpoint, response.status_code, time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise PageFailed(f"{endpoint}: {response.status_code}")
+        return response.json()
+
+    def get(self, template: str, **path):
+        return self.call("GET", template, **path)
+
+
+# ---------------------------------------------------------------------
+# Pages: the calls each one makes (file names under Admin pages/)
+# ---------------------------------------------------------------------
+
+async def flights_list(c: Client):
+    # flights/flightsList.tsx
+    return await c.get("/flights/flights/")
+
+
+async def flight_details(c: Client):
+    # flightsList.tsx -> row click -> flights/flightsDetails.tsx
+    flight = c.rng.choice(await flights_list(c))
+    await c.get("/flights/flights/{vol_num}", vol_num=flight["vol_num"])
+
+
+async def flight_edit(c: Client):
+    # flights/editFlight.tsx, on a flight the procedure lets us modify
+    flights = [f for f in await flights_list(c) if f["state"] == "Scheduled"]
+    if not flights:
+        return
+    vol_num = c.rng.choice(flights)["vol_num"]
+    flight, _ = await asyncio.gather(
+        c.get("/flights/flights/{vol_num}", vol_num=vol_num),
+        c.get("/aircrafts/aircrafts"),
+    )
+    await c.call("PUT", "/flights/flights/{vol_num}", vol_num=vol_num, json={
+        key: flight[key] for key in ("destination", "departure_time", "arrival_time", "avion_id", "state")
+    })
+
+
+async def passengers_list(c: Client):
+    # passengers/passengersList.tsx
+    return await c.get("/passengers/passengers")
+
+
+async def passenger_details(c: Client):
+    # passengersList.tsx -> row click -> passengers/PassengersDetails.tsx
+    passenger = c.rng.choice(await passengers_list(c))
+    return await c.get("/passengers/passengers/passport/{num}", num=passenger["numpasseport"])
+
+
+async def passenger_edit(c: Client):
+    # passengers/editPassenger.tsx
+    passenger = await passenger_details(c)
+    await c.call("PUT", "/passengers/passengers/{passenger_id}", passenger_id=passenger["passenger_id"], json={
+        key: passenger[key] for key in ("prenom", "nom", "contact", "nationality", "age")
+    })
+
+
+async def reservations_list(c: Client):
+    # reservation/reservationsList.tsx loads both lists on mount
+    return await asyncio.gather(
+        c.get("/passengers/passengers"),
+        c.get("/reservations/reservations"),
+    )
+
+
+def _pick_reservation(c: Client, passengers, reservations):
+    passports = {p["passenger_id"]: p["numpasseport"] for p in passengers}
+    listed = [r for r in reservations if passports.get(r["passenger_id"]) is not None]
+    if not listed:
+        return None, None
+    reservation = c.rng.choice(listed)
+    return reservation, passports[reservation["passenger_id"]]
+
+
+async def reservation_details(c: Client):
+    # reservationsList.tsx -> row click -> reservation/reservationDetails.tsx
+    reservation, passport = _pick_reservation(c, *await reservations_list(c))
+    if reservation is None:
+        return
+    await c.get("/passengers/passengers/passport/{num}", num=passport)
+    await c.get("/reservations/reservations")
+    if reservation["guardian_id"] is not None:
+        await c.get("/passengers/passengers/{passenger_id}", passenger_id=reservation["guardian_id"])
+
+
+async def reservation_edit(c: Client):
+    # reservation/reservationEdit.tsx
+    reservation, passport = _pick_reservation(c, *await reservations_list(c))
+    if reservation is None:
+        return
+    reservation = await c.get("/reservations/reservations/passport/{num}", num=passport)
+    await c.get("/passengers/passengers/{passenger_id}", passenger_id=reservation["passenger_id"])
+    await c.get("/flights/flights")
+    await c.call("PUT", "/reservations/reservations/{reservation_id}",
+                 reservation_id=reservation["reservation_id"], json={
+                     key: reservation[key] for key in ("vol_num", "seatcode", "state")
+                 })
+
+
+async def reservation_create(c: Client):
+    # reservation/createReservation.tsx, then the delete button of
+    # reservationDetails.tsx. The seat is picked at random like a user
+    # would, so some attempts hit a taken seat (400).
+    passengers, flights = await asyncio.gather(
+        c.get("/passengers/passengers"),
+        c.get("/flights/flights"),
+    )
+    adults = [p for p in passengers if p["age"] >= 18]
+    flights = [f for f in flights if f["state"] == "Scheduled"]
+    if not adults or not flights:
+        return
+    reservation_id = c.rng.randrange(10 ** 9, 2 * 10 ** 9)
+    await c.call("POST", "/reservations/reservations", json={
+        "reservation_id": reservation_id,
+        "passenger_id": c.rng.choice(adults)["passenger_id"],
+        "vol_num": c.rng.choice(flights)["vol_num"],
+        "seatcode": seat_code(c.rng.randrange(60)),
+        "state": "Confirmed",
+        "guardian_id": None,
+    })
+    await c.call("DELETE", "/reservations/reservations/{reservation_id}", reservation_id=reservation_id)
+
+
+async def maintenance_list(c: Client):
+    # maintenance/MaintenanceList.tsx
+    return await c.get("/maintenance/maintenance/")
+
+
+async def maintenance_edit(c: Client):
+    # maintenance/MaintenanceEdit.tsx
+    rows = await maintenance_list(c)
+    if not rows:
+        return
+    maintenance_id = c.rng.choice(rows)["maintenance_id"]
+    maintenance = await c.get("/maintenance/maintenance/{maintenance_id}", maintenance_id=maintenance_id)
+    await c.get("/aircrafts/aircrafts/{avion_id}", avion_id=maintenance["avion_id"])
+    await c.call("PUT", "/maintenance/maintenance/{maintenance_id}", maintenance_id=maintenance_id, json={
+        "operation_date": str(maintenance["operationdate"])[:10],
+        "typee": maintenance["typee"],
+        "state": maintenance["state"],
+    })
+
+
+async def aircrafts_list(c: Client):
+    # aircrafts/aircraftsList.tsx
+    await c.get("/aircrafts/aircrafts/")
+
+
+SCENARIOS = {
+    "flights_list": flights_list,
+    "flight_details": flight_details,
+    "flight_edit": flight_edit,
+    "passengers_list": passengers_list,
+    "passenger_details": passenger_details,
+    "passenger_edit": passenger_edit,
+    "reservations_list": reservations_list,
+    "reservation_details": reservation_details,
+    "reservation_edit": reservation_edit,
+    "reservation_create": reservation_create,
+    "maintenance_list": maintenance_list,
+    "maintenance_edit": maintenance_edit,
+    "aircrafts_list": aircrafts_list,
+}
+
+# Mostly browsing, a few edits
+DEFAULT_MIX = {
+    "flights_list": 20,
+    "flight_details": 15,
+    "flight_edit": 3,
+    "passengers_list": 15,
+    "passenger_details": 10,
+    "passenger_edit": 3,
+    "reservations_list": 10,
+    "reservation_details": 8,
+    "reservation_edit": 2,
+    "reservation_create": 2,
+    "maintenance_list": 5,
+    "maintenance_edit": 1,
+    "aircrafts_list": 6,
+}
+
+
+def parse_mix(text: str) -> dict:
+    """"flights_list=4,flight_edit=1" -> {"flights_list": 4.0, "flight_edit": 1.0}"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown page {name!r} (known: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------
+
+async def virtual_user(client: Client, mix: dict, stop_at: float):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < stop_at:
+        name = client.rng.choices(names, weights)[0]
+        try:
+            await SCENARIOS[name](client)
+        except PageFailed:
+            client.recorder.add_scenario(name, failed=True)
+        else:
+            client.recorder.add_scenario(name, failed=False)
+
+
+async def run(args, transport=None) -> dict:
+    recorder = Recorder()
+    pacer = Pacer(args.rps)
+    headers = {"x-db-user": args.user, "x-db-password": args.password}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, transport=transport,
+                                 follow_redirects=True, timeout=args.timeout) as http:
+        started = time.perf_counter()
+        warmup_end = started + args.warmup
+        stop_at = warmup_end + args.duration
+        users = [
+            asyncio.create_task(virtual_user(Client(http, pacer, recorder, random.Random(args.seed + i)),
+                                             args.mix, stop_at))
+            for i in range(args.users)
+        ]
+        await asyncio.sleep(max(warmup_end - time.perf_counter(), 0))
+        recorder.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - measured_from
+    return summarize(recorder, elapsed, args)
+
+
+async def run_in_process(args) -> dict:
+    config.DB_BACKEND = "standin"
+    import main
+    import standin
+    standin.database.ensure_seeded()
+    async with main.app.router.lifespan_context(main.app):
+        return await run(args, transport=httpx.ASGITransport(app=main.app))
+
+
+# ---------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def summarize(recorder: Recorder, elapsed: float, args) -> dict:
+    endpoints = {}
+    for endpoint in sorted(recorder.latencies):
+        latencies = sorted(recorder.latencies[endpoint])
+        statuses = recorder.statuses[endpoint]
+        count = len(latencies)
+        errors = sum(n for status, n in statuses.items() if status == 0 or status >= 500)
+        client_errors = sum(n for status, n in statuses.items() if 400 <= status < 500)
+        endpoints[endpoint] = {
+            "count": count,
+            "errors": errors,
+            "client_errors": client_errors,
+            "error_rate": round((errors + client_errors) / count, 4),
+            "rps": round(count / elapsed, 2),
+            "mean_ms": _ms(sum(latencies) / count),
+            "p50_ms": _ms(percentile(latencies, 50)),
+            "p95_ms": _ms(percentile(latencies, 95)),
+            "p99_ms": _ms(percentile(latencies, 99)),
+            "max_ms": _ms(latencies[-1]),
+            "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        }
+    requests = sum(e["count"] for e in endpoints.values())
+    errors = sum(e["errors"] for e in endpoints.values())
+    client_errors = sum(e["client_errors"] for e in endpoints.values())
+    everything = sorted(t for latencies in recorder.latencies.values() for t in latencies)
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "target": "in-process" if args.in_process else args.base_url,
+            "backend": config.DB_BACKEND if args.in_process else None,
+            "async_mode": config.ASYNC_MODE if args.in_process else None,
+            "rps": args.rps,
+            "users": args.users,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "mix": args.mix,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "requests": requests,
+        "errors": errors,
+        "client_errors": client_errors,
+        "error_rate": round((errors + client_errors) / requests, 4) if requests else 0.0,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": _ms(percentile(everything, 50)),
+        "p95_ms": _ms(percentile(everything, 95)),
+        "p99_ms": _ms(percentile(everything, 99)),
+        "endpoints": endpoints,
+        "scenarios": {name: dict(counts) for name, counts in sorted(recorder.scenarios.items())},
+    }
+
+
+def _change(new: float, old: float) -> str:
+    if not old:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def print_report(result: dict, baseline: dict = None):
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    header = f"{'endpoint':<52}{'count':>7}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if baseline:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    for endpoint, e in result["endpoints"].items():
+        line = (f"{endpoint:<52}{e['count']:>7}{e['error_rate'] * 100:>7.1f}"
+                f"{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+        if baseline:
+            line += f"{_change(e['p95_ms'], base_endpoints.get(endpoint, {}).get('p95_ms')):>13}"
+        print(line)
+    print(f"\n{result['requests']} requests in {result['elapsed_s']}s: "
+          f"{result['throughput_rps']} req/s (target {result['settings']['rps']}), "
+          f"{result['errors']} errors, {result['client_errors']} 4xx, "
+          f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms")
+    if baseline:
+        print(f"baseline: {baseline['throughput_rps']} req/s "
+              f"({_change(result['throughput_rps'], baseline['throughput_rps'])}), "
+              f"p95 {baseline['p95_ms']} ms ({_change(result['p95_ms'], baseline['p95_ms'])}), "
+              f"error rate {baseline['error_rate'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true",
+                        help="serve main.app in this process on the Oracle stand-in")
+    parser.add_argument("--user", default="USER_ADMIN")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--rps", type=float, default=50, help="target requests per second")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run before measuring")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds before a request fails")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="page weights, e.g. flights_list=4,flight_edit=1 (default: all pages)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_in_process(args) if args.in_process else run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
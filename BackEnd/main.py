@@ -1,8 +1,48 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routers import aircraft, auth, flight, passenger, reservation, maintenance
+import config
+from db import EngineRegistry, AsyncPoolRegistry
+from deps import require_admin
+from cache import cache
+from audit import audit
+from metrics import MetricsMiddleware, registry as metrics_registry
+from slowlog import slow_log
+from state_refresh import StateRefresher
+from routers import auth
 
-app = FastAPI(title="Airline DBA-Driven API")
+logger = logging.getLogger(__name__)
+
+if config.ASYNC_MODE:
+    from routers_async import aircraft, flight, passenger, reservation, maintenance
+else:
+    from routers import aircraft, flight, passenger, reservation, maintenance
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pool registry for the whole app, shared by every request
+    app.state.engines = EngineRegistry()
+    app.state.pools = AsyncPoolRegistry()
+    app.state.state_refresher = StateRefresher(app.state.engines)
+    audit.start(app.state.engines)
+    refresh_task = None
+    if config.STATE_REFRESH_ENABLED and not config.STATE_REFRESH_USER:
+        logger.warning("STATE_REFRESH_USER is not set, state refresh is disabled")
+    elif config.STATE_REFRESH_ENABLED:
+        refresh_task = asyncio.create_task(app.state.state_refresher.run_forever())
+    yield
+    if refresh_task is not None:
+        refresh_task.cancel()
+    await asyncio.to_thread(audit.stop)
+    app.state.engines.dispose_all()
+    await app.state.pools.close_all()
+
+
+app = FastAPI(title="Airline DBA-Driven API", lifespan=lifespan)
 
 # CORS middleware MUST come FIRST
 origins = [
@@ -16,7 +56,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # THEN include your routers
 app.include_router(auth.router)
@@ -24,4 +66,48 @@ app.include_router(aircraft.router, prefix="/aircrafts")
 app.include_router(flight.router, prefix="/flights")
 app.include_router(passenger.router, prefix="/passengers")
 app.include_router(reservation.router, prefix="/reservations")
-app.include_router(maintenance.router, prefix="/maintenance")
\ No newline at end of file
+app.include_router(maintenance.router, prefix="/maintenance")
+
+
+@app.get("/pool/stats", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def pool_stats():
+    """Connection pool usage per DB user."""
+    if config.ASYNC_MODE:
+        return app.state.pools.stats()
+    return app.state.engines.stats()
+
+
+@app.get("/cache/stats", tags=["Monitoring"])
+def cache_stats():
+    """Read cache hit/miss counters per entity."""
+    return cache.stats()
+
+
+@app.get("/state-refresh/stats", tags=["Monitoring"])
+def state_refresh_stats():
+    """Rows touched and duration of the latest state refresh runs."""
+    return app.state.state_refresher.stats()
+
+
+@app.get("/audit/stats", tags=["Monitoring"])
+def audit_stats():
+    """Write-behind audit queue depth, batches written and spool usage."""
+    return audit.stats()
+
+
+@app.get("/metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+def metrics():
+    """Per-route latency, DB time, round trips, rows, pool wait and serialization (Prometheus)."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/slow-queries", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def slow_queries(limit: int = Query(100, ge=1, le=config.SLOW_QUERY_BUFFER)):
+    """Latest Oracle calls slower than SLOW_QUERY_THRESHOLD, most recent first."""
+    return {**slow_log.stats(), "entries": slow_log.entries(limit)}
+
+
+@app.delete("/slow-queries", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def clear_slow_queries():
+    slow_log.clear()
+    return {"message": "Slow query log cleared"}
@@ -0,0 +1,406 @@
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+
+import oracledb
+from fast_json import FastJSONRoute
+
+from slowlog import slow_log
+
+
+class RequestMetrics:
+    """Counters collected while one request is being served."""
+
+    __slots__ = ("scope", "db_seconds", "round_trips", "rows", "pool_wait", "endpoint_done")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.db_seconds = 0.0
+        self.round_trips = 0
+        self.rows = 0
+        self.pool_wait = 0.0
+        self.endpoint_done = None
+
+
+# Set by MetricsMiddleware for the duration of a request. Sync endpoints
+# and dependencies run in worker threads with a copy of the context, so
+# they update the same RequestMetrics object.
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+def add_pool_wait(seconds: float):
+    current = _current.get()
+    if current is not None:
+        current.pool_wait += seconds
+
+
+# ---------------------------------------------------------------------
+# Oracle instrumentation
+# ---------------------------------------------------------------------
+
+class _CursorTiming:
+    """
+    Shared bookkeeping of the instrumented cursors. Every execute-type
+    call is one round trip; fetches add one round trip per arraysize rows
+    (the driver's fetch batch), so the count is a close estimate.
+    """
+
+    _fetched = 0
+
+    def _record(self, current, elapsed, round_trips=0, rows=0):
+        current.db_seconds += elapsed
+        current.round_trips += round_trips
+        if rows:
+            arraysize = self.arraysize or 1
+            before = self._fetched
+            self._fetched += rows
+            current.round_trips += math.ceil(self._fetched / arraysize) - math.ceil(before / arraysize)
+            current.rows += rows
+
+    def _check_slow(self, method, args, kwargs, elapsed, current):
+        if elapsed < slow_log.threshold:
+            return
+        try:
+            rowcount = self.rowcount
+        except oracledb.Error:
+            rowcount = None
+        route = _route_label(current.scope) if current is not None and current.scope else None
+        slow_log.record(method.__name__, args, kwargs, elapsed, rowcount, route)
+
+
+class TimedCursorMixin(_CursorTiming):
+    """Times the calls of any DB-API cursor class it is mixed into."""
+
+    def _call(self, method, *args, **kwargs):
+        current = _current.get()
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if current is not None:
+                self._record(current, elapsed, round_trips=1)
+            self._check_slow(method, args, kwargs, elapsed, current)
+
+    def _fetch(self, method, *args, **kwargs):
+        current = _current.get()
+        if current is None:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        rows = method(*args, **kwargs)
+        self._record(current, time.perf_counter() - started, rows=len(rows))
+        return rows
+
+    def execute(self, *args, **kwargs):
+        return self._call(super().execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._call(super().executemany, *args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        return self._call(super().callproc, *args, **kwargs)
+
+    def callfunc(self, *args, **kwargs):
+        return self._call(super().callfunc, *args, **kwargs)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(super().fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def fetchone(self):
+        current = _current.get()
+        started = time.perf_counter()
+        row = super().fetchone()
+        if current is not None:
+            self._record(current, time.perf_counter() - started, rows=row is not None)
+        return row
+
+    def __next__(self):
+        current = _current.get()
+        started = time.perf_counter()
+        row = super().__next__()
+        if current is not None:
+            self._record(current, time.perf_counter() - started, rows=1)
+        return row
+
+
+class InstrumentedCursor(TimedCursorMixin, oracledb.Cursor):
+    pass
+
+
+class InstrumentedConnection(oracledb.Connection):
+    """Passed as conn_class so every cursor (SQLAlchemy's and raw ones) is timed."""
+
+    def cursor(self, scrollable: bool = False, handle=None):
+        self._verify_connected()
+        return InstrumentedCursor(self, scrollable, handle=handle)
+
+
+class TimedAsyncCursorMixin(_CursorTiming):
+    """Async counterpart of TimedCursorMixin."""
+
+    async def _call(self, method, *args, **kwargs):
+        current = _current.get()
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if current is not None:
+                self._record(current, elapsed, round_trips=1)
+            self._check_slow(method, args, kwargs, elapsed, current)
+
+    async def _fetch(self, method, *args, **kwargs):
+        current = _current.get()
+        if current is None:
+            return await method(*args, **kwargs)
+        started = time.perf_counter()
+        rows = await method(*args, **kwargs)
+        self._record(current, time.perf_counter() - started, rows=len(rows))
+        return rows
+
+    async def execute(self, *args, **kwargs):
+        return await self._call(super().execute, *args, **kwargs)
+
+    async def executemany(self, *args, **kwargs):
+        return await self._call(super().executemany, *args, **kwargs)
+
+    async def callproc(self, *args, **kwargs):
+        return await self._call(super().callproc, *args, **kwargs)
+
+    async def callfunc(self, *args, **kwargs):
+        return await self._call(super().callfunc, *args, **kwargs)
+
+    async def fetchmany(self, *args, **kwargs):
+        return await self._fetch(super().fetchmany, *args, **kwargs)
+
+    async def fetchall(self):
+        return await self._fetch(super().fetchall)
+
+    async def fetchone(self):
+        current = _current.get()
+        started = time.perf_counter()
+        row = await super().fetchone()
+        if current is not None:
+            self._record(current, time.perf_counter() - started, rows=row is not None)
+        return row
+
+    async def __anext__(self):
+        current = _current.get()
+        started = time.perf_counter()
+        row = await super().__anext__()
+        if current is not None:
+            self._record(current, time.perf_counter() - started, rows=1)
+        return row
+
+
+class InstrumentedAsyncCursor(TimedAsyncCursorMixin, oracledb.AsyncCursor):
+    pass
+
+
+class InstrumentedAsyncConnection(oracledb.AsyncConnection):
+    """Passed as connectiontype to the async pools."""
+
+    def cursor(self, scrollable: bool = False):
+        self._verify_connected()
+        return InstrumentedAsyncCursor(self, scrollable)
+
+
+# ---------------------------------------------------------------------
+# Serialization time
+# ---------------------------------------------------------------------
+
+def _mark_endpoint_done(endpoint):
+    if getattr(endpoint, "_marks_done", False):
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            current = _current.get()
+            if current is not None:
+                current.endpoint_done = time.perf_counter()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            current = _current.get()
+            if current is not None:
+                current.endpoint_done = time.perf_counter()
+            return result
+
+    wrapper._marks_done = True
+    return wrapper
+
+
+class TimedRoute(FastJSONRoute):
+    """
+    Route class that notes when the endpoint returned, so the time spent
+    after it (response_model validation + JSON rendering, or the
+    FastJSONResponse rendering) is reported as serialization time.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+
+# ---------------------------------------------------------------------
+# Histograms and Prometheus exposition
+# ---------------------------------------------------------------------
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _labels(names, values, extra=""):
+    parts = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, buckets, labelnames=("method", "route")):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = _labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+            inf = _labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (method, route, status) -> count
+        self.request_seconds = Histogram(
+            "api_request_duration_seconds", "Total time spent serving the request.", SECONDS_BUCKETS)
+        self.db_seconds = Histogram(
+            "api_db_duration_seconds", "Time spent in Oracle calls (execute and fetch).", SECONDS_BUCKETS)
+        self.round_trips = Histogram(
+            "api_db_round_trips", "Oracle round trips per request (estimated for fetches).", COUNT_BUCKETS)
+        self.rows = Histogram(
+            "api_db_rows_fetched", "Rows fetched from Oracle per request.", ROWS_BUCKETS)
+        self.pool_wait = Histogram(
+            "api_pool_wait_seconds", "Time spent waiting for a pooled connection.", SECONDS_BUCKETS)
+        self.serialization = Histogram(
+            "api_serialization_seconds", "Time spent validating and rendering the response.", SECONDS_BUCKETS)
+
+    def observe(self, method, route, status, seconds, current: RequestMetrics, serialization=None):
+        labels = (method, route)
+        with self._lock:
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_seconds.observe(labels, seconds)
+            self.db_seconds.observe(labels, current.db_seconds)
+            self.round_trips.observe(labels, current.round_trips)
+            self.rows.observe(labels, current.rows)
+            self.pool_wait.observe(labels, current.pool_wait)
+            if serialization is not None:
+                self.serialization.observe(labels, serialization)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP api_requests_total Requests served.",
+                "# TYPE api_requests_total counter",
+            ]
+            for labels, count in sorted(self.requests.items()):
+                lines.append(f"api_requests_total{_labels(('method', 'route', 'status'), labels)} {count}")
+            for histogram in (self.request_seconds, self.db_seconds, self.round_trips,
+                              self.rows, self.pool_wait, self.serialization):
+                lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _route_label(scope):
+    """Route template of the request, with the include_router prefix."""
+    # Newer FastAPI keeps included routes unprefixed and resolves the
+    # full path in an effective route context
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    if context is not None and getattr(context, "path", None):
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording every HTTP request under its route
+    template (e.g. /flights/flights/{vol_num}). It wraps the whole
+    response, so rows fetched while a StreamingResponse is sent count too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current = RequestMetrics(scope)
+        token = _current.set(current)
+        started = time.perf_counter()
+        status = 500
+        response_started = None
+
+        async def send_wrapper(message):
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_started = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            serialization = None
+            if current.endpoint_done is not None and response_started is not None:
+                serialization = max(response_started - current.endpoint_done, 0.0)
+            registry.observe(
+                scope["method"],
+                _route_label(scope),
+                status,
+                time.perf_counter() - started,
+                current,
+                serialization,
+            )
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BulkRowResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error_code: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkSummary(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    results: List[BulkRowResult]
+
+class BatchItem(BaseModel):
+    id: int
+    found: bool
+    item: Optional[dict] = None
+
+class ImportReject(BaseModel):
+    line: int
+    id: Optional[int] = None
+    error: str
+
+class ImportSummary(BaseModel):
+    total: int
+    inserted: int
+    rejected: int
+    rejects: List[ImportReject]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
 from datetime import datetime
 
 class FlightBase(BaseModel):
@@ -22,3 +22,17 @@ class FlightUpdate(BaseModel):
 class FlightOut(FlightBase):
     vol_num: int
     current_capacity: int
+
+FlightSort = Literal["vol_num", "departure_time", "arrival_time"]
+SortOrder = Literal["asc", "desc"]
+ManifestSort = Literal["reservation_id", "seat"]
+
+class FlightFilter(BaseModel):
+    # Frozen (hashable): part of the cache key of get_all_flights
+    model_config = ConfigDict(frozen=True)
+
+    state: Optional[str] = None
+    destination: Optional[str] = None
+    avion_id: Optional[int] = None
+    departure_from: Optional[datetime] = None  # inclusive
+    departure_to: Optional[datetime] = None    # exclusive
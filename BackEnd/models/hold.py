@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class HoldCreate(BaseModel):
+    # Either the exact seats wanted ("12C") or just how many
+    seats: Optional[List[str]] = None
+    count: Optional[int] = None
+
+class HoldOut(BaseModel):
+    hold_id: str
+    vol_num: int
+    seats: List[str]
+    expires_at: datetime
+
+class HoldPassenger(BaseModel):
+    reservation_id: int
+    passenger_id: int
+    guardian_id: Optional[int] = None
+    seatcode: Optional[str] = None
+
+class HoldConfirm(BaseModel):
+    passengers: List[HoldPassenger]
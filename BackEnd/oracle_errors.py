@@ -1,8 +1,29 @@
+from typing import Union
+import oracledb
 from fastapi import HTTPException
 from sqlalchemy.exc import DatabaseError
 
-def handle_oracle_error(e: DatabaseError):
-    code = e.orig.args[0].code
+# Unique indexes from plsql/tables/RESERVATIONS_INDEXES.sql
+UNIQUE_CONSTRAINT_MESSAGES = {
+    "UX_RESERVATIONS_SEAT": "Seat already booked for this flight",
+    "UX_RESERVATIONS_PASSENGER": "Passenger already has a reservation for this flight",
+}
+
+def unique_constraint_message(message: str):
+    """
+    The client-facing text for an ORA-00001 raised by one of the indexes
+    above, or None for any other unique constraint.
+    """
+    message = message.upper()
+    for constraint, detail in UNIQUE_CONSTRAINT_MESSAGES.items():
+        if constraint in message:
+            return detail
+    return None
+
+def handle_oracle_error(e: Union[DatabaseError, oracledb.DatabaseError]):
+    # SQLAlchemy wraps the driver error in .orig, raw cursors raise it as is
+    error = getattr(e, "orig", e).args[0]
+    code = error.code
 
     if code == 1031:
         raise HTTPException(403, "Insufficient privileges")
@@ -11,8 +32,8 @@ def handle_oracle_error(e: DatabaseError):
     if code == 1400:
         raise HTTPException(400, "NULL value not allowed")
     if code == 1:
-        raise HTTPException(409, "Duplicate value")
+        raise HTTPException(409, unique_constraint_message(error.message) or "Duplicate value")
     if 20000 <= code <= 20999:
-        raise HTTPException(409, e.orig.args[0].message)
+        raise HTTPException(409, error.message)
 
     raise HTTPException(500, "Database error")
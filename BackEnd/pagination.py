@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_key) -> str:
+    """Opaque token for the page that starts after last_key."""
+    raw = json.dumps({"k": last_key}, separators=(",", ":"), default=datetime.isoformat).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _cursor_key(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return json.loads(raw)["k"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def decode_cursor(token: str):
+    """Return the last key of the previous page, or None for the first page."""
+    if not token:
+        return None
+    key = _cursor_key(token)
+    if not isinstance(key, int):
+        raise _invalid_cursor()
+    return key
+
+
+def decode_time_cursor(token: str):
+    """
+    (time, key) of the last row of the previous page when a list is sorted
+    on a date column (ties broken by key), or None for the first page.
+    """
+    if not token:
+        return None
+    pair = _cursor_key(token)
+    try:
+        time, key = pair
+        time = datetime.fromisoformat(time)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+    if not isinstance(key, int):
+        raise _invalid_cursor()
+    return time, key
+
+
+def set_next_cursor(response, next_key):
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_key)
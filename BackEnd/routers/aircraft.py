@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.engine import Connection
 from crud import aircraft as crud_aircraft
 from models.aircraft import AircraftCreate, AircraftUpdate, AircraftOut
+from models.bulk import BatchItem
+from multiget import distinct, in_request_order, parse_ids
+from audit import audit, aircraft_changes, aircraft_details, db_user, mark_aircraft_write
 from deps import get_db
 from oracle_errors import handle_oracle_error
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy import text
 import oracledb as cx_Oracle
 from typing import List
+from metrics import TimedRoute
+from etag import conditional, row_version, table_version
+import config
 
-router = APIRouter(prefix="/aircrafts", tags=["Aircrafts"])
+router = APIRouter(prefix="/aircrafts", tags=["Aircrafts"], route_class=TimedRoute)
 
 @router.post("/", status_code=201)
 def create_aircraft(
@@ -17,7 +23,14 @@ def create_aircraft(
     conn: Connection = Depends(get_db)
 ):
     try:
+        previous = mark_aircraft_write(conn.connection.driver_connection, aircraft.avion_id)
         crud_aircraft.add_aircraft(conn, aircraft)
+        if previous is not None:
+            audit.record(
+                "Aircrafts", "INSERT", aircraft.avion_id, db_user(conn),
+                aircraft_details({"modele": aircraft.modele, "capacity": aircraft.max_capacity,
+                                  "state": aircraft.state})
+            )
         return {"message": "Aircraft created successfully"}
     except cx_Oracle.DatabaseError as e:
         error_obj, = e.args
@@ -27,13 +40,31 @@ def create_aircraft(
         )
     
 
+# Declared before /{avion_id} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+def read_aircrafts_batch(ids: List[str] = Query(...), conn: Connection = Depends(get_db)):
+    """
+    Several aircrafts in one round trip: ?ids=1,2,3 (or repeated ?ids=).
+    One entry per requested id, in request order; found is false and
+    item null for ids that do not exist.
+    """
+    ids = parse_ids(ids)
+    rows = crud_aircraft.get_aircrafts_by_ids(conn, distinct(ids))
+    return in_request_order(ids, rows, "avion_id")
+
 @router.get("/{avion_id}", response_model=AircraftOut)
 def read_aircraft(
     avion_id: int,
+    request: Request,
+    response: Response,
     conn: Connection = Depends(get_db)
 ):
+    version = row_version(conn, "Aircrafts", "avion_id", avion_id)
+    not_modified = conditional(request, response, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        row = crud_aircraft.get_aircraft_by_id(conn, avion_id)
+        row = crud_aircraft.get_aircraft_by_id(conn, avion_id, version=version)
         if not row:
             raise HTTPException(status_code=404, detail="Aircraft not found")
 
@@ -53,9 +84,15 @@ def read_aircraft(
         
 @router.get("/", response_model=List[AircraftOut])
 def read_all_aircrafts(
+    request: Request,
+    response: Response,
     conn: Connection = Depends(get_db)
 ):
-    return crud_aircraft.get_aircrafts(conn)
+    version = table_version(conn, "Aircrafts", "avion_id")
+    not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return crud_aircraft.get_aircrafts(conn, version=version)
 
 
 
@@ -66,7 +103,14 @@ def edit_aircraft(
     conn: Connection = Depends(get_db)
 ):
     try:
+        previous = mark_aircraft_write(conn.connection.driver_connection, avion_id)
         crud_aircraft.update_aircraft(conn, avion_id, aircraft)
+        if previous is not None:
+            audit.record(
+                "Aircrafts", "UPDATE", avion_id, db_user(conn),
+                aircraft_changes(previous, {"modele": aircraft.modele, "capacity": aircraft.max_capacity,
+                                            "state": aircraft.state})
+            )
         return {"message": "Aircraft updated successfully"}
     except cx_Oracle.DatabaseError as e:
         error_obj, = e.args
@@ -81,7 +125,10 @@ def remove_aircraft(
     conn: Connection = Depends(get_db)
 ):
     try:
+        previous = mark_aircraft_write(conn.connection.driver_connection, avion_id)
         crud_aircraft.delete_aircraft(conn, avion_id)
+        if previous is not None:
+            audit.record("Aircrafts", "DELETE", avion_id, db_user(conn), aircraft_details(previous))
         return {"message": "Aircraft deleted successfully"}
     except cx_Oracle.DatabaseError as e:
         error_obj, = e.args
@@ -1,8 +1,9 @@
 # routers/auth.py
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
+from metrics import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TimedRoute)
 
 # Simple request model
 class LoginRequest(BaseModel):
@@ -1,13 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request, Header
 from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DatabaseError
 from crud import flight as crud_flight
-from models.flight import FlightCreate, FlightUpdate, FlightOut
+from crud import hold as crud_hold
+from models.flight import FlightCreate, FlightUpdate, FlightOut, FlightFilter, FlightSort, SortOrder, ManifestSort
+from models.bulk import BulkSummary, BatchItem
+from models.hold import HoldCreate, HoldOut, HoldConfirm
 from deps import get_db
+from export import ExportFormat, export_query
 from oracle_errors import handle_oracle_error
-from crud import flight as crud_flight
-from typing import List
+from multiget import distinct, in_request_order, parse_ids
+from pagination import decode_cursor, decode_time_cursor, set_next_cursor
+from etag import conditional, row_version
+from typing import List, Optional
+from datetime import datetime
+import oracledb as cx_Oracle
+import config
+from metrics import TimedRoute
 
-router = APIRouter(prefix="/flights", tags=["Flights"])
+router = APIRouter(prefix="/flights", tags=["Flights"], route_class=TimedRoute)
+
+# Declared before /{vol_num} so "export" is not parsed as an id
+@router.get("/export")
+def export_flights(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every flight row as NDJSON or CSV.
+    """
+    return export_query(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM flights ORDER BY vol_num",
+        format, "flights"
+    )
 
 @router.post("/", response_model=dict)
 def create_flight(flight: FlightCreate, conn: Connection = Depends(get_db)):
@@ -17,6 +45,29 @@ def create_flight(flight: FlightCreate, conn: Connection = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=BulkSummary, status_code=201)
+def create_flights_bulk(flights: List[FlightCreate], response: Response, conn: Connection = Depends(get_db)):
+    """
+    Import a season schedule in one transaction.
+    Either every flight is created (201) or nothing is and every
+    conflicting row is listed (409).
+    """
+    if len(flights) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} flights per request")
+    try:
+        results = crud_flight.add_flights_bulk(conn, flights)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    failed = sum(1 for r in results if not r["ok"])
+    if failed:
+        response.status_code = 409
+    return {
+        "total": len(results),
+        "inserted": 0 if failed else len(results),
+        "failed": failed,
+        "results": results,
+    }
+
 @router.put("/{vol_num}", response_model=dict)
 def modify_flight(vol_num: int, flight: FlightUpdate, conn: Connection = Depends(get_db)):
     try:
@@ -33,17 +84,139 @@ def remove_flight(vol_num: int, conn: Connection = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Declared before /{vol_num} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+def read_flights_batch(ids: List[str] = Query(...), conn: Connection = Depends(get_db)):
+    """
+    Several flights in one round trip: ?ids=1001,1002 (or repeated ?ids=).
+    One entry per requested id, in request order; found is false and
+    item null for ids that do not exist.
+    """
+    ids = parse_ids(ids)
+    rows = crud_flight.get_flights_by_ids(conn, distinct(ids))
+    return in_request_order(ids, rows, "vol_num")
+
 @router.get("/{vol_num}", response_model=dict)
-def read_flight(vol_num: int, conn: Connection = Depends(get_db)):
-    flight = crud_flight.get_flight_by_id(conn, vol_num)
+def read_flight(vol_num: int, request: Request, response: Response, conn: Connection = Depends(get_db)):
+    version = row_version(conn, "Flights", "vol_num", vol_num)
+    not_modified = conditional(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    flight = crud_flight.get_flight_by_id(conn, vol_num, version=version)
     if not flight:
         raise HTTPException(status_code=404, detail="Flight not found")
     return dict(flight._mapping)
 
+@router.get("/{vol_num}/seatmap", response_model=dict)
+def read_seat_map(vol_num: int, conn: Connection = Depends(get_db)):
+    """
+    Every seat of the aircraft as a base64 bitmap: bit i (LSB first in
+    each byte) is set when seat i is taken. Seat i is row i // len(layout) + 1,
+    letter layout[i % len(layout)].
+    """
+    seat_map = crud_flight.get_seat_map(conn, vol_num)
+    if not seat_map:
+        raise HTTPException(status_code=404, detail="Flight not found")
+    return seat_map
+
+@router.get("/{vol_num}/manifest")
+def read_manifest(
+    vol_num: int,
+    request: Request,
+    sort: ManifestSort = "reservation_id",
+    include_cancelled: bool = False,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Boarding manifest streamed as NDJSON or CSV: one row per reservation
+    with seat, state, passenger (name, passport, nationality, age) and
+    guardian, from one joined query. sort=seat orders by seat row then
+    letter. Cancelled reservations are left out unless include_cancelled.
+    """
+    return export_query(
+        request, x_db_user, x_db_password,
+        crud_flight.manifest_sql(sort, include_cancelled),
+        format, f"manifest_{vol_num}", {"vol_num": vol_num},
+        require=crud_flight.FLIGHT_EXISTS_SQL, not_found="Flight not found"
+    )
+
+@router.post("/{vol_num}/holds", response_model=HoldOut, status_code=201)
+def create_hold(vol_num: int, hold: HoldCreate, conn: Connection = Depends(get_db)):
+    """
+    Hold seats for HOLD_TTL seconds while the booking is completed.
+    Send either the seats wanted ("seats": ["12C", "12D"]) or how many
+    ("count": 2). Nothing is held if any seat is unavailable (409).
+    """
+    if (hold.seats is None) == (hold.count is None):
+        raise HTTPException(status_code=400, detail="Give either seats or count")
+    requested = len(hold.seats) if hold.seats is not None else hold.count
+    if not 1 <= requested <= config.MAX_HOLD_SEATS:
+        raise HTTPException(status_code=400, detail=f"Hold between 1 and {config.MAX_HOLD_SEATS} seats")
+    try:
+        return crud_hold.hold_seats(conn, vol_num, hold.seats, hold.count)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+
+@router.post("/{vol_num}/holds/{hold_id}/confirm", response_model=List[dict], status_code=201)
+def confirm_hold(vol_num: int, hold_id: str, confirm: HoldConfirm, conn: Connection = Depends(get_db)):
+    """
+    Turn a hold into reservations, one passenger per held seat.
+    All reservations are created or none is.
+    """
+    try:
+        return crud_hold.confirm_hold(conn, vol_num, hold_id, confirm.passengers)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+
+@router.delete("/{vol_num}/holds/{hold_id}", response_model=dict)
+def release_hold(vol_num: int, hold_id: str, conn: Connection = Depends(get_db)):
+    try:
+        released = crud_hold.release_hold(conn, vol_num, hold_id)
+    except (DatabaseError, cx_Oracle.DatabaseError) as e:
+        handle_oracle_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not released:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return {"message": f"{released} seats released"}
+
 @router.get("/", response_model=List[dict])
-def read_flight( conn: Connection = Depends(get_db)):
-    flight = crud_flight.get_all_flights(conn)
-    return flight
+def read_flights(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    state: Optional[str] = None,
+    destination: Optional[str] = None,
+    avion_id: Optional[int] = None,
+    departure_from: Optional[datetime] = None,
+    departure_to: Optional[datetime] = None,
+    sort: FlightSort = "vol_num",
+    order: SortOrder = "asc",
+    conn: Connection = Depends(get_db)
+):
+    """
+    One page of flights, filtered and sorted by the database: state,
+    destination and avion_id match exactly, departure_from (inclusive) and
+    departure_to (exclusive) bound departure_time; sort by vol_num,
+    departure_time or arrival_time (ties by vol_num), in ascending or
+    descending order. The token for the next page is returned in the
+    X-Next-Cursor header and passed back as ?cursor= with the same
+    filters and sort.
+    Answers 304 when If-None-Match has the page's current ETag.
+    """
+    after = decode_cursor(cursor) if sort == "vol_num" else decode_time_cursor(cursor)
+    filters = FlightFilter(state=state, destination=destination, avion_id=avion_id,
+                           departure_from=departure_from, departure_to=departure_to)
+    version = crud_flight.get_flights_version(conn, filters, after, limit, sort, order)
+    not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    flights, next_key = crud_flight.get_all_flights(conn, after, limit, filters, sort, order, version=version)
+    set_next_cursor(response, next_key)
+    return flights
 
 
 @router.patch("/{vol_num}/state", response_model=dict)
@@ -1,10 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Header
 from sqlalchemy.engine import Connection
 from crud import maintenance as crud_maintenance
 from models.maintenance import MaintenanceCreate, MaintenanceUpdate, MaintenanceOut
 from deps import get_db
+from export import ExportFormat, export_query
 from oracle_errors import handle_oracle_error
-router = APIRouter(prefix="/maintenance", tags=["Maintenance"])
+from metrics import TimedRoute
+from etag import conditional, row_version, table_version
+import config
+router = APIRouter(prefix="/maintenance", tags=["Maintenance"], route_class=TimedRoute)
+
+# Declared before /{maintenance_id} so "export" is not parsed as an id
+@router.get("/export")
+def export_maintenance(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every maintenance row as NDJSON or CSV.
+    """
+    return export_query(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM maintenance ORDER BY maintenance_id",
+        format, "maintenance"
+    )
 
 @router.post("/", response_model=dict)
 def create_maintenance(maintenance: MaintenanceCreate, conn: Connection = Depends(get_db)):
@@ -33,7 +54,11 @@ def remove_maintenance(maintenance_id: int, conn: Connection = Depends(get_db)):
 
 
 @router.get("/", response_model=list)
-def read_all_maintenance(conn: Connection = Depends(get_db)):
+def read_all_maintenance(request: Request, response: Response, conn: Connection = Depends(get_db)):
+    version = table_version(conn, "Maintenance", "maintenance_id")
+    not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
     try:
         rows, columns = crud_maintenance.list_maintenance(conn)
         # Convert all rows to list of dicts
@@ -43,7 +68,11 @@ def read_all_maintenance(conn: Connection = Depends(get_db)):
 
 
 @router.get("/{maintenance_id}", response_model=dict)
-def read_maintenance_by_id(maintenance_id: int, conn: Connection = Depends(get_db)):
+def read_maintenance_by_id(maintenance_id: int, request: Request, response: Response, conn: Connection = Depends(get_db)):
+    version = row_version(conn, "Maintenance", "maintenance_id", maintenance_id)
+    not_modified = conditional(request, response, version)
+    if not_modified is not None:
+        return not_modified
     try:
         rows, columns = crud_maintenance.get_maintenance_by_id(conn, maintenance_id)
         print(columns)
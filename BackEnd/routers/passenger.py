@@ -1,12 +1,38 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request, Header, UploadFile, File
 from sqlalchemy.engine import Connection
 from crud import passenger as crud_passenger
 from models.passenger import PassengerCreate, PassengerUpdate, PassengerOut
+from models.bulk import ImportSummary, BatchItem
+from uploads import UploadFormat, ValidatedUpload, detect_format
 from deps import get_db
+from export import ExportFormat, export_query
 from oracle_errors import handle_oracle_error
-router = APIRouter(prefix="/passengers", tags=["Passengers"])
-from typing import List
+from metrics import TimedRoute
+from typing import List, Optional
 import oracledb as cx_Oracle
+from multiget import distinct, in_request_order, parse_ids
+from pagination import decode_cursor, set_next_cursor
+from etag import conditional, page_version, row_version
+import config
+
+router = APIRouter(prefix="/passengers", tags=["Passengers"], route_class=TimedRoute)
+
+# Declared before /{passenger_id} so "export" is not parsed as an id
+@router.get("/export")
+def export_passengers(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every passenger row as NDJSON or CSV.
+    """
+    return export_query(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM passengers ORDER BY passenger_id",
+        format, "passengers"
+    )
 
 @router.post("/", response_model=dict)
 def create_passenger(passenger: PassengerCreate, conn: Connection = Depends(get_db)):
@@ -16,6 +42,33 @@ def create_passenger(passenger: PassengerCreate, conn: Connection = Depends(get_
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import", response_model=ImportSummary)
+def import_passengers(
+    file: UploadFile = File(...),
+    format: Optional[UploadFormat] = None,
+    conn: Connection = Depends(get_db)
+):
+    """
+    Load passengers from a CSV (header row with PassengerCreate field names)
+    or NDJSON upload. The file is read line by line; every BULK_BATCH_SIZE
+    valid rows are inserted and committed in one round trip.
+    """
+    upload = ValidatedUpload(file.file, detect_format(file.filename, format),
+                             PassengerCreate, "passenger_id", config.BULK_BATCH_SIZE)
+    inserted = 0
+    for lines, chunk in upload:
+        try:
+            results = crud_passenger.add_passengers_bulk(conn, chunk)
+        except cx_Oracle.DatabaseError as e:
+            error_obj, = e.args
+            raise HTTPException(
+                status_code=400,
+                detail=f"Oracle Error {error_obj.code}: {error_obj.message} "
+                       f"({inserted} rows already imported)"
+            )
+        inserted += upload.add_results(lines, results)
+    return upload.summary(inserted)
+
 @router.put("/{passenger_id}", response_model=dict)
 def modify_passenger(passenger_id: int, passenger: PassengerUpdate, conn: Connection = Depends(get_db)):
     try:
@@ -32,6 +85,40 @@ def remove_passenger(passenger_id: int, conn: Connection = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Declared before /{passenger_id} so "search" is not parsed as an id
+@router.get("/search", response_model=List[dict])
+def search_passengers(
+    nom: Optional[str] = None,
+    prenom: Optional[str] = None,
+    num_passeport: Optional[int] = None,
+    nationality: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_SEARCH_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: Connection = Depends(get_db)
+):
+    """
+    The first limit passengers, ordered by name, whose nom and prenom
+    start with the given text (case-insensitive) and whose passport number
+    and nationality are equal to the given ones. Give at least one.
+    """
+    if not (nom or prenom or num_passeport is not None or nationality):
+        raise HTTPException(status_code=400, detail="Give at least one of nom, prenom, num_passeport, nationality")
+    try:
+        return crud_passenger.search_passengers(conn, nom, prenom, num_passeport, nationality, limit)
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Declared before /{passenger_id} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+def read_passengers_batch(ids: List[str] = Query(...), conn: Connection = Depends(get_db)):
+    """
+    Several passengers in one round trip: ?ids=1,2,3 (or repeated ?ids=).
+    One entry per requested id, in request order; found is false and
+    item null for ids that do not exist.
+    """
+    ids = parse_ids(ids)
+    rows = crud_passenger.get_passengers_by_ids(conn, distinct(ids))
+    return in_request_order(ids, rows, "passenger_id")
+
 @router.get("/passport/{num_passeport}", response_model=dict)
 def read_passenger_by_passport(num_passeport: int, conn: Connection = Depends(get_db)):
     try:
@@ -43,9 +130,13 @@ def read_passenger_by_passport(num_passeport: int, conn: Connection = Depends(ge
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{passenger_id}", response_model=dict)
-def read_passenger_by_id(passenger_id: int, conn: Connection = Depends(get_db)):
+def read_passenger_by_id(passenger_id: int, request: Request, response: Response, conn: Connection = Depends(get_db)):
+    version = row_version(conn, "Passengers", "passenger_id", passenger_id)
+    not_modified = conditional(request, response, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        passenger = crud_passenger.get_passenger_by_id(conn, passenger_id)
+        passenger = crud_passenger.get_passenger_by_id(conn, passenger_id, version=version)
         if not passenger:
             raise HTTPException(status_code=404, detail="Passenger not found")
         return passenger
@@ -55,5 +146,23 @@ def read_passenger_by_id(passenger_id: int, conn: Connection = Depends(get_db)):
 
 
 @router.get("/", response_model=List[dict])
-def read_passengers(conn: Connection = Depends(get_db)):
-    return crud_passenger.get_all_passengers(conn)
\ No newline at end of file
+def read_passengers(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: Connection = Depends(get_db)
+):
+    """
+    One page of passengers. The token for the next page is returned in the
+    X-Next-Cursor header and passed back as ?cursor=.
+    Answers 304 when If-None-Match has the page's current ETag.
+    """
+    after = decode_cursor(cursor)
+    version = page_version(conn, "passengers", "passenger_id", after, limit)
+    not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    passengers, next_key = crud_passenger.get_all_passengers(conn, after, limit, version=version)
+    set_next_cursor(response, next_key)
+    return passengers
\ No newline at end of file
@@ -1,27 +1,74 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request, Header
 from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DatabaseError
 from crud import reservation as crud_reservation
 from models.reservation import ReservationCreate, ReservationUpdate, ReservationOut
+from models.bulk import BulkSummary
 from deps import get_db
+from export import ExportFormat, export_query
 import oracledb as cx_Oracle
 from oracle_errors import handle_oracle_error
-from typing import List
+from pagination import decode_cursor, set_next_cursor
+from typing import List, Optional
+import config
+from metrics import TimedRoute
 
-router = APIRouter(prefix="/reservations", tags=["Reservations"])
+router = APIRouter(prefix="/reservations", tags=["Reservations"], route_class=TimedRoute)
+
+# Declared before /{reservation_id} so "export" is not parsed as an id
+@router.get("/export")
+def export_reservations(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every reservation row as NDJSON or CSV.
+    """
+    return export_query(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM reservations ORDER BY reservation_id",
+        format, "reservations"
+    )
 
 @router.post("/", response_model=dict)
 def create_reservation(reservation: ReservationCreate, conn: Connection = Depends(get_db)):
     try:
         crud_reservation.add_reservation(conn, reservation)
         return {"message": "Reservation added successfully"}
+    except DatabaseError as e:
+        handle_oracle_error(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=BulkSummary)
+def create_reservations_bulk(reservations: List[ReservationCreate], conn: Connection = Depends(get_db)):
+    """
+    Book many reservations at once (group / charter bookings).
+    Rows rejected by Oracle are reported individually; the others are kept.
+    """
+    if len(reservations) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} reservations per request")
+    try:
+        results = crud_reservation.add_reservations_bulk(conn, reservations)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+    inserted = sum(1 for r in results if r["ok"])
+    return {
+        "total": len(results),
+        "inserted": inserted,
+        "failed": len(results) - inserted,
+        "results": results,
+    }
+
 @router.put("/{reservation_id}", response_model=dict)
 def modify_reservation(reservation_id: int, reservation: ReservationUpdate, conn: Connection = Depends(get_db)):
     try:
         crud_reservation.update_reservation(conn, reservation_id, reservation)
         return {"message": "Reservation updated successfully"}
+    except DatabaseError as e:
+        handle_oracle_error(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -50,11 +97,20 @@ def read_reservation_by_passport(reservation_id: int, conn: Connection = Depends
 
 
 @router.get("/", response_model=List[dict])
-def read_reservations(conn: Connection = Depends(get_db)):
+def read_reservations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: Connection = Depends(get_db)
+):
+    """
+    One page of reservations. The token for the next page is returned in the
+    X-Next-Cursor header and passed back as ?cursor=.
+    """
     try:
-        reservation = crud_reservation.get_all_reservations(conn)
-
-        return reservation
+        reservations, next_key = crud_reservation.get_all_reservations(conn, decode_cursor(cursor), limit)
+        set_next_cursor(response, next_key)
+        return reservations
     
     except cx_Oracle.DatabaseError as e:
         error_obj, = e.args
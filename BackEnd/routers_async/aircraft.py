@@ -0,0 +1,127 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from crud_async import aircraft as crud_aircraft
+from models.aircraft import AircraftCreate, AircraftUpdate, AircraftOut
+from models.bulk import BatchItem
+from multiget import distinct, in_request_order, parse_ids
+from audit import audit, aircraft_changes, aircraft_details, db_user, mark_aircraft_write_async
+from deps import get_async_db
+import oracledb as cx_Oracle
+from typing import List
+from metrics import TimedRoute
+from etag import conditional, row_version_async, table_version_async
+import config
+
+router = APIRouter(prefix="/aircrafts", tags=["Aircrafts"], route_class=TimedRoute)
+
+@router.post("/", status_code=201)
+async def create_aircraft(
+    aircraft: AircraftCreate,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        previous = await mark_aircraft_write_async(conn, aircraft.avion_id)
+        await crud_aircraft.add_aircraft(conn, aircraft)
+        if previous is not None:
+            audit.record(
+                "Aircrafts", "INSERT", aircraft.avion_id, db_user(conn),
+                aircraft_details({"modele": aircraft.modele, "capacity": aircraft.max_capacity,
+                                  "state": aircraft.state})
+            )
+        return {"message": "Aircraft created successfully"}
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
+
+
+# Declared before /{avion_id} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+async def read_aircrafts_batch(ids: List[str] = Query(...), conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    ids = parse_ids(ids)
+    try:
+        rows = await crud_aircraft.get_aircrafts_by_ids(conn, distinct(ids))
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return in_request_order(ids, rows, "avion_id")
+
+@router.get("/{avion_id}", response_model=AircraftOut)
+async def read_aircraft(
+    avion_id: int,
+    request: Request,
+    response: Response,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        version = await row_version_async(conn, "Aircrafts", "avion_id", avion_id)
+        not_modified = conditional(request, response, version)
+        if not_modified is not None:
+            return not_modified
+        row = await crud_aircraft.get_aircraft_by_id(conn, avion_id, version=version)
+        if not row:
+            raise HTTPException(status_code=404, detail="Aircraft not found")
+        return AircraftOut(**row)
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
+
+@router.get("/", response_model=List[AircraftOut])
+async def read_all_aircrafts(
+    request: Request,
+    response: Response,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        version = await table_version_async(conn, "Aircrafts", "avion_id")
+        not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        return await crud_aircraft.get_aircrafts(conn, version=version)
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.put("/{avion_id}")
+async def edit_aircraft(
+    avion_id: int,
+    aircraft: AircraftUpdate,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        previous = await mark_aircraft_write_async(conn, avion_id)
+        await crud_aircraft.update_aircraft(conn, avion_id, aircraft)
+        if previous is not None:
+            audit.record(
+                "Aircrafts", "UPDATE", avion_id, db_user(conn),
+                aircraft_changes(previous, {"modele": aircraft.modele, "capacity": aircraft.max_capacity,
+                                            "state": aircraft.state})
+            )
+        return {"message": "Aircraft updated successfully"}
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
+
+@router.delete("/{avion_id}")
+async def remove_aircraft(
+    avion_id: int,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        previous = await mark_aircraft_write_async(conn, avion_id)
+        await crud_aircraft.delete_aircraft(conn, avion_id)
+        if previous is not None:
+            audit.record("Aircrafts", "DELETE", avion_id, db_user(conn), aircraft_details(previous))
+        return {"message": "Aircraft deleted successfully"}
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
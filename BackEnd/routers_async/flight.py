@@ -0,0 +1,214 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Header
+from crud_async import flight as crud_flight
+from crud_async import hold as crud_hold
+from models.flight import FlightCreate, FlightUpdate, FlightFilter, FlightSort, SortOrder, ManifestSort
+from export import ExportFormat, export_query_async
+from models.bulk import BulkSummary, BatchItem
+from models.hold import HoldCreate, HoldOut, HoldConfirm
+from oracle_errors import handle_oracle_error
+from deps import get_async_db
+import oracledb as cx_Oracle
+from typing import List, Optional
+from datetime import datetime
+from multiget import distinct, in_request_order, parse_ids
+from pagination import decode_cursor, decode_time_cursor, set_next_cursor
+from etag import conditional, row_version_async
+import config
+from metrics import TimedRoute
+
+router = APIRouter(prefix="/flights", tags=["Flights"], route_class=TimedRoute)
+
+# Declared before /{vol_num} so "export" is not parsed as an id
+@router.get("/export")
+async def export_flights(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every flight row as NDJSON or CSV.
+    """
+    return await export_query_async(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM flights ORDER BY vol_num",
+        format, "flights"
+    )
+
+@router.post("/", response_model=dict)
+async def create_flight(flight: FlightCreate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_flight.add_flight(conn, flight)
+        return {"message": "Flight created successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=BulkSummary, status_code=201)
+async def create_flights_bulk(flights: List[FlightCreate], response: Response,
+                              conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Import a season schedule in one transaction.
+    Either every flight is created (201) or nothing is and every
+    conflicting row is listed (409).
+    """
+    if len(flights) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} flights per request")
+    try:
+        results = await crud_flight.add_flights_bulk(conn, flights)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    failed = sum(1 for r in results if not r["ok"])
+    if failed:
+        response.status_code = 409
+    return {
+        "total": len(results),
+        "inserted": 0 if failed else len(results),
+        "failed": failed,
+        "results": results,
+    }
+
+@router.put("/{vol_num}", response_model=dict)
+async def modify_flight(vol_num: int, flight: FlightUpdate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_flight.update_flight(conn, vol_num, flight)
+        return {"message": "Flight updated successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{vol_num}", response_model=dict)
+async def remove_flight(vol_num: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_flight.delete_flight(conn, vol_num)
+        return {"message": "Flight deleted successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Declared before /{vol_num} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+async def read_flights_batch(ids: List[str] = Query(...), conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    ids = parse_ids(ids)
+    try:
+        rows = await crud_flight.get_flights_by_ids(conn, distinct(ids))
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return in_request_order(ids, rows, "vol_num")
+
+@router.get("/{vol_num}", response_model=dict)
+async def read_flight(vol_num: int, request: Request, response: Response, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    version = await row_version_async(conn, "Flights", "vol_num", vol_num)
+    not_modified = conditional(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    flight = await crud_flight.get_flight_by_id(conn, vol_num, version=version)
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+    return flight
+
+@router.get("/{vol_num}/seatmap", response_model=dict)
+async def read_seat_map(vol_num: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Every seat of the aircraft as a base64 bitmap (see the sync route).
+    """
+    seat_map = await crud_flight.get_seat_map(conn, vol_num)
+    if not seat_map:
+        raise HTTPException(status_code=404, detail="Flight not found")
+    return seat_map
+
+@router.get("/", response_model=List[dict])
+async def read_flights(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    state: Optional[str] = None,
+    destination: Optional[str] = None,
+    avion_id: Optional[int] = None,
+    departure_from: Optional[datetime] = None,
+    departure_to: Optional[datetime] = None,
+    sort: FlightSort = "vol_num",
+    order: SortOrder = "asc",
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        after = decode_cursor(cursor) if sort == "vol_num" else decode_time_cursor(cursor)
+        filters = FlightFilter(state=state, destination=destination, avion_id=avion_id,
+                               departure_from=departure_from, departure_to=departure_to)
+        version = await crud_flight.get_flights_version(conn, filters, after, limit, sort, order)
+        not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        flights, next_key = await crud_flight.get_all_flights(conn, after, limit, filters, sort, order,
+                                                              version=version)
+        set_next_cursor(response, next_key)
+        return flights
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/{vol_num}/manifest")
+async def read_manifest(
+    vol_num: int,
+    request: Request,
+    sort: ManifestSort = "reservation_id",
+    include_cancelled: bool = False,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    return await export_query_async(
+        request, x_db_user, x_db_password,
+        crud_flight.manifest_sql(sort, include_cancelled),
+        format, f"manifest_{vol_num}", {"vol_num": vol_num},
+        require=crud_flight.FLIGHT_EXISTS_SQL, not_found="Flight not found"
+    )
+
+@router.post("/{vol_num}/holds", response_model=HoldOut, status_code=201)
+async def create_hold(vol_num: int, hold: HoldCreate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Hold seats for HOLD_TTL seconds while the booking is completed.
+    Send either the seats wanted ("seats": ["12C", "12D"]) or how many
+    ("count": 2). Nothing is held if any seat is unavailable (409).
+    """
+    if (hold.seats is None) == (hold.count is None):
+        raise HTTPException(status_code=400, detail="Give either seats or count")
+    requested = len(hold.seats) if hold.seats is not None else hold.count
+    if not 1 <= requested <= config.MAX_HOLD_SEATS:
+        raise HTTPException(status_code=400, detail=f"Hold between 1 and {config.MAX_HOLD_SEATS} seats")
+    try:
+        return await crud_hold.hold_seats(conn, vol_num, hold.seats, hold.count)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+
+@router.post("/{vol_num}/holds/{hold_id}/confirm", response_model=List[dict], status_code=201)
+async def confirm_hold(vol_num: int, hold_id: str, confirm: HoldConfirm,
+                       conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Turn a hold into reservations, one passenger per held seat.
+    All reservations are created or none is.
+    """
+    try:
+        return await crud_hold.confirm_hold(conn, vol_num, hold_id, confirm.passengers)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+
+@router.delete("/{vol_num}/holds/{hold_id}", response_model=dict)
+async def release_hold(vol_num: int, hold_id: str, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        released = await crud_hold.release_hold(conn, vol_num, hold_id)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+    if not released:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return {"message": f"{released} seats released"}
+
+
+@router.patch("/{vol_num}/state", response_model=dict)
+async def update_flight_state(vol_num: int, new_state: str, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Change the state of a flight using DBA procedure.
+    """
+    try:
+        await crud_flight.change_flight_state(conn, vol_num, new_state)
+        return {"message": f"Flight state changed to {new_state}"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
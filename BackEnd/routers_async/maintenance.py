@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Header
+from crud_async import maintenance as crud_maintenance
+from models.maintenance import MaintenanceCreate, MaintenanceUpdate
+from deps import get_async_db
+from export import ExportFormat, export_query_async
+import oracledb as cx_Oracle
+from metrics import TimedRoute
+from etag import conditional, row_version_async, table_version_async
+import config
+
+router = APIRouter(prefix="/maintenance", tags=["Maintenance"], route_class=TimedRoute)
+
+# Declared before /{maintenance_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_maintenance(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every maintenance row as NDJSON or CSV.
+    """
+    return await export_query_async(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM maintenance ORDER BY maintenance_id",
+        format, "maintenance"
+    )
+
+@router.post("/", response_model=dict)
+async def create_maintenance(maintenance: MaintenanceCreate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_maintenance.add_maintenance(conn, maintenance)
+        return {"message": "Maintenance added successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{maintenance_id}", response_model=dict)
+async def modify_maintenance(maintenance_id: int, maintenance: MaintenanceUpdate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_maintenance.update_maintenance(conn, maintenance_id, maintenance)
+        return {"message": "Maintenance updated successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{maintenance_id}", response_model=dict)
+async def remove_maintenance(maintenance_id: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_maintenance.delete_maintenance(conn, maintenance_id)
+        return {"message": "Maintenance deleted successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=list)
+async def read_all_maintenance(request: Request, response: Response, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        version = await table_version_async(conn, "Maintenance", "maintenance_id")
+        not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        rows, columns = await crud_maintenance.list_maintenance(conn)
+        return [dict(zip(columns, row)) for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{maintenance_id}", response_model=dict)
+async def read_maintenance_by_id(maintenance_id: int, request: Request, response: Response, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        version = await row_version_async(conn, "Maintenance", "maintenance_id", maintenance_id)
+        not_modified = conditional(request, response, version)
+        if not_modified is not None:
+            return not_modified
+        rows, columns = await crud_maintenance.get_maintenance_by_id(conn, maintenance_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Maintenance not found")
+    return dict(zip(columns, rows[0]))
@@ -0,0 +1,156 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Header, UploadFile, File
+from crud_async import passenger as crud_passenger
+from models.passenger import PassengerCreate, PassengerUpdate
+from models.bulk import BatchItem, ImportSummary
+from uploads import UploadFormat, ValidatedUpload, detect_format
+from export import ExportFormat, export_query_async
+from deps import get_async_db
+import oracledb as cx_Oracle
+from typing import List, Optional
+from multiget import distinct, in_request_order, parse_ids
+from pagination import decode_cursor, set_next_cursor
+from etag import conditional, page_version_async, row_version_async
+import config
+from metrics import TimedRoute
+
+router = APIRouter(prefix="/passengers", tags=["Passengers"], route_class=TimedRoute)
+
+# Declared before /{passenger_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_passengers(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every passenger row as NDJSON or CSV.
+    """
+    return await export_query_async(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM passengers ORDER BY passenger_id",
+        format, "passengers"
+    )
+
+@router.post("/", response_model=dict)
+async def create_passenger(passenger: PassengerCreate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_passenger.add_passenger(conn, passenger)
+        return {"message": "Passenger added successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/import", response_model=ImportSummary)
+async def import_passengers(
+    file: UploadFile = File(...),
+    format: Optional[UploadFormat] = None,
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    """
+    Load passengers from a CSV (header row with PassengerCreate field names)
+    or NDJSON upload. The file is read line by line; every BULK_BATCH_SIZE
+    valid rows are inserted and committed in one round trip.
+    """
+    upload = ValidatedUpload(file.file, detect_format(file.filename, format),
+                             PassengerCreate, "passenger_id", config.BULK_BATCH_SIZE)
+    inserted = 0
+    for lines, chunk in upload:
+        try:
+            results = await crud_passenger.add_passengers_bulk(conn, chunk)
+        except cx_Oracle.DatabaseError as e:
+            error_obj, = e.args
+            raise HTTPException(
+                status_code=400,
+                detail=f"Oracle Error {error_obj.code}: {error_obj.message} "
+                       f"({inserted} rows already imported)"
+            )
+        inserted += upload.add_results(lines, results)
+    return upload.summary(inserted)
+
+@router.put("/{passenger_id}", response_model=dict)
+async def modify_passenger(passenger_id: int, passenger: PassengerUpdate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_passenger.update_passenger(conn, passenger_id, passenger)
+        return {"message": "Passenger updated successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{passenger_id}", response_model=dict)
+async def remove_passenger(passenger_id: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_passenger.delete_passenger(conn, passenger_id)
+        return {"message": "Passenger deleted successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Declared before /{passenger_id} so "search" is not parsed as an id
+@router.get("/search", response_model=List[dict])
+async def search_passengers(
+    nom: Optional[str] = None,
+    prenom: Optional[str] = None,
+    num_passeport: Optional[int] = None,
+    nationality: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_SEARCH_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    if not (nom or prenom or num_passeport is not None or nationality):
+        raise HTTPException(status_code=400, detail="Give at least one of nom, prenom, num_passeport, nationality")
+    try:
+        return await crud_passenger.search_passengers(conn, nom, prenom, num_passeport, nationality, limit)
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Declared before /{passenger_id} so "batch" is not parsed as an id
+@router.get("/batch", response_model=List[BatchItem])
+async def read_passengers_batch(ids: List[str] = Query(...), conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    ids = parse_ids(ids)
+    try:
+        rows = await crud_passenger.get_passengers_by_ids(conn, distinct(ids))
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return in_request_order(ids, rows, "passenger_id")
+
+@router.get("/passport/{num_passeport}", response_model=dict)
+async def read_passenger_by_passport(num_passeport: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        passenger = await crud_passenger.get_passenger_by_passport(conn, num_passeport)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not passenger:
+        raise HTTPException(status_code=404, detail="Passenger not found")
+    return passenger
+
+@router.get("/{passenger_id}", response_model=dict)
+async def read_passenger_by_id(passenger_id: int, request: Request, response: Response, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        version = await row_version_async(conn, "Passengers", "passenger_id", passenger_id)
+        not_modified = conditional(request, response, version)
+        if not_modified is not None:
+            return not_modified
+        passenger = await crud_passenger.get_passenger_by_id(conn, passenger_id, version=version)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not passenger:
+        raise HTTPException(status_code=404, detail="Passenger not found")
+    return passenger
+
+
+@router.get("/", response_model=List[dict])
+async def read_passengers(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        after = decode_cursor(cursor)
+        version = await page_version_async(conn, "passengers", "passenger_id", after, limit)
+        not_modified = conditional(request, response, version, config.LIST_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        passengers, next_key = await crud_passenger.get_all_passengers(conn, after, limit, version=version)
+        set_next_cursor(response, next_key)
+        return passengers
+    except cx_Oracle.DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request, Header
+from crud_async import reservation as crud_reservation
+from models.reservation import ReservationCreate, ReservationUpdate
+from models.bulk import BulkSummary
+from deps import get_async_db
+from export import ExportFormat, export_query_async
+import oracledb as cx_Oracle
+from oracle_errors import handle_oracle_error
+from typing import List, Optional
+from pagination import decode_cursor, set_next_cursor
+import config
+from metrics import TimedRoute
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"], route_class=TimedRoute)
+
+# Declared before /{reservation_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_reservations(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    x_db_user: str = Header(...),
+    x_db_password: str = Header(...)
+):
+    """
+    Stream every reservation row as NDJSON or CSV.
+    """
+    return await export_query_async(
+        request, x_db_user, x_db_password,
+        "SELECT * FROM reservations ORDER BY reservation_id",
+        format, "reservations"
+    )
+
+@router.post("/", response_model=dict)
+async def create_reservation(reservation: ReservationCreate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_reservation.add_reservation(conn, reservation)
+        return {"message": "Reservation added successfully"}
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=BulkSummary)
+async def create_reservations_bulk(reservations: List[ReservationCreate], conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    """
+    Book many reservations at once (group / charter bookings).
+    Rows rejected by Oracle are reported individually; the others are kept.
+    """
+    if len(reservations) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} reservations per request")
+    try:
+        results = await crud_reservation.add_reservations_bulk(conn, reservations)
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+    inserted = sum(1 for r in results if r["ok"])
+    return {
+        "total": len(results),
+        "inserted": inserted,
+        "failed": len(results) - inserted,
+        "results": results,
+    }
+
+@router.put("/{reservation_id}", response_model=dict)
+async def modify_reservation(reservation_id: int, reservation: ReservationUpdate, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_reservation.update_reservation(conn, reservation_id, reservation)
+        return {"message": "Reservation updated successfully"}
+    except cx_Oracle.DatabaseError as e:
+        handle_oracle_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{reservation_id}", response_model=dict)
+async def remove_reservation(reservation_id: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        await crud_reservation.delete_reservation(conn, reservation_id)
+        return {"message": "Reservation deleted successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/passport/{num_passeport}", response_model=dict)
+async def read_reservation_by_passport(num_passeport: int, conn: cx_Oracle.AsyncConnection = Depends(get_async_db)):
+    try:
+        reservation = await crud_reservation.get_reservation_by_passport(conn, num_passeport)
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
+    if not reservation or reservation["reservation_id"] is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return reservation
+
+
+@router.get("/", response_model=List[dict])
+async def read_reservations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    conn: cx_Oracle.AsyncConnection = Depends(get_async_db)
+):
+    try:
+        reservations, next_key = await crud_reservation.get_all_reservations(conn, decode_cursor(cursor), limit)
+        set_next_cursor(response, next_key)
+        return reservations
+    except cx_Oracle.DatabaseError as e:
+        error_obj, = e.args
+        raise HTTPException(
+            status_code=400,
+            detail=f"Oracle Error {error_obj.code}: {error_obj.message}"
+        )
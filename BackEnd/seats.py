@@ -0,0 +1,52 @@
+import base64
+import re
+
+import config
+
+_SEAT_RE = re.compile(r"^\s*(?:(\d+)\s*([A-Za-z])|([A-Za-z])\s*(\d+))\s*$")
+
+
+def seat_code(index: int) -> str:
+    """0-based seat index -> seat code (0 -> '1A', 6 -> '2A' with 6 letters)."""
+    per_row = len(config.SEAT_LETTERS)
+    return f"{index // per_row + 1}{config.SEAT_LETTERS[index % per_row]}"
+
+
+def seat_index(code: str):
+    """
+    Seat code -> 0-based index, or None if it does not fit the layout.
+    Accepts row-first ('12C') and letter-first ('C12') codes.
+    """
+    match = _SEAT_RE.match(code or "")
+    if not match:
+        return None
+    row = int(match.group(1) or match.group(4))
+    letter = (match.group(2) or match.group(3)).upper()
+    if row < 1 or letter not in config.SEAT_LETTERS:
+        return None
+    return (row - 1) * len(config.SEAT_LETTERS) + config.SEAT_LETTERS.index(letter)
+
+
+def canonical_seat_code(code: str) -> str:
+    """
+    Text form stored in Reservations.SeatCode by trg_reservation_seatcode:
+    'C12', 'c 12' and '012C' all become '12C'. Other codes are only
+    stripped of blanks and upper-cased.
+    """
+    match = _SEAT_RE.match(code or "")
+    if not match:
+        return re.sub(r"\s", "", code).upper() if code else code
+    row = int(match.group(1) or match.group(4))
+    letter = (match.group(2) or match.group(3)).upper()
+    return f"{row}{letter}"
+
+
+def encode_bitmap(capacity: int, taken_indexes) -> str:
+    """
+    Base64 bitmap of capacity bits; bit i (LSB first in each byte) is
+    set when seat i is taken.
+    """
+    bitmap = bytearray((capacity + 7) // 8)
+    for index in taken_indexes:
+        bitmap[index >> 3] |= 1 << (index & 7)
+    return base64.b64encode(bytes(bitmap)).decode()
@@ -0,0 +1,115 @@
+import json
+import threading
+from collections import deque
+from datetime import date, datetime
+
+import config
+
+# Bind names whose values are never shown
+_SENSITIVE = ("password", "passwd", "pwd", "secret", "token", "passeport", "passport", "contact")
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float, date, datetime)):
+        return value if not isinstance(value, (date, datetime)) else value.isoformat()
+    if isinstance(value, str):
+        return value if config.SLOW_QUERY_BIND_VALUES else f"<str len={len(value)}>"
+    # cursor.var() out binds, LOBs, ...
+    return f"<{type(value).__name__}>"
+
+
+def redact(binds):
+    """Bind values safe to keep in memory / on disk."""
+    if binds is None:
+        return None
+    if isinstance(binds, dict):
+        return {
+            key: "***" if any(s in key.lower() for s in _SENSITIVE) else _redact_value(value)
+            for key, value in binds.items()
+        }
+    if isinstance(binds, (list, tuple)):
+        return [_redact_value(value) for value in binds]
+    return _redact_value(binds)
+
+
+def _describe(call, args, kwargs):
+    """(statement, binds) for one cursor call."""
+    if call in ("callproc", "callfunc"):
+        name = args[0] if args else kwargs.get("name")
+        position = 1 if call == "callproc" else 2
+        binds = args[position] if len(args) > position else kwargs.get("parameters")
+        if binds is None:
+            binds = kwargs.get("keyword_parameters")
+        return f"{call} {name}", redact(binds)
+
+    statement = args[0] if args else kwargs.get("statement", "")
+    binds = args[1] if len(args) > 1 else kwargs.get("parameters")
+    if binds is None:
+        binds = {k: v for k, v in kwargs.items() if k != "statement"} or None
+    if call == "executemany":
+        if isinstance(binds, (list, tuple)):
+            binds = {"rows": len(binds), "first": redact(binds[0]) if binds else None}
+        else:
+            binds = {"rows": binds}
+    else:
+        binds = redact(binds)
+    return " ".join(str(statement).split()), binds
+
+
+class SlowQueryLog:
+    """
+    Bounded ring buffer of Oracle calls that took longer than threshold
+    seconds, fed by the instrumented cursors in metrics.py (so it sees
+    conn.execute(text(...)) and raw callproc alike).
+    With SLOW_QUERY_LOG_PATH set, every entry is also appended to that
+    file as one JSON line.
+    """
+
+    def __init__(self, threshold: float = config.SLOW_QUERY_THRESHOLD,
+                 maxlen: int = config.SLOW_QUERY_BUFFER,
+                 path: str = config.SLOW_QUERY_LOG_PATH):
+        self.threshold = threshold
+        self.path = path
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, call, args, kwargs, elapsed, rowcount, route):
+        statement, binds = _describe(call, args, kwargs)
+        entry = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "route": route,
+            "call": call,
+            "statement": statement[:config.SLOW_QUERY_MAX_SQL],
+            "binds": binds,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rowcount": rowcount,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+
+    def entries(self, limit: int = None):
+        """Most recent first."""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "buffered": len(self._entries),
+            "capacity": self._entries.maxlen,
+            "total": self.total,
+            "path": self.path,
+        }
+
+
+slow_log = SlowQueryLog()
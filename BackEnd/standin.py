@@ -0,0 +1,2143 @@
+"""
+In-process stand-in for the AE Oracle schema, used when
+config.DB_BACKEND = "standin" so the API can run (and be load-tested)
+without an Oracle instance.
+
+It is a DB-API driver, not a SQL engine: every statement the crud code,
+the hold / export endpoints, the state refresher, the audit pipeline and
+SQLAlchemy's dialect send is matched against a fixed list of patterns,
+and every PL/SQL procedure or function they call (add_new_flight,
+list_maintenance, AE.get_all_aircrafts_infos, ...) is re-implemented in
+Python with the checks and error codes of DBHandler/AE.sql and the
+triggers in plsql/. A statement that is not known raises ORA-00900, so a
+new query has to be taught here before it can run offline.
+
+Data lives in memory, in one process-wide database seeded on first use
+with deterministic data (config.STANDIN_*).
+Transactions are per connection (commit / rollback / statement-level
+rollback on error) and written rows stay locked until commit, so
+concurrent writers wait on each other like they do on Oracle. Reads are
+not isolated: they see other sessions' uncommitted rows.
+"""
+import asyncio
+import bisect
+import functools
+import itertools
+import operator
+import random
+import re
+import threading
+import time
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import oracledb
+
+import config
+import state_refresh
+from metrics import TimedCursorMixin, TimedAsyncCursorMixin
+from audit import MARK_AIRCRAFT_SQL, aircraft_changes, aircraft_details
+from seats import canonical_seat_code, seat_code
+
+NUMBER = oracledb.DB_TYPE_NUMBER
+VARCHAR = oracledb.DB_TYPE_VARCHAR
+DATE = oracledb.DB_TYPE_DATE
+ROWID = oracledb.DB_TYPE_ROWID
+CURSOR = oracledb.DB_TYPE_CURSOR
+
+LOCK_TIMEOUT = 30  # seconds a statement waits for rows locked by another session
+
+# ORA_ROWSCN, kept per row (as with ROWDEPENDENCIES): the SCN of the
+# statement that last wrote it. A rollback puts the old row, and SCN, back.
+ROWSCN = "ora_rowscn"
+
+
+# ---------------------------------------------------------------------
+# Errors
+# ---------------------------------------------------------------------
+
+class _Busy(Exception):
+    """A row the statement needs is locked by another session."""
+
+
+def _error(code: int, message: str, offset: int = 0):
+    return oracledb._Error(message=f"ORA-{code:05d}: {message}", code=code, offset=offset)
+
+
+def _raise(code: int, message: str, exc=oracledb.DatabaseError):
+    raise exc(_error(code, message))
+
+
+def _app_error(code: int, message: str):
+    # RAISE_APPLICATION_ERROR(-code, message)
+    _raise(code, message)
+
+
+def _no_data_found():
+    _raise(1403, "no data found")
+
+
+def _unsupported(sql: str):
+    _raise(900, f"invalid SQL statement (not emulated by the stand-in): {sql[:200]}")
+
+
+def _sysdate():
+    return datetime.now().replace(microsecond=0)
+
+
+def _bind_value(value):
+    # Oracle DATE: no time zone, no fractional seconds
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None, microsecond=0)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _trunc(value: datetime):
+    return value.replace(hour=0, minute=0, second=0)
+
+
+# ---------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------
+
+Rows = namedtuple("Rows", "columns rows")  # columns: [(NAME, db type)]
+
+# name -> columns (name, type, not null), primary key, unique indexes,
+# non-unique lookups, foreign keys, check constraints
+SCHEMA = {
+    "aircrafts": dict(
+        columns=[("avion_id", NUMBER, True), ("modele", VARCHAR, True),
+                 ("maxcapacity", NUMBER, True), ("state", VARCHAR, False)],
+        key="avion_id",
+        checks={"CHK_AIRCRAFTS_STATE": ("state", {"Ready", "Flying", "Turnaround", "Maintenance", "Out of Service"})},
+    ),
+    "flights": dict(
+        columns=[("vol_num", NUMBER, True), ("destination", VARCHAR, True),
+                 ("departure_time", DATE, True), ("arrival_time", DATE, True),
+                 ("currentcapacity", NUMBER, True), ("state", VARCHAR, False),
+                 ("avion_id", NUMBER, False)],
+        key="vol_num",
+        groups=["avion_id"],
+        parents={"FK_AVION": ("avion_id", "aircrafts")},
+        checks={"CHK_FLIGHT_STATE": ("state", {"Scheduled", "In Service", "Cancelled", "Full"})},
+    ),
+    "passengers": dict(
+        columns=[("passenger_id", NUMBER, True), ("prenom", VARCHAR, True),
+                 ("nom", VARCHAR, True), ("numpasseport", NUMBER, False),
+                 ("contact", VARCHAR, True), ("nationality", VARCHAR, True),
+                 ("age", NUMBER, True)],
+        key="passenger_id",
+        unique={"SYS_C_PASSENGERS_PASSPORT": ("numpasseport",)},
+    ),
+    "reservations": dict(
+        columns=[("reservation_id", NUMBER, True), ("passenger_id", NUMBER, True),
+                 ("vol_num", NUMBER, True), ("seatcode", VARCHAR, True),
+                 ("state", VARCHAR, False), ("guardian_id", NUMBER, False)],
+        key="reservation_id",
+        unique={"UX_RESERVATIONS_SEAT": ("vol_num", "seatcode"),
+                "UX_RESERVATIONS_PASSENGER": ("passenger_id", "vol_num")},
+        # Function-based indexes: cancelled reservations are not indexed
+        unique_skip={"UX_RESERVATIONS_SEAT": ("state", "Cancelled"),
+                     "UX_RESERVATIONS_PASSENGER": ("state", "Cancelled")},
+        groups=["passenger_id", "vol_num", "guardian_id"],
+        parents={"FK_PASSENGER": ("passenger_id", "passengers"),
+                 "FK_FLIGHTS": ("vol_num", "flights"),
+                 "FK_GUARDIAN": ("guardian_id", "passengers")},
+        checks={"CHK_RESERVATION_STATE": ("state", {"Pending", "Confirmed", "Cancelled", "Boarded"})},
+    ),
+    "maintenance": dict(
+        columns=[("maintenance_id", NUMBER, True), ("avion_id", NUMBER, False),
+                 ("operationdate", DATE, True), ("typee", VARCHAR, True),
+                 ("state", VARCHAR, True)],
+        key="maintenance_id",
+        groups=["avion_id"],
+        parents={"FK_AVION_MAINTENANCE": ("avion_id", "aircrafts")},
+        checks={"CK_MAINTENANCE_TYPE": ("typee", {"Inspection", "Repair", "Cleaning"}),
+                "CHK_MAINTENANCE_STATE": ("state", {"Scheduled", "In Progress", "Completed"})},
+    ),
+    "seat_inventory": dict(
+        columns=[("vol_num", NUMBER, True), ("seat_no", NUMBER, True),
+                 ("seatcode", VARCHAR, True), ("status", VARCHAR, True),
+                 ("hold_id", VARCHAR, False), ("hold_expires", DATE, False),
+                 ("reservation_id", NUMBER, False)],
+        key=("vol_num", "seat_no"),
+        unique={"UX_SEAT_INVENTORY_CODE": ("vol_num", "seatcode")},
+        groups=["vol_num"],
+        checks={"CHK_SEAT_INVENTORY_STATUS": ("status", {"Free", "Held", "Booked"})},
+    ),
+    "logs": dict(
+        columns=[("logid", NUMBER, True), ("tablename", VARCHAR, False),
+                 ("operation", VARCHAR, False), ("recordid", NUMBER, False),
+                 ("details", VARCHAR, False), ("logdate", DATE, False)],
+        key="logid",
+    ),
+}
+
+
+class Table:
+    """
+    Rows of one table keyed by primary key, with the indexes the
+    emulated statements need. Rows are never mutated in place: an update
+    stores a new dict, so the undo log can keep the old one.
+    """
+
+    def __init__(self, db, name, columns, key, unique=None, unique_skip=None, groups=(), parents=None,
+                 checks=None):
+        self.db = db
+        self.name = name
+        self.columns = [c for c, _, _ in columns]
+        self.types = {c: t for c, t, _ in columns}
+        self.types[ROWSCN] = NUMBER
+        self.not_null = [c for c, _, required in columns if required]
+        self.key = key
+        self.pk_name = f"PK_{name.upper()}"
+        self.unique = {index: (cols, {}) for index, cols in (unique or {}).items()}
+        self.unique_skip = unique_skip or {}
+        self.groups = {col: defaultdict(set) for col in groups}
+        self.parents = parents or {}
+        self.checks = checks or {}
+        self.children = []  # (child table name, column, constraint)
+        self.rows = {}
+        self._keys = None
+
+    def pk(self, row):
+        if isinstance(self.key, tuple):
+            return tuple(row[c] for c in self.key)
+        return row[self.key]
+
+    def _unique_value(self, index, cols, row):
+        # None when the row is left out of the index (NULL key or skipped)
+        skip = self.unique_skip.get(index)
+        if skip is not None and row[skip[0]] == skip[1]:
+            return None
+        value = tuple(row[c] for c in cols)
+        return None if None in value else value
+
+    def lookup(self, index: str, value):
+        return self.unique[index][1].get(value)
+
+    def group(self, col: str, value):
+        return [self.rows[pk] for pk in self.groups[col].get(value, ())]
+
+    def sorted_keys(self):
+        if self._keys is None:
+            self._keys = sorted(self.rows)
+        return self._keys
+
+    def result(self, rows, columns=None, names=None):
+        columns = columns or self.columns
+        names = names or [c.upper() for c in columns]
+        return Rows(
+            [(name, self.types.get(c, VARCHAR)) for c, name in zip(columns, names)],
+            [tuple(row[c] for c in columns) for row in rows],
+        )
+
+    # -- constraint checks ----------------------------------------------
+
+    def _check(self, row, inserting):
+        for col in self.not_null:
+            if row[col] is None:
+                target = f'("AE"."{self.name.upper()}"."{col.upper()}")'
+                if inserting:
+                    _raise(1400, f"cannot insert NULL into {target}", oracledb.IntegrityError)
+                _raise(1407, f"cannot update {target} to NULL", oracledb.IntegrityError)
+        for constraint, (col, allowed) in self.checks.items():
+            if row[col] is not None and row[col] not in allowed:
+                _raise(2290, f"check constraint (AE.{constraint}) violated", oracledb.IntegrityError)
+        for constraint, (col, parent) in self.parents.items():
+            if row[col] is not None and row[col] not in self.db.tables[parent].rows:
+                _raise(2291, f"integrity constraint (AE.{constraint}) violated - parent key not found",
+                       oracledb.IntegrityError)
+
+    def _check_unique(self, row, pk):
+        for index, (cols, entries) in self.unique.items():
+            value = self._unique_value(index, cols, row)
+            if value is not None and entries.get(value, pk) != pk:
+                _raise(1, f"unique constraint (AE.{index}) violated", oracledb.IntegrityError)
+
+    # -- writes (logged in the connection's undo log) ---------------------
+
+    def insert(self, conn, row):
+        row = {c: _bind_value(row.get(c)) for c in self.columns}
+        row[ROWSCN] = self.db.next_scn()
+        self._check(row, inserting=True)
+        pk = self.pk(row)
+        conn._lock_row(self, pk)
+        if pk in self.rows:
+            _raise(1, f"unique constraint (AE.{self.pk_name}) violated", oracledb.IntegrityError)
+        self._check_unique(row, pk)
+        conn._undo.append((self, pk, None))
+        self._put(pk, None, row)
+        return row
+
+    def update(self, conn, pk, changes):
+        old = self.rows[pk]
+        conn._lock_row(self, pk)
+        new = dict(old)
+        new.update((c, _bind_value(v)) for c, v in changes.items())
+        new[ROWSCN] = self.db.next_scn()
+        self._check(new, inserting=False)
+        self._check_unique(new, pk)
+        conn._undo.append((self, pk, old))
+        self._put(pk, old, new)
+        return new
+
+    def delete(self, conn, pk):
+        old = self.rows[pk]
+        conn._lock_row(self, pk)
+        for child, col, constraint in self.children:
+            if self.db.tables[child].groups[col].get(pk):
+                _raise(2292, f"integrity constraint (AE.{constraint}) violated - child record found",
+                       oracledb.IntegrityError)
+        conn._undo.append((self, pk, old))
+        self._put(pk, old, None)
+        return old
+
+    def _put(self, pk, old, new):
+        if old is not None:
+            for index, (cols, entries) in self.unique.items():
+                value = self._unique_value(index, cols, old)
+                if value is not None and entries.get(value) == pk:
+                    del entries[value]
+            for col, groups in self.groups.items():
+                members = groups.get(old[col])
+                if members is not None:
+                    members.discard(pk)
+                    if not members:
+                        del groups[old[col]]
+        if new is None:
+            del self.rows[pk]
+            self._keys = None
+            return
+        if old is None:
+            self._keys = None
+        self.rows[pk] = new
+        for index, (cols, entries) in self.unique.items():
+            value = self._unique_value(index, cols, new)
+            if value is not None:
+                entries[value] = pk
+        for col, groups in self.groups.items():
+            groups[new[col]].add(pk)
+
+
+class StandinDatabase:
+    """The whole schema: tables, sequences, row locks and one statement lock."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables = {name: Table(self, name, **spec) for name, spec in SCHEMA.items()}
+        for name, table in self.tables.items():
+            for constraint, (col, parent) in table.parents.items():
+                self.tables[parent].children.append((name, col, constraint))
+        self.sequences = defaultdict(lambda: itertools.count(1))
+        self._scn = itertools.count(1000000)
+        self.row_locks = {}  # (table, pk) -> connection
+        self.seeded = False
+
+    def nextval(self, sequence: str) -> int:
+        return next(self.sequences[sequence.lower()])
+
+    def next_scn(self) -> int:
+        return next(self._scn)
+
+    def ensure_seeded(self):
+        with self.lock:
+            if not self.seeded:
+                self.seeded = True
+                seed(self)
+
+
+# ---------------------------------------------------------------------
+# Business rules (AE.sql procedures and the plsql/ triggers)
+# ---------------------------------------------------------------------
+
+class _Statement:
+    """
+    One DML statement: row triggers run as rows are written, the
+    statement-level part of the compound triggers runs in finish().
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.db = conn._db
+        self.guardians = []                  # trg_reservation_guardian
+
+    def table(self, name: str) -> Table:
+        try:
+            return self.db.tables[name.lower()]
+        except KeyError:
+            _raise(942, "table or view does not exist")
+
+    def finish(self):
+        reservations = self.table("reservations")
+        for guardian_id, vol_num in self.guardians:
+            if reservations.lookup("UX_RESERVATIONS_PASSENGER", (guardian_id, vol_num)) is None:
+                _app_error(20001, "Le guardian doit avoir une reservation sur le meme vol.")
+        self.guardians.clear()
+
+
+@contextmanager
+def _dml(conn):
+    stmt = _Statement(conn)
+    yield stmt
+    stmt.finish()
+
+
+def _log(stmt, table_name, operation, record_id, details):
+    stmt.table("logs").insert(stmt.conn, {
+        "logid": stmt.db.nextval("seq_logs"),
+        "tablename": table_name,
+        "operation": operation,
+        "recordid": record_id,
+        "details": details,
+        "logdate": _sysdate(),
+    })
+
+
+# new state -> states it may come from (trg_aircraft_state); trg_aircraft_bu
+# still rejects Out of Service -> Maintenance
+AIRCRAFT_TRANSITIONS = {
+    "Flying": ("Ready",),
+    "Maintenance": ("Ready", "Out of Service", "Turnaround"),
+    "Ready": ("Maintenance", "Turnaround"),
+    "Out of Service": ("Maintenance", "Ready"),
+    "Turnaround": ("Flying",),
+}
+
+
+def _aircraft_values(row):
+    return {"modele": row["modele"], "capacity": row["maxcapacity"], "state": row["state"]}
+
+
+def _log_aircraft(stmt, operation, row, old=None):
+    # trg_aircraft_logs: skips the write the API marked (ae_audit.take)
+    if stmt.conn._audited:
+        stmt.conn._audited = False
+        return
+    if old is not None:
+        details = aircraft_changes(_aircraft_values(old), _aircraft_values(row))
+    else:
+        details = aircraft_details(_aircraft_values(row))
+    _log(stmt, "Aircrafts", operation, row["avion_id"], f"user={stmt.conn.username}; {details}")
+
+
+def insert_aircraft(stmt, row):
+    # trg_aircraft_bi
+    if row.get("maxcapacity") is not None and row["maxcapacity"] <= 0:
+        _app_error(20001, "MaxCapacity must be positive")
+    if row.get("state") is None:
+        row = dict(row, state="Ready")
+    row = stmt.table("aircrafts").insert(stmt.conn, row)
+    _log_aircraft(stmt, "INSERT", row)
+    return row
+
+
+def update_aircraft(stmt, avion_id, changes):
+    aircrafts = stmt.table("aircrafts")
+    old = aircrafts.rows[avion_id]
+    old_state = old["state"]
+    new_state = changes.get("state", old_state)
+    # trg_aircraft_bu, trg_aircraft_state (they fire on every update)
+    if old_state == "Out of Service" and new_state in ("Maintenance", "Ready", "Flying", "Turnaround"):
+        _app_error(20002, "Cannot reactivate an Out of Service aircraft")
+    allowed = AIRCRAFT_TRANSITIONS.get(new_state)
+    if allowed is not None and old_state is not None and old_state not in allowed:
+        _app_error(20010, "Invalid state transition for aircraft")
+    row = aircrafts.update(stmt.conn, avion_id, changes)
+    _log_aircraft(stmt, "UPDATE", row, old)
+    return row
+
+
+def delete_aircraft(stmt, avion_id):
+    aircrafts = stmt.table("aircrafts")
+    # trg_aircraft_bd
+    if aircrafts.rows[avion_id]["state"] not in ("Out of Service", "Maintenance"):
+        _app_error(20010, "Cannot delete an aircraft that is still Active")
+    _log_aircraft(stmt, "DELETE", aircrafts.delete(stmt.conn, avion_id))
+
+
+def insert_flight(stmt, row):
+    # trg_before_insert_flight
+    aircraft = stmt.table("aircrafts").rows.get(row.get("avion_id"))
+    if aircraft is None:
+        _no_data_found()
+    if aircraft["state"] != "Ready":
+        _app_error(20001, "Avion indisponible pour ce vol.")
+    row = stmt.table("flights").insert(stmt.conn, row)
+    # trg_flight_seat_inventory
+    seats = stmt.table("seat_inventory")
+    for n in range(aircraft["maxcapacity"]):
+        seats.insert(stmt.conn, {
+            "vol_num": row["vol_num"], "seat_no": n, "seatcode": seat_code(n), "status": "Free",
+        })
+    return row
+
+
+def update_flight(stmt, vol_num, changes):
+    flights = stmt.table("flights")
+    old = flights.rows[vol_num]
+    new = flights.update(stmt.conn, vol_num, changes)
+    if "state" in changes:
+        # trg_after_update_state
+        _log(stmt, "FLIGHTS", "UPDATE", vol_num,
+             f"OldState={old['state'] or ''}, NewState={new['state'] or ''}, Avion_id={new['avion_id']}")
+    return new
+
+
+def delete_flight(stmt, vol_num):
+    flights = stmt.table("flights")
+    if stmt.table("reservations").groups["vol_num"].get(vol_num):
+        _raise(2292, "integrity constraint (AE.FK_FLIGHTS) violated - child record found",
+               oracledb.IntegrityError)
+    # fk_seat_inventory_flight ON DELETE CASCADE
+    seats = stmt.table("seat_inventory")
+    for seat in seats.group("vol_num", vol_num):
+        seats.delete(stmt.conn, seats.pk(seat))
+    flights.delete(stmt.conn, vol_num)
+
+
+def _validate_passenger(row):
+    # trg_passenger_validation
+    if row.get("age") is None:
+        _app_error(20001, "Age du passager obligatoire.")
+    if row["age"] < 0 or row["age"] > 120:
+        _app_error(20001, "Age du passager invalide.")
+    if row.get("contact") is not None and "@" not in row["contact"]:
+        _app_error(20001, "Email invalide.")
+
+
+def insert_passenger(stmt, row):
+    _validate_passenger(row)
+    return stmt.table("passengers").insert(stmt.conn, row)
+
+
+def update_passenger(stmt, passenger_id, changes):
+    passengers = stmt.table("passengers")
+    _validate_passenger({**passengers.rows[passenger_id], **changes})
+    return passengers.update(stmt.conn, passenger_id, changes)
+
+
+def delete_passenger(stmt, passenger_id):
+    # trg_block_delete_passenger
+    reservations = stmt.table("reservations")
+    if reservations.groups["passenger_id"].get(passenger_id) or reservations.groups["guardian_id"].get(passenger_id):
+        _app_error(20001, "Suppression interdite : ce passager a des reservations.")
+    stmt.table("passengers").delete(stmt.conn, passenger_id)
+
+
+def _check_guardian(stmt, row):
+    # trg_reservation_guardian, row part
+    passengers = stmt.table("passengers")
+    passenger = passengers.rows.get(row.get("passenger_id"))
+    if passenger is None:
+        _app_error(20001, "ID de ce passenger n'existe pas.")
+    if passenger["age"] < 18:
+        if row.get("guardian_id") is None:
+            _app_error(20001, "Un passager mineur doit avoir un guardian.")
+        guardian = passengers.rows.get(row["guardian_id"])
+        if guardian is None:
+            _app_error(20001, "ID de ce guardian n'existe pas.")
+        if guardian["age"] < 18:
+            _app_error(20001, "Le guardian doit etre un adulte.")
+        stmt.guardians.append((row["guardian_id"], row.get("vol_num")))
+
+
+def _book_seat(stmt, row):
+    # trg_reservation_capacity: the seat inventory is the capacity check
+    seats = stmt.table("seat_inventory")
+    pk = seats.lookup("UX_SEAT_INVENTORY_CODE", (row["vol_num"], row["seatcode"]))
+    if pk is None:
+        _app_error(20001, "Reservation refusee: ce siege n'existe pas sur ce vol.")
+    seat = seats.rows[pk]
+    if seat["status"] == "Held" and seat["hold_expires"] >= _sysdate():
+        _app_error(20001, "Reservation refusee: le siege est retenu par un hold en cours.")
+    if seat["status"] == "Booked" and seat["reservation_id"] != row["reservation_id"]:
+        _app_error(20001, "Reservation refusee: le siege est deja reserve.")
+    seats.update(stmt.conn, pk, {
+        "status": "Booked", "reservation_id": row["reservation_id"], "hold_id": None, "hold_expires": None,
+    })
+
+
+def _free_seat(stmt, row):
+    seats = stmt.table("seat_inventory")
+    pk = seats.lookup("UX_SEAT_INVENTORY_CODE", (row["vol_num"], row["seatcode"]))
+    if pk is not None and seats.rows[pk]["reservation_id"] == row["reservation_id"]:
+        seats.update(stmt.conn, pk, {
+            "status": "Free", "reservation_id": None, "hold_id": None, "hold_expires": None,
+        })
+
+
+def insert_reservation(stmt, row):
+    # trg_reservation_seatcode
+    row["seatcode"] = canonical_seat_code(row.get("seatcode"))
+    _check_guardian(stmt, row)
+    row = stmt.table("reservations").insert(stmt.conn, row)
+    _book_seat(stmt, row)
+    _log(stmt, "RESERVATIONS", "INSERT", row["reservation_id"],
+         f"Passenger_id={row['passenger_id']}, Vol={row['vol_num']}, Seat={row['seatcode']}")
+    return row
+
+
+def update_reservation(stmt, reservation_id, changes):
+    reservations = stmt.table("reservations")
+    old = reservations.rows[reservation_id]
+    if "seatcode" in changes:
+        # trg_reservation_seatcode
+        changes = {**changes, "seatcode": canonical_seat_code(changes["seatcode"])}
+    new = {**old, **changes}
+    # trg_reservation_state_check (its 'Canceled' rules can never match
+    # the chk_reservation_state values)
+    if "state" in changes and old["state"] is not None and new["state"] is not None:
+        if old["state"] == "Boarded" and new["state"] != "Boarded":
+            _app_error(20001, "Transition interdite : une reservation deja boarded ne peut pas changer.")
+        if old["state"] == "Pending" and new["state"] == "Boarded":
+            _app_error(20001, "Transition interdite : Pending -> Boarded (doit etre Confirmed).")
+    _check_guardian(stmt, new)
+    new = reservations.update(stmt.conn, reservation_id, changes)
+    # trg_reservation_capacity
+    if {"vol_num", "seatcode", "state"} & changes.keys():
+        _free_seat(stmt, old)
+        if new["state"] != "Cancelled":
+            _book_seat(stmt, new)
+    return new
+
+
+def delete_reservation(stmt, reservation_id):
+    old = stmt.table("reservations").delete(stmt.conn, reservation_id)
+    _free_seat(stmt, old)
+    _log(stmt, "RESERVATIONS", "DELETE", reservation_id,
+         f"Passager_id={old['passenger_id']}, Vol={old['vol_num']}")
+
+
+def insert_maintenance(stmt, row):
+    # trg_before_insert_maintenance
+    if row.get("avion_id") not in stmt.table("aircrafts").rows:
+        _no_data_found()
+    row = stmt.table("maintenance").insert(stmt.conn, row)
+    # trg_after_insert_maintenance
+    if _trunc(row["operationdate"]) == _trunc(_sysdate()):
+        update_aircraft(stmt, row["avion_id"], {"state": "Maintenance"})
+    _log(stmt, "MAINTENANCE", "INSERT", row["maintenance_id"],
+         f"Avion_id={row['avion_id']}, Type={row['typee']}, Date={row['operationdate']:%Y-%m-%d}")
+    return row
+
+
+def update_maintenance(stmt, maintenance_id, changes):
+    return stmt.table("maintenance").update(stmt.conn, maintenance_id, changes)
+
+
+def delete_maintenance(stmt, maintenance_id):
+    maintenance = stmt.table("maintenance")
+    old = maintenance.delete(stmt.conn, maintenance_id)
+    # trg_after_delete_maintenance
+    open_ones = [m for m in maintenance.group("avion_id", old["avion_id"]) if m["state"] != "Completed"]
+    if not open_ones and old["avion_id"] in stmt.table("aircrafts").rows:
+        update_aircraft(stmt, old["avion_id"], {"state": "Ready"})
+    _log(stmt, "MAINTENANCE", "DELETE", maintenance_id,
+         f"Avion_id={old['avion_id']}, Type={old['typee']}, Date={old['operationdate']:%Y-%m-%d}")
+
+
+INSERTS = {
+    "aircrafts": insert_aircraft,
+    "flights": insert_flight,
+    "passengers": insert_passenger,
+    "reservations": insert_reservation,
+    "maintenance": insert_maintenance,
+}
+
+
+# -- procedures and functions --------------------------------------------
+
+PROCEDURES = {}
+FUNCTIONS = {}
+
+
+def _procedure(fn):
+    PROCEDURES[fn.__name__.lstrip("_")] = fn
+    return fn
+
+
+def _setout(var, value):
+    if isinstance(var, StandinVar):
+        var.setvalue(0, value)
+
+
+@_procedure
+def _add_new_aircraft(conn, avion_id, modele, max_capacity, state="Ready"):
+    with _dml(conn) as stmt:
+        if avion_id in stmt.table("aircrafts").rows:
+            _app_error(20001, "Aircraft already exists")
+        insert_aircraft(stmt, {"avion_id": avion_id, "modele": modele, "maxcapacity": max_capacity, "state": state})
+    conn.commit()
+
+
+@_procedure
+def _update_aircraft(conn, avion_id, modele, max_capacity, state):
+    with _dml(conn) as stmt:
+        old = stmt.table("aircrafts").rows.get(avion_id)
+        if old is None:
+            _app_error(20002, "Aircraft not found")
+        update_aircraft(stmt, avion_id, {
+            "modele": modele if modele is not None else old["modele"],
+            "maxcapacity": max_capacity if max_capacity is not None else old["maxcapacity"],
+            "state": state if state is not None else old["state"],
+        })
+    conn.commit()
+
+
+@_procedure
+def _delete_aircraft(conn, avion_id):
+    with _dml(conn) as stmt:
+        if avion_id not in stmt.table("aircrafts").rows:
+            _app_error(20002, "Aircraft not found")
+        delete_aircraft(stmt, avion_id)
+    conn.commit()
+
+
+@_procedure
+def _select_aircraft_by_id(conn, avion_id, out_modele, out_max_capacity, out_state):
+    row = conn._db.tables["aircrafts"].rows.get(avion_id)
+    if row is None:
+        _app_error(20002, "Aircraft not found")
+    _setout(out_modele, row["modele"])
+    _setout(out_max_capacity, row["maxcapacity"])
+    _setout(out_state, row["state"])
+
+
+def _get_all_aircrafts_infos(conn):
+    table = conn._db.tables["aircrafts"]
+    return conn._ref_cursor(table.result(table.rows.values()))
+
+
+FUNCTIONS["get_all_aircrafts_infos"] = _get_all_aircrafts_infos
+FUNCTIONS["dbms_transaction.local_transaction_id"] = lambda conn, *args: "1.1.1"
+
+
+@_procedure
+def _add_new_flight(conn, vol_num, destination, departure_time, arrival_time, avion_id):
+    departure_time = _bind_value(departure_time)
+    with _dml(conn) as stmt:
+        aircraft = stmt.table("aircrafts").rows.get(avion_id)
+        if aircraft is None:
+            _no_data_found()
+        if aircraft["state"] != "Ready":
+            _app_error(20001, "Aircraft is not available")
+        if departure_time is not None and departure_time <= _sysdate():
+            _app_error(20002, "Departure date must be in the future")
+        insert_flight(stmt, {
+            "vol_num": vol_num, "destination": destination, "departure_time": departure_time,
+            "arrival_time": arrival_time, "currentcapacity": 0, "state": "Scheduled", "avion_id": avion_id,
+        })
+    conn.commit()
+
+
+@_procedure
+def _update_flight(conn, vol_num, destination, departure_time, arrival_time):
+    with _dml(conn) as stmt:
+        flight = stmt.table("flights").rows.get(vol_num)
+        if flight is None:
+            _no_data_found()
+        if flight["state"] in ("In Service", "Cancelled", "Full"):
+            _app_error(20003, "Cannot modify a flight that is in service, cancelled, or full")
+        update_flight(stmt, vol_num, {
+            "destination": destination, "departure_time": departure_time, "arrival_time": arrival_time,
+        })
+    conn.commit()
+
+
+@_procedure
+def _delete_flight(conn, vol_num):
+    with _dml(conn) as stmt:
+        reservations = stmt.table("reservations").group("vol_num", vol_num)
+        if any(r["state"] == "Confirmed" for r in reservations):
+            _app_error(20004, "Cannot delete flight with confirmed reservations")
+        if vol_num in stmt.table("flights").rows:
+            delete_flight(stmt, vol_num)
+    conn.commit()
+
+
+@_procedure
+def _change_flight_state(conn, vol_num, new_state):
+    with _dml(conn) as stmt:
+        flight = stmt.table("flights").rows.get(vol_num)
+        if flight is None:
+            _no_data_found()
+        old_state = flight["state"]
+        if old_state in ("Cancelled", "Full"):
+            _app_error(20010, "Cannot modify a cancelled or full flight")
+        if old_state == "Scheduled" and new_state != "In Service":
+            _app_error(20011, "Invalid state transition from Scheduled")
+        if old_state == "In Service" and new_state not in ("Cancelled", "Full"):
+            _app_error(20012, "Invalid state transition from In Service")
+        update_flight(stmt, vol_num, {"state": new_state})
+    conn.commit()
+
+
+def _check_passenger_args(prenom, nom, contact, age):
+    if prenom is None or nom is None or contact is None or age is None:
+        _app_error(20001, "Prénom, nom, contact et âge sont obligatoires.")
+    if "@" not in contact:
+        _app_error(20002, "Email invalide.")
+
+
+@_procedure
+def _add_new_passenger(conn, passenger_id, prenom, nom, num_passeport, contact, nationality, age):
+    _check_passenger_args(prenom, nom, contact, age)
+    with _dml(conn) as stmt:
+        passengers = stmt.table("passengers")
+        if passenger_id in passengers.rows or \
+                passengers.lookup("SYS_C_PASSENGERS_PASSPORT", (num_passeport,)) is not None:
+            _app_error(20003, "ID ou numéro de passeport déjà existant.")
+        insert_passenger(stmt, {
+            "passenger_id": passenger_id, "prenom": prenom, "nom": nom, "numpasseport": num_passeport,
+            "contact": contact, "nationality": nationality, "age": age,
+        })
+    conn.commit()
+
+
+@_procedure
+def _update_passenger(conn, passenger_id, prenom, nom, contact, nationality, age):
+    _check_passenger_args(prenom, nom, contact, age)
+    with _dml(conn) as stmt:
+        if passenger_id not in stmt.table("passengers").rows:
+            _app_error(20003, "Passenger ID introuvable.")
+        update_passenger(stmt, passenger_id, {
+            "prenom": prenom, "nom": nom, "contact": contact, "nationality": nationality, "age": age,
+        })
+    conn.commit()
+
+
+@_procedure
+def _delete_passenger(conn, passenger_id):
+    with _dml(conn) as stmt:
+        if passenger_id not in stmt.table("passengers").rows:
+            _app_error(20001, "Passenger ID introuvable.")
+        if stmt.table("reservations").groups["passenger_id"].get(passenger_id):
+            _app_error(20002, "Passenger a des réservations et ne peut pas être supprimé.")
+        delete_passenger(stmt, passenger_id)
+    conn.commit()
+
+
+@_procedure
+def _get_passenger_by_passport(conn, num_passeport, out_id, out_prenom, out_nom,
+                               out_contact, out_nationality, out_age):
+    passengers = conn._db.tables["passengers"]
+    pk = passengers.lookup("SYS_C_PASSENGERS_PASSPORT", (num_passeport,))
+    if pk is None:
+        _app_error(20001, "Passenger introuvable pour ce numéro de passeport.")
+    row = passengers.rows[pk]
+    for var, col in ((out_id, "passenger_id"), (out_prenom, "prenom"), (out_nom, "nom"),
+                     (out_contact, "contact"), (out_nationality, "nationality"), (out_age, "age")):
+        _setout(var, row[col])
+
+
+@_procedure
+def _add_new_reservation(conn, reservation_id, passenger_id, vol_num, seatcode,
+                         state="Confirmed", guardian_id=None):
+    with _dml(conn) as stmt:
+        reservations = stmt.table("reservations")
+        if reservation_id in reservations.rows or \
+                reservations.lookup("UX_RESERVATIONS_SEAT", (vol_num, seatcode)) is not None:
+            _app_error(20001, "Reservation ID already exists or seat already booked.")
+        insert_reservation(stmt, {
+            "reservation_id": reservation_id, "passenger_id": passenger_id, "vol_num": vol_num,
+            "seatcode": seatcode, "state": state, "guardian_id": guardian_id,
+        })
+    conn.commit()
+
+
+@_procedure
+def _update_reservation(conn, reservation_id, vol_num, seatcode, state):
+    with _dml(conn) as stmt:
+        if reservation_id not in stmt.table("reservations").rows:
+            _app_error(20002, "Reservation not found.")
+        update_reservation(stmt, reservation_id, {"vol_num": vol_num, "seatcode": seatcode, "state": state})
+    conn.commit()
+
+
+@_procedure
+def _delete_reservation(conn, reservation_id):
+    with _dml(conn) as stmt:
+        if reservation_id not in stmt.table("reservations").rows:
+            _app_error(20003, "Reservation not found.")
+        delete_reservation(stmt, reservation_id)
+    conn.commit()
+
+
+@_procedure
+def _get_reservation_by_passport(conn, num_passeport, out_reservation_id, out_vol_num,
+                                 out_seatcode, out_state, out_guardian_id):
+    db = conn._db
+    pk = db.tables["passengers"].lookup("SYS_C_PASSENGERS_PASSPORT", (num_passeport,))
+    rows = db.tables["reservations"].group("passenger_id", pk) if pk is not None else []
+    if not rows:
+        _app_error(20004, "Reservation not found for this passport.")
+    if len(rows) > 1:
+        _raise(1422, "exact fetch returns more than requested number of rows")
+    row = rows[0]
+    for var, col in ((out_reservation_id, "reservation_id"), (out_vol_num, "vol_num"),
+                     (out_seatcode, "seatcode"), (out_state, "state"), (out_guardian_id, "guardian_id")):
+        _setout(var, row[col])
+
+
+@_procedure
+def _add_new_maintenance(conn, avion_id, operation_date, typee):
+    operation_date = _bind_value(operation_date)
+    with _dml(conn) as stmt:
+        if avion_id not in stmt.table("aircrafts").rows:
+            _app_error(20102, "Avion introuvable.")
+        for m in stmt.table("maintenance").group("avion_id", avion_id):
+            if operation_date is not None and _trunc(m["operationdate"]) == _trunc(operation_date):
+                _app_error(20101, "Maintenance déjà programmée pour cet avion à cette date.")
+        insert_maintenance(stmt, {
+            "maintenance_id": stmt.db.nextval("seq_maint"), "avion_id": avion_id,
+            "operationdate": operation_date, "typee": typee, "state": "Scheduled",
+        })
+    conn.commit()
+
+
+@_procedure
+def _update_maintenance(conn, maintenance_id, operation_date, typee, state):
+    operation_date = _bind_value(operation_date)
+    with _dml(conn) as stmt:
+        maintenance = stmt.table("maintenance")
+        row = maintenance.rows.get(maintenance_id)
+        if row is None:
+            _app_error(20104, "Maintenance non trouvée.")
+        for m in maintenance.group("avion_id", row["avion_id"]):
+            if m["maintenance_id"] != maintenance_id and operation_date is not None \
+                    and _trunc(m["operationdate"]) == _trunc(operation_date):
+                _app_error(20105, "Maintenance déjà programmée pour cet avion à cette date.")
+        update_maintenance(stmt, maintenance_id, {"operationdate": operation_date, "typee": typee, "state": state})
+    conn.commit()
+
+
+@_procedure
+def _delete_maintenance(conn, maintenance_id):
+    with _dml(conn) as stmt:
+        if maintenance_id not in stmt.table("maintenance").rows:
+            _app_error(20103, "Maintenance non trouvée.")
+        delete_maintenance(stmt, maintenance_id)
+    conn.commit()
+
+
+@_procedure
+def _list_maintenance(conn, out_cursor):
+    table = conn._db.tables["maintenance"]
+    _setout(out_cursor, conn._ref_cursor(table.result(table.rows.values())))
+
+
+@_procedure
+def _get_maintenance_by_id(conn, maintenance_id, out_cursor):
+    table = conn._db.tables["maintenance"]
+    row = table.rows.get(maintenance_id)
+    _setout(out_cursor, conn._ref_cursor(table.result([row] if row else [])))
+
+
+# ---------------------------------------------------------------------
+# SQL statements
+# ---------------------------------------------------------------------
+
+_SPACES = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"\s*([(,=<>+/])\s*|\s+(?=\))")
+_BIND = re.compile(r":(\w+)")
+
+
+def normalize(sql: str) -> str:
+    """Whitespace-insensitive form of a statement, with lower-case bind names."""
+    sql = _PUNCTUATION.sub(lambda m: m.group(1) or "", _SPACES.sub(" ", sql).strip())
+    return _BIND.sub(lambda m: ":" + m.group(1).lower(), sql)
+
+
+STATEMENTS = []  # (compiled pattern, factory(match) -> run(stmt, params))
+
+
+def _statement(pattern):
+    def register(factory):
+        STATEMENTS.append((re.compile(pattern + r"$", re.IGNORECASE), factory))
+        return factory
+    return register
+
+
+def _binds(text):
+    return _BIND.findall(text or "")
+
+
+def _literal(text):
+    text = text.strip()
+    upper = text.upper()
+    if upper == "NULL":
+        return lambda params: None
+    if upper == "SYSDATE":
+        return lambda params: _sysdate()
+    if upper in ("TRUE", "FALSE"):
+        return lambda params: upper == "TRUE"
+    if upper.endswith(".NEXTVAL"):
+        sequence = text[:-len(".NEXTVAL")]
+        return lambda params: params["_db"].nextval(sequence)
+    if text.startswith(":"):
+        name = text[1:]
+        return lambda params: params[name]
+    if text.startswith("'") and text.endswith("'"):
+        value = text[1:-1].replace("''", "'")
+        return lambda params: value
+    try:
+        value = int(text)
+    except ValueError:
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+    return lambda params: value
+
+
+def _arguments(text):
+    getters = [_literal(arg) for arg in text.split(",")] if text.strip() else []
+    if None in getters:
+        return None
+    return getters
+
+
+def _constant(columns, *row):
+    result = Rows(columns, [row])
+    return lambda m: lambda stmt, params: result
+
+
+# -- dialect / pool housekeeping ------------------------------------------
+
+_statement(r"SELECT 1 FROM DUAL")(_constant([("1", NUMBER)], 1))
+# SQLAlchemy reads the decimal separator with a STRING output handler
+_statement(r"SELECT 1\.1 FROM DUAL")(_constant([("1.1", VARCHAR)], "1.1"))
+_statement(r"SELECT value FROM v\$parameter WHERE name='compatible'")(_constant([("VALUE", VARCHAR)], "21.0.0"))
+_statement(r"SELECT CASE BITAND\(t\.flag,POWER\(2,28\)\) .* FROM v\$transaction t WHERE .*")(
+    _constant([("ISOLATION_LEVEL", VARCHAR)], "READ COMMITTED"))
+
+
+@_statement(r"select sys_context\('userenv','current_schema'\) from dual")
+def _current_schema(m):
+    return lambda stmt, params: Rows([("SCHEMA", VARCHAR)], [(stmt.conn.username.upper(),)])
+
+
+@_statement(r"SELECT SYSDATE FROM dual")
+def _select_sysdate(m):
+    return lambda stmt, params: Rows([("SYSDATE", DATE)], [(_sysdate(),)])
+
+
+@_statement(r"SELECT SYSDATE\+:(\w+)/86400 FROM dual")
+def _select_sysdate_plus(m):
+    name = m.group(1)
+    return lambda stmt, params: Rows(
+        [("SYSDATE+:TTL/86400", DATE)], [(_sysdate() + timedelta(seconds=params[name]),)]
+    )
+
+
+# -- generic single-table reads ---------------------------------------------
+
+def _key_column(table_name):
+    spec = SCHEMA.get(table_name.lower())
+    return spec["key"] if spec and isinstance(spec["key"], str) else None
+
+
+def _projection(spec):
+    """'*' or 'column [alias],...' -> (columns, names), (None, None) for '*'."""
+    if spec == "*":
+        return None, None
+    columns, names = [], []
+    for item in spec.split(","):
+        column, _, alias = item.strip().partition(" ")
+        columns.append(column.lower())
+        names.append((alias or column).upper())
+    return columns, names
+
+
+@_statement(r"SELECT (\*|[\w ,]+?) FROM (\w+)(?: WHERE (\w+)>:(\w+))? ORDER BY (\w+)(?: FETCH FIRST :(\w+) ROWS ONLY)?")
+def _select_page(m):
+    """Keyset pages and exports: SELECT ... ORDER BY <primary key>."""
+    spec, table_name, after_col, after, order_col, n = m.groups()
+    key = _key_column(table_name)
+    if key is None or order_col.lower() != key or (after_col and after_col.lower() != key):
+        return None
+    columns, names = _projection(spec)
+
+    def run(stmt, params):
+        table = stmt.table(table_name)
+        keys = table.sorted_keys()
+        start = bisect.bisect_right(keys, params[after]) if after else 0
+        end = start + params[n] if n else None
+        return table.result((table.rows[k] for k in keys[start:end]), columns, names)
+    return run
+
+
+@_statement(r"SELECT ([\w,]+) FROM (\w+) WHERE (\w+)=:(\w+)")
+def _select_by_key(m):
+    columns, table_name, col, bind = m.groups()
+    columns = columns.lower().split(",")
+    if col.lower() != _key_column(table_name):
+        return None
+
+    def run(stmt, params):
+        table = stmt.table(table_name)
+        row = table.rows.get(params[bind])
+        return table.result([row] if row else [], columns)
+    return run
+
+
+_EXPRESSION = r"(\w+|UPPER\(\w+\))"
+_CONDITION = re.compile(_EXPRESSION + r"(>=|<=|=|>|<):(\w+)$", re.IGNORECASE)
+_LIKE = re.compile(_EXPRESSION + r" LIKE :(\w+)(?: ESCAPE '(.)')?$", re.IGNORECASE)
+_EITHER = re.compile(r"\((\w+[<>]=?:\w+) OR (\w+[<>]=?:\w+)\)$")
+_AND = re.compile(r" AND(?: |(?=\())", re.IGNORECASE)
+_ORDER_ITEM = re.compile(_EXPRESSION + r"(?: (ASC|DESC))?$", re.IGNORECASE)
+_COMPARE = {"=": operator.eq, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def _expression(text):
+    """'col' or 'UPPER(col)' -> value(row)."""
+    m = re.fullmatch(r"UPPER\((\w+)\)", text, re.IGNORECASE)
+    if m is None:
+        return operator.itemgetter(text.lower())
+    col = m.group(1).lower()
+    return lambda row: row[col].upper() if row[col] is not None else None
+
+
+@functools.lru_cache(maxsize=256)
+def _like_regex(pattern, escape):
+    parts, chars = [], iter(pattern)
+    for char in chars:
+        if char == escape:
+            parts.append(re.escape(next(chars, "")))
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _predicate(text):
+    """
+    'expr op :bind', 'expr LIKE :bind [ESCAPE 'c']' or
+    '(col op :bind OR col op :bind)' -> test(row, params), None if not
+    emulated. expr is a column or UPPER(column).
+    """
+    m = _CONDITION.match(text)
+    if m:
+        expr, op, bind = m.groups()
+        value_of, compare = _expression(expr), _COMPARE[op]
+
+        def test(row, params):
+            value = value_of(row)  # NULL never matches
+            return value is not None and compare(value, _bind_value(params[bind]))
+        return test
+    m = _LIKE.match(text)
+    if m:
+        expr, bind, escape = m.groups()
+        value_of = _expression(expr)
+
+        def test(row, params):
+            value = value_of(row)
+            return value is not None and _like_regex(params[bind], escape).fullmatch(value) is not None
+        return test
+    m = _EITHER.match(text)
+    if m:
+        first, second = _predicate(m.group(1)), _predicate(m.group(2))
+        return lambda row, params: first(row, params) or second(row, params)
+    return None
+
+
+@_statement(r"SELECT (\*|[\w ,]+?) FROM (\w+)(?: WHERE (.+?))? ORDER BY ([\w ,()]+?)(?: FETCH FIRST :(\w+) ROWS ONLY)?")
+def _select_filtered(m):
+    """
+    Filtered and sorted pages (crud.flight.flights_page_sql,
+    crud.passenger.search_passengers): a full scan of the table, the index
+    work Oracle does is not emulated.
+    """
+    spec, table_name, where, order_by, n = m.groups()
+    if _key_column(table_name) is None:
+        return None
+    tests = [_predicate(text) for text in (_AND.split(where) if where else [])]
+    order = [_ORDER_ITEM.match(item.strip()) for item in order_by.split(",")]
+    if None in tests or None in order:
+        return None
+    order = [(_expression(item.group(1)), (item.group(2) or "").upper() == "DESC") for item in order]
+    columns, names = _projection(spec)
+
+    def run(stmt, params):
+        table = stmt.table(table_name)
+        rows = [row for row in table.rows.values() if all(test(row, params) for test in tests)]
+        # NULLs sort last ascending and first descending, as in Oracle
+        for value_of, descending in reversed(order):
+            rows.sort(key=lambda row: (value_of(row) is None, value_of(row)), reverse=descending)
+        if n:
+            rows = rows[:params[n]]
+        return table.result(rows, columns, names)
+    return run
+
+
+@_statement(r"SELECT MAX\(ORA_ROWSCN\),COUNT\(\*\),SUM\((\w+)\) FROM (\w+)")
+def _table_version(m):
+    """Version token of a whole table (etag.py)."""
+    col, table_name = m.groups()
+    if col.lower() != _key_column(table_name):
+        return None
+
+    def run(stmt, params):
+        rows = stmt.table(table_name).rows
+        return _version_result([row[ROWSCN] for row in rows.values()], rows.keys())
+    return run
+
+
+@_statement(r"SELECT MAX\(scn\),COUNT\(\*\),SUM\((\w+)\) FROM\((SELECT ORA_ROWSCN scn,\w+ FROM .*)\)")
+def _query_version(m):
+    """Version token of the rows a page query selects (etag.query_version)."""
+    run_page = plan(m.group(2))
+    if run_page is None:
+        return None
+
+    def run(stmt, params):
+        rows = run_page(stmt, params).rows
+        return _version_result([scn for scn, _ in rows], [key for _, key in rows])
+    return run
+
+
+def _version_result(scns, keys):
+    keys = list(keys)
+    return Rows([("MAX(SCN)", NUMBER), ("COUNT(*)", NUMBER), ("SUM", NUMBER)],
+                [(max(scns, default=None), len(keys), sum(keys) if keys else None)])
+
+
+@_statement(r"SELECT (\*|[\w ,]+?) FROM (\w+) WHERE (\w+) IN\(([^)]*\)(?: OR \3 IN\([^)]*\))*)")
+def _select_by_keys(m):
+    spec, table_name, col, in_list = m.groups()
+    columns, names = _projection(spec)
+    binds = _binds(in_list)
+    if col.lower() != _key_column(table_name):
+        return None
+
+    def run(stmt, params):
+        table = stmt.table(table_name)
+        found = (table.rows.get(key) for key in dict.fromkeys(params[b] for b in binds))
+        return table.result([row for row in found if row], columns, names)
+    return run
+
+
+# -- specific reads ---------------------------------------------------------
+
+@_statement(r"SELECT vol_num,avion_id,departure_time,arrival_time FROM Flights "
+            r"WHERE avion_id IN\(([^)]*)\) AND departure_time<:(\w+) AND arrival_time>:(\w+) "
+            r"AND\(state IS NULL OR state<>'Cancelled'\)")
+def _select_booked_rotations(m):
+    binds, window_end, window_start = _binds(m.group(1)), m.group(2), m.group(3)
+
+    def run(stmt, params):
+        flights = stmt.table("flights")
+        start, end = _bind_value(params[window_start]), _bind_value(params[window_end])
+        rows = [
+            f for b in binds for f in flights.group("avion_id", params[b])
+            if f["departure_time"] < end and f["arrival_time"] > start and f["state"] != "Cancelled"
+        ]
+        return flights.result(rows, ["vol_num", "avion_id", "departure_time", "arrival_time"])
+    return run
+
+
+@_statement(r"SELECT a\.MaxCapacity,r\.SeatCode FROM Flights f JOIN Aircrafts a .*WHERE f\.vol_num=:(\w+)")
+def _select_seat_map(m):
+    bind = m.group(1)
+
+    def run(stmt, params):
+        columns = [("MAXCAPACITY", NUMBER), ("SEATCODE", VARCHAR)]
+        flight = stmt.table("flights").rows.get(params[bind])
+        aircraft = stmt.table("aircrafts").rows.get(flight["avion_id"]) if flight else None
+        if aircraft is None:
+            return Rows(columns, [])
+        codes = [r["seatcode"] for r in stmt.table("reservations").group("vol_num", flight["vol_num"])
+                 if r["state"] != "Cancelled"]
+        return Rows(columns, [(aircraft["maxcapacity"], code) for code in codes or [None]])
+    return run
+
+
+_MANIFEST_COLUMNS = [
+    ("RESERVATION_ID", NUMBER), ("SEAT", VARCHAR), ("STATE", VARCHAR),
+    ("PASSENGER_ID", NUMBER), ("PRENOM", VARCHAR), ("NOM", VARCHAR), ("NUM_PASSEPORT", NUMBER),
+    ("NATIONALITY", VARCHAR), ("AGE", NUMBER),
+    ("GUARDIAN_ID", NUMBER), ("GUARDIAN_PRENOM", VARCHAR), ("GUARDIAN_NOM", VARCHAR),
+]
+
+
+@_statement(r"SELECT r\.reservation_id,r\.SeatCode seat,.* FROM Reservations r JOIN Passengers p .*"
+            r"WHERE r\.vol_num=:(\w+)( AND\(r\.State IS NULL OR r\.State<>'Cancelled'\))? "
+            r"ORDER BY (r\.reservation_id|s\.Seat_no NULLS LAST,r\.SeatCode)")
+def _select_manifest(m):
+    """Boarding manifest (crud.flight.manifest_sql)."""
+    bind, active_only, order_by = m.groups()
+    by_seat = order_by.lower().startswith("s.")
+
+    def run(stmt, params):
+        vol_num = params[bind]
+        passengers = stmt.table("passengers").rows
+        seats = stmt.table("seat_inventory")
+        reservations = [r for r in stmt.table("reservations").group("vol_num", vol_num)
+                        if not (active_only and r["state"] == "Cancelled")]
+        if by_seat:
+            def seat_order(r):
+                pk = seats.lookup("UX_SEAT_INVENTORY_CODE", (vol_num, r["seatcode"]))
+                return (pk is None, pk[1] if pk else 0, r["seatcode"])
+            reservations.sort(key=seat_order)
+        else:
+            reservations.sort(key=lambda r: r["reservation_id"])
+        rows = []
+        for r in reservations:
+            p = passengers[r["passenger_id"]]
+            g = passengers.get(r["guardian_id"]) if r["guardian_id"] is not None else None
+            rows.append((r["reservation_id"], r["seatcode"], r["state"],
+                         p["passenger_id"], p["prenom"], p["nom"], p["numpasseport"],
+                         p["nationality"], p["age"],
+                         r["guardian_id"], g["prenom"] if g else None, g["nom"] if g else None))
+        return Rows(_MANIFEST_COLUMNS, rows)
+    return run
+
+
+def _rowid(seat):
+    return f"{seat['vol_num']}.{seat['seat_no']}"
+
+
+def _seat_pk(rowid):
+    vol_num, seat_no = rowid.split(".")
+    return int(vol_num), int(seat_no)
+
+
+def _lock_rows(stmt, table, rows, skip_locked):
+    locks = stmt.db.row_locks
+    locked = []
+    for row in rows:
+        owner = locks.get((table.name, table.pk(row)))
+        if owner is not None and owner is not stmt.conn:
+            if skip_locked:
+                continue
+            raise _Busy()
+        locked.append(row)
+    for row in locked:
+        stmt.conn._lock_row(table, table.pk(row))
+    return locked
+
+
+@_statement(r"SELECT ROWID,SeatCode FROM Seat_Inventory WHERE vol_num=:(\w+) "
+            r"AND\(Status='Free' OR\(Status='Held' AND Hold_expires<SYSDATE\)\) "
+            r"(?:AND Seat_no IN\(([^)]*)\) )?ORDER BY Seat_no FOR UPDATE SKIP LOCKED")
+def _select_available_seats(m):
+    bind, in_list = m.group(1), m.group(2)
+    binds = _binds(in_list)
+
+    def run(stmt, params):
+        seats = stmt.table("seat_inventory")
+        now = _sysdate()
+        wanted = {params[b] for b in binds} if in_list else None
+        rows = sorted(
+            (s for s in seats.group("vol_num", params[bind])
+             if (wanted is None or s["seat_no"] in wanted)
+             and (s["status"] == "Free" or (s["status"] == "Held" and s["hold_expires"] < now))),
+            key=lambda s: s["seat_no"],
+        )
+        rows = _lock_rows(stmt, seats, rows, skip_locked=True)
+        return Rows([("ROWID", ROWID), ("SEATCODE", VARCHAR)], [(_rowid(s), s["seatcode"]) for s in rows])
+    return run
+
+
+@_statement(r"SELECT Seat_no,SeatCode FROM Seat_Inventory WHERE vol_num=:(\w+) AND Hold_id=:(\w+) "
+            r"AND Status='Held' AND Hold_expires>=SYSDATE ORDER BY Seat_no FOR UPDATE")
+def _select_held_seats(m):
+    vol_bind, hold_bind = m.groups()
+
+    def run(stmt, params):
+        seats = stmt.table("seat_inventory")
+        now = _sysdate()
+        rows = sorted(
+            (s for s in seats.group("vol_num", params[vol_bind])
+             if s["hold_id"] == params[hold_bind] and s["status"] == "Held" and s["hold_expires"] >= now),
+            key=lambda s: s["seat_no"],
+        )
+        rows = _lock_rows(stmt, seats, rows, skip_locked=False)
+        return seats.result(rows, ["seat_no", "seatcode"])
+    return run
+
+
+# -- writes -------------------------------------------------------------------
+
+@_statement(r"INSERT INTO (\w+)\(([\w,]+)\) VALUES\((.*)\)")
+def _insert(m):
+    table_name, columns, values = m.groups()
+    columns = columns.lower().split(",")
+    getters = _arguments(values)
+    if getters is None or len(getters) != len(columns):
+        return None
+    insert = INSERTS.get(table_name.lower())
+
+    def run(stmt, params):
+        params = dict(params, _db=stmt.db)
+        row = {c: get(params) for c, get in zip(columns, getters)}
+        if insert is not None:
+            insert(stmt, row)
+        else:
+            stmt.table(table_name).insert(stmt.conn, row)
+        return 1
+    return run
+
+
+@_statement(r"UPDATE Seat_Inventory SET Status='Held',Hold_id=:(\w+),Hold_expires=:(\w+) WHERE ROWID=:(\w+)")
+def _hold_seat(m):
+    hold_bind, expires_bind, rowid_bind = m.groups()
+
+    def run(stmt, params):
+        seats = stmt.table("seat_inventory")
+        pk = _seat_pk(params[rowid_bind])
+        if pk not in seats.rows:
+            return 0
+        seats.update(stmt.conn, pk, {
+            "status": "Held", "hold_id": params[hold_bind], "hold_expires": params[expires_bind],
+        })
+        return 1
+    return run
+
+
+@_statement(r"UPDATE Seat_Inventory SET Status='Booked',reservation_id=:(\w+),Hold_id=NULL,Hold_expires=NULL "
+            r"WHERE vol_num=:(\w+) AND SeatCode=:(\w+) AND Hold_id=:(\w+)")
+def _book_held_seat(m):
+    """confirm_hold: takes one seat out of its hold before the insert."""
+    reservation_bind, vol_bind, code_bind, hold_bind = m.groups()
+
+    def run(stmt, params):
+        seats = stmt.table("seat_inventory")
+        pk = seats.lookup("UX_SEAT_INVENTORY_CODE", (params[vol_bind], params[code_bind]))
+        if pk is None or seats.rows[pk]["hold_id"] != params[hold_bind]:
+            return 0
+        seats.update(stmt.conn, pk, {
+            "status": "Booked", "reservation_id": params[reservation_bind], "hold_id": None, "hold_expires": None,
+        })
+        return 1
+    return run
+
+
+@_statement(r"UPDATE Seat_Inventory SET Status='Free',Hold_id=NULL,Hold_expires=NULL "
+            r"WHERE vol_num=:(\w+) AND Hold_id=:(\w+) AND Status='Held'")
+def _release_seats(m):
+    vol_bind, hold_bind = m.groups()
+
+    def run(stmt, params):
+        seats = stmt.table("seat_inventory")
+        rows = [s for s in seats.group("vol_num", params[vol_bind])
+                if s["hold_id"] == params[hold_bind] and s["status"] == "Held"]
+        for seat in rows:
+            seats.update(stmt.conn, seats.pk(seat), {"status": "Free", "hold_id": None, "hold_expires": None})
+        return len(rows)
+    return run
+
+
+# -- state_refresh.STEPS, matched on their exact text --------------------------
+
+def _in_window(value, params, since="since", until="until"):
+    return value is not None and params[since] < value <= params[until]
+
+
+def _refresh_flights_in_service(stmt, params):
+    rows = [f for f in stmt.table("flights").rows.values()
+            if _in_window(f["departure_time"], params) and f["state"] == "Scheduled"]
+    for f in rows:
+        update_flight(stmt, f["vol_num"], {"state": "In Service"})
+    return len(rows)
+
+
+def _refresh_aircraft(stmt, from_states, to_state, avion_ids, exclude=None):
+    aircrafts = stmt.table("aircrafts")
+    rows = [a for a in aircrafts.rows.values()
+            if a["state"] in from_states and a["avion_id"] in avion_ids
+            and (exclude is None or not exclude(a))]
+    for a in rows:
+        update_aircraft(stmt, a["avion_id"], {"state": to_state})
+    return len(rows)
+
+
+def _refresh_aircraft_flying(stmt, params):
+    ids = {f["avion_id"] for f in stmt.table("flights").rows.values()
+           if _in_window(f["departure_time"], params) and f["arrival_time"] > params["until"]}
+    return _refresh_aircraft(stmt, ("Ready",), "Flying", ids)
+
+
+def _refresh_aircraft_turnaround(stmt, params):
+    ids = {f["avion_id"] for f in stmt.table("flights").rows.values() if _in_window(f["arrival_time"], params)}
+    return _refresh_aircraft(stmt, ("Flying",), "Turnaround", ids)
+
+
+def _refresh_maintenance(stmt, params, keep, to_state, since, until):
+    maintenance = stmt.table("maintenance")
+    rows = [m for m in maintenance.rows.values()
+            if _in_window(m["operationdate"], params, since, until) and keep(m["state"])]
+    for m in rows:
+        update_maintenance(stmt, m["maintenance_id"], {"state": to_state})
+    return len(rows)
+
+
+def _refresh_aircraft_maintenance(stmt, params):
+    ids = {m["avion_id"] for m in stmt.table("maintenance").rows.values()
+           if _in_window(m["operationdate"], params)}
+    return _refresh_aircraft(stmt, ("Ready", "Turnaround"), "Maintenance", ids)
+
+
+def _refresh_aircraft_ready(stmt, params):
+    maintenance = stmt.table("maintenance")
+    ids = {m["avion_id"] for m in maintenance.rows.values()
+           if _in_window(m["operationdate"], params, "since_done", "until_done")}
+    busy = lambda a: any(m["state"] == "In Progress" for m in maintenance.group("avion_id", a["avion_id"]))
+    return _refresh_aircraft(stmt, ("Maintenance",), "Ready", ids, exclude=busy)
+
+
+def _refresh_flight_capacity(stmt, params):
+    flights = stmt.table("flights")
+    seats = stmt.table("seat_inventory")
+    rows = 0
+    for f in list(flights.rows.values()):
+        if f["departure_time"] is None or f["departure_time"] <= params["since"]:
+            continue
+        booked = sum(1 for s in seats.group("vol_num", f["vol_num"]) if s["status"] == "Booked")
+        if f["currentcapacity"] != booked:
+            flights.update(stmt.conn, f["vol_num"], {"currentcapacity": booked})
+            rows += 1
+    return rows
+
+
+REFRESH_STEPS = {
+    "flights_in_service": _refresh_flights_in_service,
+    "aircraft_flying": _refresh_aircraft_flying,
+    "aircraft_turnaround": _refresh_aircraft_turnaround,
+    "maintenance_started": lambda stmt, params: _refresh_maintenance(
+        stmt, params, lambda s: s == "Scheduled", "In Progress", "since", "until"),
+    "aircraft_maintenance": _refresh_aircraft_maintenance,
+    "maintenance_completed": lambda stmt, params: _refresh_maintenance(
+        stmt, params, lambda s: s != "Completed", "Completed", "since_done", "until_done"),
+    "aircraft_ready": _refresh_aircraft_ready,
+    "flight_capacity": _refresh_flight_capacity,
+}
+
+_EXACT = {normalize(sql): REFRESH_STEPS[name] for name, sql in state_refresh.STEPS}
+
+
+def _mark_aircraft(stmt, params):
+    # ae_audit.mark: the token installed in ae_audit_secret is the API's own
+    if not config.AUDIT_API_TOKEN or params["token"] != config.AUDIT_API_TOKEN:
+        _app_error(20020, "Invalid audit token")
+    stmt.conn._audited = True
+    aircrafts = stmt.table("aircrafts")
+    row = aircrafts.rows.get(params["avion_id"])
+    if row is not None:
+        stmt.conn._lock_row(aircrafts, row["avion_id"])  # FOR UPDATE
+        for name, value in _aircraft_values(row).items():
+            params[name].setvalue(0, value)
+    return 0
+
+
+_EXACT[normalize(MARK_AIRCRAFT_SQL)] = _mark_aircraft
+
+
+# -- PL/SQL blocks ----------------------------------------------------------------
+
+_CALL = re.compile(r"BEGIN ([\w.$]+)\((.*)\); ?END;?$", re.IGNORECASE)
+_FUNCTION_CALL = re.compile(r"BEGIN :(\w+) ?:=([\w.$]+)\((.*)\); ?END;?$", re.IGNORECASE)
+
+
+def _routine(table, name):
+    name = name.lower()
+    if name not in table and name.startswith("ae."):
+        name = name[3:]
+    return table.get(name)
+
+
+def _call_plan(name, args, result=None):
+    routine = _routine(FUNCTIONS if result else PROCEDURES, name)
+    getters = _arguments(args)
+    if routine is None or getters is None:
+        return None
+
+    def run(stmt, params):
+        values = [get(params) for get in getters]
+        if result is None:
+            routine(stmt.conn, *values)
+        else:
+            params[result].setvalue(0, routine(stmt.conn, *values))
+        return 0
+    return run
+
+
+@functools.lru_cache(maxsize=1024)
+def plan(sql: str):
+    """Statement text -> run(stmt, params), or None if it is not emulated."""
+    text = normalize(sql)
+    if text in _EXACT:
+        return _EXACT[text]
+    m = _FUNCTION_CALL.match(text)
+    if m:
+        return _call_plan(m.group(2), m.group(3), result=m.group(1))
+    m = _CALL.match(text)
+    if m:
+        return _call_plan(m.group(1), m.group(2))
+    text = text.rstrip(";")
+    for pattern, factory in STATEMENTS:
+        m = pattern.match(text)
+        if m:
+            run = factory(m)
+            if run is not None:
+                return run
+    return None
+
+
+# ---------------------------------------------------------------------
+# DB-API objects
+# ---------------------------------------------------------------------
+
+class StandinVar:
+    """Bind variable (cursor.var) for OUT parameters and ref cursors."""
+
+    def __init__(self, typ=None, size=0, arraysize=1, **kwargs):
+        self.type = typ
+        self.size = size
+        self.value = None
+
+    def getvalue(self, pos=0):
+        return self.value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+
+class StandinCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowcount = -1
+        self.description = None
+        self.outputtypehandler = None
+        self.inputtypehandler = None
+        self.lastrowid = None
+        self._rows = []
+        self._pos = 0
+        self._batch_errors = []
+
+    # -- binds ------------------------------------------------------------
+
+    def var(self, typ=None, size=0, arraysize=1, *args, **kwargs):
+        return StandinVar(typ, size, arraysize)
+
+    def setinputsizes(self, *args, **kwargs):
+        return []
+
+    def setoutputsize(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def _params(sql, parameters, kwargs):
+        if parameters is None:
+            parameters = kwargs
+        if isinstance(parameters, dict):
+            items = parameters.items()
+        else:
+            names = list(dict.fromkeys(b.lower() for b in _BIND.findall(sql)))
+            items = zip(names, parameters)
+        return {k.lower(): v if isinstance(v, StandinVar) else _bind_value(v) for k, v in items}
+
+    # -- execution --------------------------------------------------------
+
+    def _prepare(self, sql, rows_of_params):
+        run = plan(sql)
+        if run is None:
+            _unsupported(sql)
+        return run, [self._params(sql, p, {}) for p in rows_of_params]
+
+    def _attempt(self, run, rows_of_params, batcherrors=False):
+        """One try of a statement; raises _Busy if it has to wait for a lock."""
+        self._batch_errors = []
+        self._set_result(None)
+        result = self.connection._run(run, rows_of_params, batcherrors)
+        if isinstance(result, Rows):
+            self._set_result(result)
+        else:
+            self.rowcount, self._batch_errors = result
+
+    def _set_result(self, result):
+        if result is None:
+            self.description = None
+            self._rows = []
+        else:
+            self.description = [(name, typ, None, None, None, None, True) for name, typ in result.columns]
+            self._rows = result.rows
+        self._pos = 0
+        self.rowcount = 0
+
+    def _execute(self, sql, rows_of_params, batcherrors=False):
+        self.connection._check_open()
+        run, rows_of_params = self._prepare(sql, rows_of_params)
+        if config.STANDIN_LATENCY:
+            time.sleep(config.STANDIN_LATENCY)
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                return self._attempt(run, rows_of_params, batcherrors)
+            except _Busy:
+                if time.monotonic() > deadline:
+                    _raise(30006, "resource busy; acquire with WAIT timeout expired")
+                time.sleep(0.001)
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self._execute(statement, [self._params(statement, parameters, kwargs)])
+
+    def executemany(self, statement, parameters, batcherrors=False, arraydmlrowcounts=False, **kwargs):
+        self._execute(statement, list(parameters), batcherrors)
+
+    def callproc(self, name, parameters=(), keyword_parameters=None):
+        args = ",".join(f":{i}" for i in range(len(parameters)))
+        self._execute(f"BEGIN {name}({args}); END;", [{str(i): v for i, v in enumerate(parameters)}])
+        return list(parameters)
+
+    def callfunc(self, name, return_type, parameters=(), keyword_parameters=None):
+        result = self.var(return_type)
+        args = ",".join(f":{i}" for i in range(len(parameters)))
+        binds = {str(i): v for i, v in enumerate(parameters)}
+        binds["result"] = result
+        self._execute(f"BEGIN :result := {name}({args}); END;", [binds])
+        return result.getvalue()
+
+    def getbatcherrors(self):
+        return self._batch_errors
+
+    # -- fetch --------------------------------------------------------------
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        self.rowcount = self._pos
+        return row
+
+    def fetchmany(self, size=None, numRows=None):
+        size = size or numRows or self.arraysize
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        self.rowcount = self._pos
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        self.rowcount = self._pos
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _TimedStandinCursor(TimedCursorMixin, StandinCursor):
+    pass
+
+
+class StandinConnection:
+    """One session: its transaction is an undo log plus the rows it locked."""
+
+    version = "21.3.0.0.0"
+    max_identifier_length = 128
+    thin = True
+
+    def __init__(self, db: StandinDatabase, user: str):
+        self._db = db
+        self.username = user
+        self.dsn = "standin"
+        self.autocommit = False
+        self.outputtypehandler = None
+        self.inputtypehandler = None
+        self.stmtcachesize = 20
+        self.call_timeout = 0
+        self._audited = False    # ae_audit.mark, for the current transaction
+        self._undo = []
+        self._locks = []
+        self._open = True
+
+    def _check_open(self):
+        if not self._open:
+            _raise(1012, "not logged on", oracledb.InterfaceError)
+
+    def cursor(self, scrollable: bool = False):
+        self._check_open()
+        return _TimedStandinCursor(self)
+
+    def _ref_cursor(self, result: Rows):
+        cursor = self.cursor()
+        cursor._set_result(result)
+        return cursor
+
+    def _lock_row(self, table, pk):
+        key = (table.name, pk)
+        owner = self._db.row_locks.get(key)
+        if owner is None:
+            self._db.row_locks[key] = self
+            self._locks.append(key)
+        elif owner is not self:
+            raise _Busy()
+
+    def _run(self, run, rows_of_params, batcherrors):
+        """
+        Runs a statement once per bind row, atomically: a failing row is
+        undone on its own (batcherrors) or with the whole statement.
+        """
+        with self._db.lock:
+            undo_mark, lock_mark = len(self._undo), len(self._locks)
+            stmt = _Statement(self)
+            errors = []
+            rowcount = 0
+            try:
+                for offset, params in enumerate(rows_of_params):
+                    row_undo, row_locks = len(self._undo), len(self._locks)
+                    try:
+                        result = run(stmt, params)
+                    except oracledb.DatabaseError as e:
+                        if not batcherrors:
+                            raise
+                        self._rollback_to(row_undo, row_locks)
+                        error, = e.args
+                        errors.append(_error(error.code, error.message.split(": ", 1)[-1], offset))
+                        continue
+                    if isinstance(result, Rows):
+                        stmt.finish()
+                        return result
+                    rowcount += result
+                stmt.finish()
+            except BaseException:
+                self._rollback_to(undo_mark, lock_mark)
+                raise
+            if self.autocommit:
+                self.commit()
+            return rowcount, errors
+
+    def _rollback_to(self, undo_mark, lock_mark):
+        undo_mark = min(undo_mark, len(self._undo))
+        while len(self._undo) > undo_mark:
+            table, pk, old = self._undo.pop()
+            table._put(pk, table.rows.get(pk), old)
+        lock_mark = min(lock_mark, len(self._locks))
+        self._release(self._locks[lock_mark:])
+        del self._locks[lock_mark:]
+
+    def _release(self, keys):
+        for key in keys:
+            if self._db.row_locks.get(key) is self:
+                del self._db.row_locks[key]
+
+    def commit(self):
+        with self._db.lock:
+            self._undo.clear()
+            self._release(self._locks)
+            self._locks.clear()
+            self._audited = False
+
+    def rollback(self):
+        with self._db.lock:
+            self._rollback_to(0, 0)
+            self._audited = False
+
+    def ping(self):
+        self._check_open()
+
+    def close(self):
+        if self._open:
+            self.rollback()
+            self._open = False
+
+    def is_healthy(self):
+        return self._open
+
+
+# -- async ---------------------------------------------------------------------
+
+class AsyncStandinCursor:
+    """Async face of StandinCursor for python-oracledb AsyncConnection code."""
+
+    def __init__(self, cursor: StandinCursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name == "_cursor":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    async def _execute(self, sql, rows_of_params, batcherrors=False):
+        cursor = self._cursor
+        cursor.connection._check_open()
+        run, rows_of_params = cursor._prepare(sql, rows_of_params)
+        if config.STANDIN_LATENCY:
+            await asyncio.sleep(config.STANDIN_LATENCY)
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                return cursor._attempt(run, rows_of_params, batcherrors)
+            except _Busy:
+                if time.monotonic() > deadline:
+                    _raise(30006, "resource busy; acquire with WAIT timeout expired")
+                await asyncio.sleep(0.001)
+
+    async def execute(self, statement, parameters=None, **kwargs):
+        await self._execute(statement, [StandinCursor._params(statement, parameters, kwargs)])
+
+    async def executemany(self, statement, parameters, batcherrors=False, arraydmlrowcounts=False, **kwargs):
+        await self._execute(statement, list(parameters), batcherrors)
+
+    async def callproc(self, name, parameters=(), keyword_parameters=None):
+        args = ",".join(f":{i}" for i in range(len(parameters)))
+        await self._execute(f"BEGIN {name}({args}); END;", [{str(i): v for i, v in enumerate(parameters)}])
+        return list(parameters)
+
+    async def callfunc(self, name, return_type, parameters=(), keyword_parameters=None):
+        result = self._cursor.var(return_type)
+        args = ",".join(f":{i}" for i in range(len(parameters)))
+        binds = {str(i): v for i, v in enumerate(parameters)}
+        binds["result"] = result
+        await self._execute(f"BEGIN :result := {name}({args}); END;", [binds])
+        return result.getvalue()
+
+    async def fetchone(self):
+        return self._cursor.fetchone()
+
+    async def fetchmany(self, size=None, numRows=None):
+        return self._cursor.fetchmany(size, numRows)
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = self._cursor.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _TimedAsyncStandinCursor(TimedAsyncCursorMixin, AsyncStandinCursor):
+    pass
+
+
+class AsyncStandinConnection:
+
+    def __init__(self, conn: StandinConnection, pool=None):
+        self._conn = conn
+        self._pool = pool
+        conn._ref_cursor = self._ref_cursor
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, scrollable: bool = False):
+        return _TimedAsyncStandinCursor(self._conn.cursor())
+
+    def _ref_cursor(self, result: Rows):
+        cursor = self.cursor()
+        cursor._cursor._set_result(result)
+        return cursor
+
+    async def commit(self):
+        self._conn.commit()
+
+    async def rollback(self):
+        self._conn.rollback()
+
+    async def ping(self):
+        self._conn.ping()
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool._release(self)
+        else:
+            self._conn.close()
+
+
+class AsyncStandinPool:
+    """Stands in for oracledb.create_pool_async(): at most `max` sessions."""
+
+    def __init__(self, user, max=2, wait_timeout=0, **kwargs):
+        self.user = user
+        self.max = max
+        self.wait_timeout = wait_timeout / 1000 if wait_timeout else None
+        self.busy = 0
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(max)
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            _raise(24459, "pool timed out waiting for a free connection", oracledb.OperationalError)
+        if self._idle:
+            conn = self._idle.pop()
+        else:
+            conn = AsyncStandinConnection(connect(self.user), self)
+            self.opened += 1
+        self.busy += 1
+        return conn
+
+    def _release(self, conn):
+        conn._conn.rollback()
+        self._idle.append(conn)
+        self.busy -= 1
+        self._slots.release()
+
+    async def close(self, force=False):
+        for conn in self._idle:
+            conn._conn.close()
+        self._idle.clear()
+        self.opened = self.busy
+
+
+# ---------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------
+
+database = StandinDatabase()
+
+
+def connect(user: str, password: str = None) -> StandinConnection:
+    """DB-API connect(); any credentials are accepted."""
+    database.ensure_seeded()
+    return StandinConnection(database, user)
+
+
+def create_pool_async(user: str = None, password: str = None, **kwargs) -> AsyncStandinPool:
+    return AsyncStandinPool(user, **kwargs)
+
+
+# ---------------------------------------------------------------------
+# Seed data
+# ---------------------------------------------------------------------
+
+MODELS = [("A320", 180), ("A321", 220), ("B737-800", 189), ("ATR 72", 70), ("E190", 100)]
+DESTINATIONS = ["Paris", "Lyon", "Madrid", "Rome", "Casablanca", "Tunis", "Montreal", "Dubai", "Istanbul", "London"]
+FIRST_NAMES = ["Amine", "Asma", "Nisrine", "Yacine", "Sara", "Karim", "Lina", "Omar", "Ines", "Rayan"]
+LAST_NAMES = ["Benali", "Haddad", "Mansouri", "Bouzid", "Cherif", "Saidi", "Rahmani", "Meziane"]
+NATIONALITIES = ["DZ", "FR", "MA", "TN", "CA", "ES"]
+
+FIRST_VOL_NUM = 1000
+FIRST_PASSPORT = 10000000
+
+
+def seed(db: StandinDatabase):
+    """
+    Deterministic data set sized by config.STANDIN_*: aircraft 1..N (all
+    Ready), flights FIRST_VOL_NUM.. scheduled over the coming weeks
+    without overlapping rotations, passengers 1..N (about one in twenty
+    is a minor), confirmed reservations 1..N on adult passengers and a
+    few maintenance slots in the future.
+    """
+    rng = random.Random(config.STANDIN_SEED)
+    conn = StandinConnection(db, "AE")
+    now = _sysdate()
+    with _dml(conn) as stmt:
+        for avion_id in range(1, config.STANDIN_AIRCRAFTS + 1):
+            modele, capacity = MODELS[avion_id % len(MODELS)]
+            insert_aircraft(stmt, {"avion_id": avion_id, "modele": modele, "maxcapacity": capacity})
+
+        flights = []
+        start = _trunc(now) + timedelta(days=1)
+        for i in range(config.STANDIN_FLIGHTS):
+            avion_id = i % config.STANDIN_AIRCRAFTS + 1
+            departure = start + timedelta(hours=12 * (i // config.STANDIN_AIRCRAFTS), minutes=7 * avion_id)
+            flights.append(insert_flight(stmt, {
+                "vol_num": FIRST_VOL_NUM + i,
+                "destination": rng.choice(DESTINATIONS),
+                "departure_time": departure,
+                "arrival_time": departure + timedelta(minutes=rng.randint(60, 600)),
+                "currentcapacity": 0,
+                "state": "Scheduled",
+                "avion_id": avion_id,
+            }))
+
+        adults = []
+        for passenger_id in range(1, config.STANDIN_PASSENGERS + 1):
+            prenom, nom = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            age = rng.randint(2, 17) if passenger_id % 20 == 0 else rng.randint(18, 85)
+            insert_passenger(stmt, {
+                "passenger_id": passenger_id,
+                "prenom": prenom,
+                "nom": nom,
+                "numpasseport": FIRST_PASSPORT + passenger_id,
+                "contact": f"{prenom.lower()}.{nom.lower()}{passenger_id}@example.com",
+                "nationality": rng.choice(NATIONALITIES),
+                "age": age,
+            })
+            if age >= 18:
+                adults.append(passenger_id)
+
+        booked = defaultdict(int)
+        capacity = {a["avion_id"]: a["maxcapacity"] for a in stmt.table("aircrafts").rows.values()}
+        reservation_id = 0
+        for n in range(config.STANDIN_RESERVATIONS):
+            flight = flights[n % len(flights)] if flights else None
+            if flight is None or not adults:
+                break
+            seat = booked[flight["vol_num"]]
+            passenger_id = adults[(n // len(flights)) % len(adults)]
+            if seat >= capacity[flight["avion_id"]] or \
+                    stmt.table("reservations").lookup("UX_RESERVATIONS_PASSENGER", (passenger_id, flight["vol_num"])):
+                continue
+            booked[flight["vol_num"]] += 1
+            reservation_id += 1
+            insert_reservation(stmt, {
+                "reservation_id": reservation_id,
+                "passenger_id": passenger_id,
+                "vol_num": flight["vol_num"],
+                "seatcode": seat_code(seat),
+                "state": "Confirmed",
+                "guardian_id": None,
+            })
+        # What the first state refresh (flight_capacity) would store
+        for vol_num, count in booked.items():
+            stmt.table("flights").update(stmt.conn, vol_num, {"currentcapacity": count})
+
+        for avion_id in range(1, config.STANDIN_AIRCRAFTS + 1, 4):
+            insert_maintenance(stmt, {
+                "maintenance_id": db.nextval("seq_maint"),
+                "avion_id": avion_id,
+                "operationdate": _trunc(now) + timedelta(days=rng.randint(7, 60), hours=2),
+                "typee": rng.choice(["Inspection", "Repair", "Cleaning"]),
+                "state": "Scheduled",
+            })
+    conn.commit()
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from sqlalchemy import text
+
+import config
+from cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Each step only looks at rows whose time column fell in (since, until],
+# so a run costs index range scans on the few rows that changed state
+# instead of rescanning every table like update_states did.
+# Steps run in this order and share one transaction per run.
+STEPS = [
+    ("flights_in_service", """
+        UPDATE Flights
+        SET state = 'In Service'
+        WHERE departure_time > :since AND departure_time <= :until
+          AND state = 'Scheduled'
+    """),
+    ("aircraft_flying", """
+        UPDATE Aircrafts
+        SET State = 'Flying'
+        WHERE State = 'Ready'
+          AND Avion_id IN (
+              SELECT Avion_id FROM Flights
+              WHERE departure_time > :since AND departure_time <= :until
+                AND arrival_time > :until
+          )
+    """),
+    ("aircraft_turnaround", """
+        UPDATE Aircrafts
+        SET State = 'Turnaround'
+        WHERE State = 'Flying'
+          AND Avion_id IN (
+              SELECT Avion_id FROM Flights
+              WHERE arrival_time > :since AND arrival_time <= :until
+          )
+    """),
+    ("maintenance_started", """
+        UPDATE Maintenance
+        SET State = 'In Progress'
+        WHERE OperationDate > :since AND OperationDate <= :until
+          AND State = 'Scheduled'
+    """),
+    ("aircraft_maintenance", """
+        UPDATE Aircrafts
+        SET State = 'Maintenance'
+        WHERE State IN ('Ready', 'Turnaround')
+          AND Avion_id IN (
+              SELECT Avion_id FROM Maintenance
+              WHERE OperationDate > :since AND OperationDate <= :until
+          )
+    """),
+    ("maintenance_completed", """
+        UPDATE Maintenance
+        SET State = 'Completed'
+        WHERE OperationDate > :since_done AND OperationDate <= :until_done
+          AND State <> 'Completed'
+    """),
+    ("aircraft_ready", """
+        UPDATE Aircrafts a
+        SET a.State = 'Ready'
+        WHERE a.State = 'Maintenance'
+          AND a.Avion_id IN (
+              SELECT Avion_id FROM Maintenance
+              WHERE OperationDate > :since_done AND OperationDate <= :until_done
+          )
+          AND NOT EXISTS (
+              SELECT 1 FROM Maintenance m
+              WHERE m.Avion_id = a.Avion_id
+                AND m.State = 'In Progress'
+          )
+    """),
+    # Reservations no longer write the Flights row (Seat_Inventory enforces
+    # capacity), so the booked count of flights still open is caught up here
+    ("flight_capacity", """
+        UPDATE Flights f
+        SET f.CurrentCapacity = (
+            SELECT COUNT(*) FROM Seat_Inventory i
+            WHERE i.vol_num = f.vol_num AND i.Status = 'Booked'
+        )
+        WHERE f.departure_time > :since
+          AND f.CurrentCapacity <> (
+              SELECT COUNT(*) FROM Seat_Inventory i
+              WHERE i.vol_num = f.vol_num AND i.Status = 'Booked'
+          )
+    """),
+]
+
+
+class StateRefresher:
+    """
+    Drives flight / aircraft / maintenance state transitions from a
+    background task, incrementally: every run handles the events between
+    the previous run's watermark and the database's SYSDATE, then moves
+    the watermark. A failed run is rolled back and retried from the same
+    watermark next time.
+    The watermark lives in memory; after a restart the first run looks
+    back STATE_REFRESH_CATCHUP seconds.
+    """
+
+    def __init__(self, engines, username: str = config.STATE_REFRESH_USER,
+                 password: str = config.STATE_REFRESH_PASSWORD,
+                 interval: float = config.STATE_REFRESH_INTERVAL):
+        self.engines = engines
+        self.username = username
+        self.password = password
+        self.interval = interval
+        self.watermark = None
+        self.runs = deque(maxlen=config.STATE_REFRESH_HISTORY)
+        self.total_runs = 0
+        self.failed_runs = 0
+        self._lock = threading.Lock()
+
+    def run_once(self):
+        started = time.perf_counter()
+        run = {"since": self.watermark, "until": None, "rows": {}, "error": None}
+        try:
+            with self.engines.connect(self.username, self.password) as conn:
+                until = conn.execute(text("SELECT SYSDATE FROM dual")).scalar()
+                since = self.watermark or until - timedelta(seconds=config.STATE_REFRESH_CATCHUP)
+                done = timedelta(seconds=config.MAINTENANCE_DURATION)
+                params = {
+                    "since": since,
+                    "until": until,
+                    "since_done": since - done,
+                    "until_done": until - done,
+                }
+                run["since"], run["until"] = since, until
+                try:
+                    for name, sql in STEPS:
+                        run["rows"][name] = conn.execute(text(sql), params).rowcount
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            self.watermark = until
+            if any(run["rows"].values()):
+                # Cached reads not keyed on an ETag version would keep the old states
+                cache.invalidate("flight", "aircraft")
+        except Exception as e:
+            run["error"] = str(e)
+            logger.exception("State refresh failed")
+        run["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self.total_runs += 1
+            self.failed_runs += run["error"] is not None
+            self.runs.append(run)
+        return run
+
+    async def run_forever(self):
+        while True:
+            # Blocking DB calls go to a worker thread to keep the loop free
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "watermark": self.watermark,
+                "total_runs": self.total_runs,
+                "failed_runs": self.failed_runs,
+                "runs": list(reversed(self.runs)),
+            }
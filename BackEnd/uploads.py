@@ -0,0 +1,118 @@
+import codecs
+import csv
+import json
+from typing import Literal, Optional
+
+from pydantic import ValidationError
+
+UploadFormat = Literal["csv", "ndjson"]
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(fileobj, fmt: str):
+    """
+    Yield (line_number, record) from a binary upload without reading it
+    all into memory. Records that cannot be parsed are yielded as
+    (line_number, ValueError) so the caller can report them as rejects.
+    CSV headers are matched case-insensitively to model field names.
+    """
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    if fmt == "ndjson":
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError("Expected a JSON object")
+                continue
+            yield line_number, record
+    else:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [name.strip().lower() for name in header]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            if len(row) != len(fields):
+                yield reader.line_num, ValueError(
+                    f"Expected {len(fields)} columns, got {len(row)}"
+                )
+                continue
+            yield reader.line_num, dict(zip(fields, row))
+
+
+class ValidatedUpload:
+    """
+    Records of an upload validated against a pydantic model, yielded as
+    (lines, rows) chunks of at most `size` valid rows. Records that do not
+    parse or validate go to rejects as {line, id, error}; total counts
+    every record read. Callers add the rows the database rejects.
+    """
+
+    def __init__(self, fileobj, fmt: str, model, key: str, size: int):
+        self.fileobj = fileobj
+        self.fmt = fmt
+        self.model = model
+        self.key = key
+        self.size = size
+        self.total = 0
+        self.rejects = []
+
+    def __iter__(self):
+        rows, lines = [], []
+        for line, record in iter_records(self.fileobj, self.fmt):
+            self.total += 1
+            if isinstance(record, ValueError):
+                self.rejects.append({"line": line, "error": str(record)})
+                continue
+            try:
+                rows.append(self.model.model_validate(record))
+                lines.append(line)
+            except ValidationError as e:
+                errors = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                key = str(record.get(self.key, ""))
+                self.rejects.append({
+                    "line": line,
+                    "id": int(key) if key.isdigit() else None,
+                    "error": errors,
+                })
+                continue
+            if len(rows) >= self.size:
+                yield lines, rows
+                rows, lines = [], []
+        if rows:
+            yield lines, rows
+
+    def add_results(self, lines, results):
+        """Bulk insert results of one chunk -> rejects; returns rows inserted."""
+        inserted = 0
+        for line, result in zip(lines, results):
+            if result["ok"]:
+                inserted += 1
+            else:
+                self.rejects.append({"line": line, "id": result["id"], "error": result["error"]})
+        return inserted
+
+    def summary(self, inserted: int):
+        rejects = sorted(self.rejects, key=lambda r: r["line"])
+        return {
+            "total": self.total,
+            "inserted": inserted,
+            "rejected": len(rejects),
+            "rejects": rejects,
+        }
@@ -21,7 +21,7 @@ CREATE TABLE LOGS (
 CREATE SEQUENCE seq_logs
   START WITH 1
   INCREMENT BY 1
-  NOCACHE
+  CACHE 1000
   NOCYCLE;
 
 CREATE TABLE Passengers (
@@ -485,7 +485,8 @@ BEGIN
     SELECT COUNT(*) INTO v_count
     FROM Reservations
     WHERE reservation_id = p_reservation_id
-       OR (SeatCode = p_seatcode AND vol_num = p_vol_num);
+       OR (SeatCode = p_seatcode AND vol_num = p_vol_num
+           AND (State IS NULL OR State <> 'Cancelled'));
 
     IF v_count > 0 THEN
         RAISE_APPLICATION_ERROR(-20001, 'Reservation ID already exists or seat already booked.');
@@ -870,21 +871,23 @@ BEGIN
 END;
 /
 
-CREATE OR REPLACE TRIGGER before_insert_reservation
-BEFORE INSERT ON RESERVATIONS
-FOR EACH ROW
-DECLARE
-    v_taken NUMBER;
-BEGIN
-    SELECT COUNT(*) INTO v_taken
-    FROM RESERVATIONS
-    WHERE vol_num = :NEW.vol_num AND SeatCode = :NEW.SeatCode;
+-- Seat / passenger-per-flight uniqueness is enforced by indexes instead
+-- of a row trigger doing SELECT COUNT(*) on every insert, so inserts that
+-- bypass add_new_reservation (POST /reservations/bulk) are covered too.
+-- Same definitions as plsql/tables/RESERVATIONS_INDEXES.sql: a Cancelled
+-- reservation maps to an all-NULL key, which Oracle does not index.
+CREATE UNIQUE INDEX ux_reservations_seat
+    ON Reservations (
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN vol_num END,
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN SeatCode END);
 
-    IF v_taken > 0 THEN
-        RAISE_APPLICATION_ERROR(-20001, 'Le siège ' || :NEW.SeatCode || ' est déjà pris pour ce vol.');
-    END IF;
-END;
-/
+CREATE UNIQUE INDEX ux_reservations_passenger
+    ON Reservations (
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN Passenger_id END,
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN vol_num END);
+
+CREATE INDEX ix_reservations_guardian
+    ON Reservations (Guardian_id);
 
 CREATE OR REPLACE TRIGGER after_insert_reservation
 AFTER INSERT ON RESERVATIONS
@@ -946,38 +949,81 @@ BEGIN
 END;
 /
 
--- After Insert/Update/Delete: write changes to LOGS
+-- Aircraft changes made through the API are written to LOGS by the API
+-- (BackEnd/audit.py), batched in the background. Before each write the
+-- API calls ae_audit.mark with a secret only it and this table know;
+-- trg_aircraft_logs skips the one marked write of that transaction. Every
+-- other write (state refresher, maintenance triggers, procedures, manual
+-- SQL) is still logged here, one row per DML.
+CREATE TABLE ae_audit_secret (
+    token VARCHAR2(64) NOT NULL
+);
+
+-- Same value as AUDIT_API_TOKEN in the API's environment
+INSERT INTO ae_audit_secret (token) VALUES ('&&AE_AUDIT_TOKEN');
+COMMIT;
+
+CREATE OR REPLACE PACKAGE ae_audit AS
+    PROCEDURE mark(p_token IN VARCHAR2);
+    FUNCTION take RETURN BOOLEAN;
+END ae_audit;
+/
+
+CREATE OR REPLACE PACKAGE BODY ae_audit AS
+    g_txn VARCHAR2(64);
+
+    PROCEDURE mark(p_token IN VARCHAR2) IS
+        v_count NUMBER;
+    BEGIN
+        SELECT COUNT(*) INTO v_count FROM ae_audit_secret WHERE token = p_token;
+        IF v_count = 0 THEN
+            RAISE_APPLICATION_ERROR(-20020, 'Invalid audit token');
+        END IF;
+        g_txn := DBMS_TRANSACTION.LOCAL_TRANSACTION_ID(TRUE);
+    END mark;
+
+    FUNCTION take RETURN BOOLEAN IS
+    BEGIN
+        IF g_txn IS NOT NULL AND g_txn = DBMS_TRANSACTION.LOCAL_TRANSACTION_ID THEN
+            g_txn := NULL;
+            RETURN TRUE;
+        END IF;
+        RETURN FALSE;
+    END take;
+END ae_audit;
+/
+
 CREATE OR REPLACE TRIGGER trg_aircraft_logs
 AFTER INSERT OR UPDATE OR DELETE ON Aircrafts
 FOR EACH ROW
 DECLARE
     v_details VARCHAR2(4000);
 BEGIN
-    IF INSERTING THEN
-        INSERT INTO LOGS(LogID, TableName, Operation, RecordID, Details)
-        VALUES (seq_logs.NEXTVAL, 'Aircrafts', 'INSERT', :NEW.Avion_id,
-                'Modele=' || :NEW.Modele || ', Capacity=' || :NEW.MaxCapacity || ', State=' || :NEW.State);
-
-    ELSIF UPDATING THEN
-        v_details := '';
-        IF :OLD.Modele != :NEW.Modele THEN
-            v_details := v_details || 'Modele:' || :OLD.Modele || '→' || :NEW.Modele || '; ';
-        END IF;
-        IF :OLD.MaxCapacity != :NEW.MaxCapacity THEN
-            v_details := v_details || 'Capacity:' || :OLD.MaxCapacity || '→' || :NEW.MaxCapacity || '; ';
+    IF NOT ae_audit.take THEN
+        IF INSERTING THEN
+            v_details := 'Modele=' || :NEW.Modele || ', Capacity=' || :NEW.MaxCapacity
+                || ', State=' || :NEW.State;
+        ELSIF UPDATING THEN
+            IF :OLD.Modele != :NEW.Modele THEN
+                v_details := NVL(v_details || ', ', '') || 'Modele:' || :OLD.Modele || '→' || :NEW.Modele;
+            END IF;
+            IF :OLD.MaxCapacity != :NEW.MaxCapacity THEN
+                v_details := NVL(v_details || ', ', '') || 'Capacity:' || :OLD.MaxCapacity || '→' || :NEW.MaxCapacity;
+            END IF;
+            IF :OLD.State != :NEW.State THEN
+                v_details := NVL(v_details || ', ', '') || 'State:' || :OLD.State || '→' || :NEW.State;
+            END IF;
+            v_details := NVL(v_details, 'No changes detected');
+        ELSE
+            v_details := 'Modele=' || :OLD.Modele || ', Capacity=' || :OLD.MaxCapacity
+                || ', State=' || :OLD.State;
         END IF;
-        IF :OLD.State != :NEW.State THEN
-            v_details := v_details || 'State:' || :OLD.State || '→' || :NEW.State || '; ';
-        END IF;
-
-        INSERT INTO LOGS(LogID, TableName, Operation, RecordID, Details)
-        VALUES (seq_logs.NEXTVAL, 'Aircrafts', 'UPDATE', :NEW.Avion_id,
-                NVL(v_details, 'No changes detected'));
 
-    ELSIF DELETING THEN
         INSERT INTO LOGS(LogID, TableName, Operation, RecordID, Details)
-        VALUES (seq_logs.NEXTVAL, 'Aircrafts', 'DELETE', :OLD.Avion_id,
-                'Modele=' || :OLD.Modele || ', Capacity=' || :OLD.MaxCapacity || ', State=' || :OLD.State);
+        VALUES (seq_logs.NEXTVAL, 'Aircrafts',
+                CASE WHEN INSERTING THEN 'INSERT' WHEN UPDATING THEN 'UPDATE' ELSE 'DELETE' END,
+                NVL(:NEW.Avion_id, :OLD.Avion_id),
+                'user=' || USER || '; ' || v_details);
     END IF;
 END;
 /
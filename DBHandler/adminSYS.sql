@@ -124,6 +124,12 @@ CREATE PUBLIC SYNONYM delete_aircraft FOR AE.delete_aircraft;
 -- Select aircraft
 CREATE PUBLIC SYNONYM select_aircraft_by_id FOR AE.select_aircraft_by_id;
 
+-- Aircraft writes logged by the API (trg_aircraft_logs skips them)
+GRANT EXECUTE ON AE.ae_audit TO ADMIN_AEROPORT;
+GRANT EXECUTE ON AE.ae_audit TO RESPONSABLE_VOLS;
+GRANT EXECUTE ON AE.ae_audit TO RESPONSABLE_MAINTENANCE;
+CREATE PUBLIC SYNONYM ae_audit FOR AE.ae_audit;
+
 
 
 -- ADMIN_AEROPORT can execute all flight procedures
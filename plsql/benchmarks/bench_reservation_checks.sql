@@ -0,0 +1,187 @@
+-- =====================================================================
+-- Benchmark: reservations/sec with the old COUNT(*) row triggers
+-- (trg_reservation_checks + trg_minor_guardian) vs the unique indexes
+-- of plsql/tables/RESERVATIONS_INDEXES.sql + trg_reservation_guardian.
+--
+-- Run as the schema owner (AE) in SQL*Plus / SQL Developer (F5), on a
+-- TEST database, after Triggers_Reservations has been installed.
+-- The table is first loaded with &seed_rows reservations, then
+-- &sample_rows reservations are inserted one row at a time (like the
+-- API does) under each variant and rolled back.
+-- Only the triggers being compared are enabled while timing.
+-- All bench rows use ids >= 1e9 and are deleted at the end; triggers
+-- on the touched tables are re-enabled.
+-- =====================================================================
+
+DEFINE seed_rows   = 1000000
+DEFINE sample_rows = 2000
+DEFINE seats       = 200
+
+SET SERVEROUTPUT ON
+SET VERIFY OFF
+
+ALTER TABLE Reservations DISABLE ALL TRIGGERS;
+ALTER TABLE Flights DISABLE ALL TRIGGERS;
+ALTER TABLE Aircrafts DISABLE ALL TRIGGERS;
+ALTER TABLE Passengers DISABLE ALL TRIGGERS;
+
+-- ---------------------------------------------------------------------
+-- 1. Fixture: one aircraft, enough flights and 200k passengers
+--    (every 10th passenger is a minor)
+-- ---------------------------------------------------------------------
+INSERT INTO Aircrafts (Avion_id, Modele, MaxCapacity, State)
+VALUES (1000000000, 'BENCH', &seats, 'Ready');
+
+INSERT INTO Flights (vol_num, destination, departure_time, arrival_time, CurrentCapacity, state, Avion_id)
+SELECT 1000000000 + LEVEL - 1, 'BENCH', SYSDATE + 365, SYSDATE + 366, 0, 'Scheduled', 1000000000
+FROM dual
+CONNECT BY LEVEL <= CEIL(&seed_rows / &seats) + CEIL(&sample_rows / &seats);
+
+INSERT INTO Passengers (Passenger_id, prenom, nom, NumPasseport, Contact, Nationality, Age)
+SELECT 1000000000 + LEVEL - 1, 'Bench', 'Passenger', 1000000000 + LEVEL - 1,
+       'bench@example.com', 'BENCH', CASE WHEN MOD(LEVEL - 1, 10) = 9 THEN 10 ELSE 30 END
+FROM dual
+CONNECT BY LEVEL <= 200000;
+
+-- Reservation n sits on flight n / seats, seat n mod seats (row + letter)
+INSERT /*+ APPEND */ INTO Reservations (reservation_id, Passenger_id, vol_num, SeatCode, State, Guardian_id)
+SELECT 1000000000 + n,
+       1000000000 + MOD(n, 200000),
+       1000000000 + TRUNC(n / &seats),
+       TO_CHAR(TRUNC(MOD(n, &seats) / 6) + 1) || SUBSTR('ABCDEF', MOD(MOD(n, &seats), 6) + 1, 1),
+       'Confirmed',
+       NULL
+FROM (
+    SELECT (a.r - 1) * 1000 + b.r - 1 AS n
+    FROM (SELECT LEVEL r FROM dual CONNECT BY LEVEL <= 1000) a,
+         (SELECT LEVEL r FROM dual CONNECT BY LEVEL <= 1000) b
+)
+WHERE n < &seed_rows;
+
+COMMIT;
+
+EXEC DBMS_STATS.GATHER_TABLE_STATS(USER, 'RESERVATIONS');
+
+-- Timed row-by-row insert of the sample on the flights after the seed.
+-- Every 10th sample passenger is a minor whose guardian is the previous
+-- (adult) passenger, booked just before on the same flight.
+CREATE OR REPLACE PROCEDURE bench_insert_sample(p_label IN VARCHAR2) IS
+    v_start  NUMBER;
+    v_cs     NUMBER;
+    v_n      NUMBER;
+    v_first  NUMBER := CEIL(&seed_rows / &seats) * &seats;
+BEGIN
+    v_start := DBMS_UTILITY.GET_TIME;
+    FOR i IN 0 .. &sample_rows - 1 LOOP
+        v_n := v_first + i;
+        INSERT INTO Reservations (reservation_id, Passenger_id, vol_num, SeatCode, State, Guardian_id)
+        VALUES (
+            1000000000 + v_n,
+            1000000000 + i,
+            1000000000 + TRUNC(v_n / &seats),
+            TO_CHAR(TRUNC(MOD(v_n, &seats) / 6) + 1) || SUBSTR('ABCDEF', MOD(MOD(v_n, &seats), 6) + 1, 1),
+            'Confirmed',
+            CASE WHEN MOD(i, 10) = 9 THEN 1000000000 + i - 1 END
+        );
+    END LOOP;
+    v_cs := GREATEST(DBMS_UTILITY.GET_TIME - v_start, 1);
+    ROLLBACK;
+    DBMS_OUTPUT.PUT_LINE(RPAD(p_label, 28) || &sample_rows || ' rows in ' ||
+        TO_CHAR(v_cs / 100, 'FM9990.00') || ' s = ' ||
+        ROUND(&sample_rows * 100 / v_cs) || ' reservations/sec');
+END;
+/
+
+-- ---------------------------------------------------------------------
+-- 2. BEFORE: no supporting indexes, COUNT(*) row triggers
+-- ---------------------------------------------------------------------
+BEGIN
+    FOR idx IN (SELECT index_name FROM user_indexes
+                WHERE index_name IN ('UX_RESERVATIONS_SEAT', 'UX_RESERVATIONS_PASSENGER', 'IX_RESERVATIONS_GUARDIAN')) LOOP
+        EXECUTE IMMEDIATE 'DROP INDEX ' || idx.index_name;
+    END LOOP;
+END;
+/
+
+CREATE OR REPLACE TRIGGER bench_legacy_checks
+BEFORE INSERT ON Reservations
+FOR EACH ROW
+DECLARE
+    v_count NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_count
+    FROM Reservations
+    WHERE vol_num  = :NEW.vol_num
+      AND SeatCode = :NEW.SeatCode;
+    IF v_count > 0 THEN
+        RAISE_APPLICATION_ERROR(-20001,'Ce seat est deja reserve pour ce vol.');
+    END IF;
+
+    SELECT COUNT(*) INTO v_count
+    FROM Reservations
+    WHERE Passenger_id = :NEW.Passenger_id
+      AND vol_num      = :NEW.vol_num;
+    IF v_count > 0 THEN
+        RAISE_APPLICATION_ERROR(-20001,'Ce passager a deja une reservation pour ce vol.');
+    END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER bench_legacy_guardian
+BEFORE INSERT ON Reservations
+FOR EACH ROW
+DECLARE
+    v_age_passenger NUMBER;
+    v_age_guardian  NUMBER;
+    v_count         NUMBER;
+BEGIN
+    SELECT Age INTO v_age_passenger FROM passengers WHERE passenger_id = :NEW.passenger_id;
+    IF v_age_passenger < 18 THEN
+        IF :NEW.guardian_id IS NULL THEN
+            RAISE_APPLICATION_ERROR(-20001,'Un passager mineur doit avoir un guardian.');
+        END IF;
+        SELECT Age INTO v_age_guardian FROM passengers WHERE passenger_id = :NEW.guardian_id;
+        IF v_age_guardian < 18 THEN
+            RAISE_APPLICATION_ERROR(-20001,'Le guardian doit etre un adulte.');
+        END IF;
+        SELECT COUNT(*) INTO v_count
+        FROM reservations
+        WHERE passenger_id = :NEW.guardian_id
+          AND vol_num      = :NEW.vol_num;
+        IF v_count = 0 THEN
+            RAISE_APPLICATION_ERROR(-20001,'Le guardian doit avoir une reservation sur le meme vol.');
+        END IF;
+    END IF;
+END;
+/
+
+EXEC bench_insert_sample('before (COUNT(*) triggers)');
+
+DROP TRIGGER bench_legacy_checks;
+DROP TRIGGER bench_legacy_guardian;
+
+-- ---------------------------------------------------------------------
+-- 3. AFTER: unique indexes + compound trigger
+-- ---------------------------------------------------------------------
+@@../tables/RESERVATIONS_INDEXES.sql
+
+ALTER TRIGGER trg_reservation_guardian ENABLE;
+
+EXEC bench_insert_sample('after (indexes + compound)');
+
+-- ---------------------------------------------------------------------
+-- 4. Cleanup
+-- ---------------------------------------------------------------------
+DROP PROCEDURE bench_insert_sample;
+
+ALTER TABLE Reservations DISABLE ALL TRIGGERS;
+DELETE FROM Reservations WHERE reservation_id >= 1000000000;
+DELETE FROM Flights WHERE vol_num >= 1000000000;
+DELETE FROM Passengers WHERE Passenger_id >= 1000000000;
+DELETE FROM Aircrafts WHERE Avion_id = 1000000000;
+COMMIT;
+
+ALTER TABLE Reservations ENABLE ALL TRIGGERS;
+ALTER TABLE Flights ENABLE ALL TRIGGERS;
+ALTER TABLE Aircrafts ENABLE ALL TRIGGERS;
+ALTER TABLE Passengers ENABLE ALL TRIGGERS;
@@ -0,0 +1,16 @@
+-- Composite indexes for the filtered flights list (GET /flights/?state=
+-- &destination=&avion_id=&departure_from=&departure_to=&sort=, see
+-- BackEnd/crud/flight.py flights_page_sql): an equality filter, then the
+-- departure_time range / sort, then vol_num to break ties, so one range
+-- scan returns a page already in order. Unfiltered lists sorted by
+-- departure or arrival use ix_flights_departure / ix_flights_arrival
+-- (STATE_REFRESH_INDEXES.sql).
+
+CREATE INDEX ix_flights_state_departure
+    ON Flights (state, departure_time, vol_num);
+
+CREATE INDEX ix_flights_destination_departure
+    ON Flights (destination, departure_time, vol_num);
+
+CREATE INDEX ix_flights_avion_departure
+    ON Flights (Avion_id, departure_time, vol_num);
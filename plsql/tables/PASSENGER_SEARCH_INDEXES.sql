@@ -0,0 +1,20 @@
+-- Function-based indexes for GET /passengers/search
+-- (BackEnd/crud/passenger.py passenger_search_sql). Names are matched as
+-- UPPER(col) LIKE 'PREFIX%' and results ordered by UPPER(nom),
+-- UPPER(prenom), Passenger_id: each search is one index range scan that
+-- stops after the first :n entries, whatever the size of the table.
+-- NumPasseport already has the index of its UNIQUE constraint.
+-- Gather statistics afterwards so the optimizer knows the hidden columns:
+--   EXEC DBMS_STATS.GATHER_TABLE_STATS(USER, 'PASSENGERS', cascade => TRUE);
+
+-- Search by surname (and first name)
+CREATE INDEX ix_passengers_upper_nom
+    ON Passengers (UPPER(nom), UPPER(prenom), Passenger_id);
+
+-- Search by first name only
+CREATE INDEX ix_passengers_upper_prenom
+    ON Passengers (UPPER(prenom), UPPER(nom), Passenger_id);
+
+-- Search by nationality, alone or with a name prefix
+CREATE INDEX ix_passengers_nationality_nom
+    ON Passengers (Nationality, UPPER(nom), UPPER(prenom), Passenger_id);
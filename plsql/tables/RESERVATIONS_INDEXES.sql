@@ -0,0 +1,24 @@
+-- Unique indexes that enforce the reservation rules previously checked
+-- with SELECT COUNT(*) in trg_reservation_checks.
+-- A duplicate now fails with ORA-00001 on the named index, in O(log n).
+-- Both indexes are function-based: a Cancelled reservation maps to an
+-- all-NULL key, which Oracle does not index, so it frees the seat and lets
+-- the passenger book the flight again.
+
+-- Un siège ne peut être réservé qu'une fois par vol
+CREATE UNIQUE INDEX ux_reservations_seat
+    ON Reservations (
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN vol_num END,
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN SeatCode END);
+
+-- Un passager ne peut avoir qu'une réservation par vol
+-- (also serves the guardian lookup of trg_reservation_guardian, which
+-- must use the same expressions)
+CREATE UNIQUE INDEX ux_reservations_passenger
+    ON Reservations (
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN Passenger_id END,
+        CASE WHEN State IS NULL OR State <> 'Cancelled' THEN vol_num END);
+
+-- Foreign key lookups done when a passenger/guardian is deleted
+CREATE INDEX ix_reservations_guardian
+    ON Reservations (Guardian_id);
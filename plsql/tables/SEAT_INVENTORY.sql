@@ -0,0 +1,96 @@
+-- Seat inventory: one row per seat of each flight.
+-- Booking sessions claim seats here with SELECT ... FOR UPDATE SKIP LOCKED
+-- (see BackEnd/crud/hold.py), so concurrent bookers on the same flight
+-- lock different seat rows instead of queueing on the Flights row.
+--
+-- Status: 'Free'   -> can be held
+--         'Held'   -> reserved for a booking session until Hold_expires
+--                     (an expired hold counts as free)
+--         'Booked' -> a reservation exists for this seat
+-- Seat_no is the 0-based index used by the API (row = Seat_no / 6 + 1,
+-- letter = 'ABCDEF'(Seat_no mod 6)), SeatCode its text form ('12C').
+
+CREATE TABLE Seat_Inventory (
+    vol_num        NUMBER NOT NULL,
+    Seat_no        NUMBER NOT NULL,
+    SeatCode       VARCHAR2(25) NOT NULL,
+    Status         VARCHAR2(10) DEFAULT 'Free' NOT NULL,
+    Hold_id        VARCHAR2(32),
+    Hold_expires   DATE,
+    reservation_id NUMBER,
+    CONSTRAINT pk_seat_inventory
+        PRIMARY KEY (vol_num, Seat_no),
+    CONSTRAINT fk_seat_inventory_flight
+        FOREIGN KEY (vol_num) REFERENCES Flights(vol_num) ON DELETE CASCADE,
+    CONSTRAINT chk_seat_inventory_status
+        CHECK (Status IN ('Free', 'Held', 'Booked'))
+);
+
+-- Lookup by seat code (reservation triggers) and by hold (confirm/release)
+CREATE UNIQUE INDEX ux_seat_inventory_code
+    ON Seat_Inventory (vol_num, SeatCode);
+
+CREATE INDEX ix_seat_inventory_hold
+    ON Seat_Inventory (Hold_id);
+
+
+-- Créer les sièges d'un vol à partir de la MaxCapacity de son avion
+CREATE OR REPLACE PROCEDURE init_seat_inventory(p_vol_num IN NUMBER)
+IS
+BEGIN
+    INSERT INTO Seat_Inventory (vol_num, Seat_no, SeatCode, Status)
+    SELECT f.vol_num,
+           s.n,
+           TO_CHAR(TRUNC(s.n / 6) + 1) || SUBSTR('ABCDEF', MOD(s.n, 6) + 1, 1),
+           'Free'
+    FROM Flights f
+    JOIN Aircrafts a ON a.Avion_id = f.Avion_id
+    CROSS JOIN (SELECT LEVEL - 1 AS n FROM dual CONNECT BY LEVEL <= 1000) s
+    WHERE f.vol_num = p_vol_num
+      AND s.n < a.MaxCapacity
+      AND NOT EXISTS (
+          SELECT 1 FROM Seat_Inventory i
+          WHERE i.vol_num = f.vol_num AND i.Seat_no = s.n
+      );
+END;
+/
+
+-- Chaque nouveau vol reçoit son inventaire de sièges
+CREATE OR REPLACE TRIGGER trg_flight_seat_inventory
+AFTER INSERT ON Flights
+FOR EACH ROW
+BEGIN
+    INSERT INTO Seat_Inventory (vol_num, Seat_no, SeatCode, Status)
+    SELECT :NEW.vol_num,
+           s.n,
+           TO_CHAR(TRUNC(s.n / 6) + 1) || SUBSTR('ABCDEF', MOD(s.n, 6) + 1, 1),
+           'Free'
+    FROM Aircrafts a
+    CROSS JOIN (SELECT LEVEL - 1 AS n FROM dual CONNECT BY LEVEL <= 1000) s
+    WHERE a.Avion_id = :NEW.Avion_id
+      AND s.n < a.MaxCapacity;
+END;
+/
+
+
+-- Backfill: inventaire des vols existants + sièges déjà réservés
+BEGIN
+    FOR f IN (SELECT vol_num FROM Flights) LOOP
+        init_seat_inventory(f.vol_num);
+    END LOOP;
+
+    MERGE INTO Seat_Inventory i
+    USING (
+        SELECT vol_num, SeatCode, MIN(reservation_id) AS reservation_id
+        FROM Reservations
+        WHERE State IS NULL OR State <> 'Cancelled'
+        GROUP BY vol_num, SeatCode
+    ) r
+    ON (i.vol_num = r.vol_num AND i.SeatCode = r.SeatCode)
+    WHEN MATCHED THEN UPDATE
+        SET i.Status = 'Booked',
+            i.reservation_id = r.reservation_id;
+
+    COMMIT;
+END;
+/
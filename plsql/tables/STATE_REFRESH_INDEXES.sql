@@ -0,0 +1,16 @@
+-- Time-range indexes for the incremental state refresh
+-- (BackEnd/state_refresh.py): each run only reads the flights departing
+-- or arriving, and the maintenance starting or ending, since the last run.
+
+CREATE INDEX ix_flights_departure
+    ON Flights (departure_time);
+
+CREATE INDEX ix_flights_arrival
+    ON Flights (arrival_time);
+
+CREATE INDEX ix_maintenance_operation_date
+    ON Maintenance (OperationDate);
+
+-- Aircraft still under maintenance (checked before putting one back to Ready)
+CREATE INDEX ix_maintenance_avion_state
+    ON Maintenance (Avion_id, State);
@@ -25,6 +25,10 @@ BEGIN
 END;
 /
 
+-- Audit / logs des avions: le write-behind de l'API (BackEnd/audit.py)
+-- écrit dans la table LOGS de DBHandler/AE.sql (LogID seq_logs, Operation),
+-- pas dans celle de plsql/tables/table_logs.sql. Sur ce schema les triggers
+-- continuent donc de journaliser chaque écriture.
 CREATE OR REPLACE TRIGGER trg_aircraft_audit
 AFTER INSERT OR DELETE OR UPDATE ON Aircrafts
 FOR EACH ROW
@@ -113,11 +117,11 @@ BEFORE UPDATE ON Aircrafts
 FOR EACH ROW
 BEGIN 
     
-    IF (:NEW.State = 'Flying' and :OLD.State != 'Ready')
-    OR (:NEW.State = 'Maintenance' and (:OLD.State != 'Ready' OR :OLD.State != 'Out of Service' OR :OLD.State != 'Turnaround'))
-    OR (:NEW.State = 'Ready' and (:OLD.State != 'Maintenance' OR :OLD.State != 'Turnaround' ))
-    OR (:NEW.State = 'Out of Service' and :OLD.State != 'Maintenance' )
-    OR ( :NEW.State = 'Turnaround' and  :OLD.State != 'Flying')
+    IF (:NEW.State = 'Flying' AND :OLD.State != 'Ready')
+    OR (:NEW.State = 'Maintenance' AND :OLD.State NOT IN ('Ready', 'Out of Service', 'Turnaround'))
+    OR (:NEW.State = 'Ready' AND :OLD.State NOT IN ('Maintenance', 'Turnaround'))
+    OR (:NEW.State = 'Out of Service' AND :OLD.State NOT IN ('Maintenance', 'Ready'))
+    OR (:NEW.State = 'Turnaround' AND :OLD.State != 'Flying')
     THEN 
         RAISE_APPLICATION_ERROR(-20010,
           'The order of state is not correct');